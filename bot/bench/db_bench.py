@@ -0,0 +1,279 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+from bot.core.db import Database
+from bot.core.db_metrics import _percentile
+
+SCENARIOS = ("messages", "voice", "poll_votes", "tickets", "dashboard")
+
+
+class _Recorder:
+    def __init__(self):
+        self.samples: list[float] = []
+        self.errors = 0
+
+    async def timed(self, coro):
+        started = time.perf_counter()
+        try:
+            await coro
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.samples.append(time.perf_counter() - started)
+
+    def summary(self, seconds: float) -> dict:
+        ordered = sorted(self.samples)
+        ops = len(ordered)
+        return {
+            "ops": ops,
+            "errors": self.errors,
+            "seconds": round(seconds, 4),
+            "ops_per_sec": round(ops / seconds, 1) if seconds > 0 else 0.0,
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(_percentile(ordered, 95) * 1000, 3),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+            "max_ms": round((ordered[-1] if ordered else 0.0) * 1000, 3),
+        }
+
+
+class Workload:
+    def __init__(self, db: Database, rng: random.Random, guilds: int, users: int, channels: int):
+        self.db = db
+        self.rng = rng
+        self.guilds = [100_000 + i for i in range(max(1, guilds))]
+        self.users = max(1, users)
+        self.channels = max(1, channels)
+        self.polls: list[int] = []
+
+    def _guild(self) -> int:
+        return self.rng.choice(self.guilds)
+
+    def _user(self) -> int:
+        # Wenige Vielschreiber, viele Gelegenheitsnutzer – wie auf echten Servern.
+        return 1_000_000 + int(self.users * (self.rng.random() ** 3))
+
+    async def prepare(self):
+        for guild_id in self.guilds:
+            for _ in range(3):
+                self.polls.append(
+                    await self.db.create_poll(guild_id, 1, "Bench?", json.dumps(["a", "b", "c"]), 1)
+                )
+
+    async def messages(self):
+        await self.db.increment_message(self._guild(), self._user(), self.rng.randrange(self.channels), self.rng.randint(5, 15))
+
+    async def voice(self):
+        guild_id, user_id = self._guild(), self._user()
+        await self.db.set_voice_session(guild_id, user_id, self.rng.randrange(self.channels), await self.db.now_iso())
+        await self.db.get_voice_session(guild_id, user_id)
+        await self.db.add_voice_seconds(guild_id, user_id, self.rng.randint(30, 3600), self.rng.randint(1, 20))
+        await self.db.clear_voice_session(guild_id, user_id)
+
+    async def poll_votes(self):
+        poll_id = self.rng.choice(self.polls)
+        await self.db.add_poll_vote(poll_id, self._user(), self.rng.randrange(3))
+        await self.db.list_poll_votes(poll_id)
+
+    async def tickets(self):
+        guild_id, user_id = self._guild(), self._user()
+        thread_id = self.rng.getrandbits(40)
+        ticket_id = await self.db.create_ticket(guild_id, user_id, 1, thread_id, thread_id + 1, "support")
+        now = await self.db.now_iso()
+        await self.db.set_last_user_message(ticket_id, now)
+        await self.db.set_claim(ticket_id, 42)
+        await self.db.set_last_staff_message(ticket_id, now)
+        await self.db.close_ticket(ticket_id)
+
+    async def dashboard(self):
+        guild_id = self._guild()
+        await self.db.list_tickets_for_guild(guild_id, limit=200)
+        await self.db.count_tickets_by_status_for_guild(guild_id)
+        await self.db.list_logs(limit=200)
+        await self.db.get_user_stats(guild_id, self._user())
+        await self.db.list_guild_configs(guild_id)
+
+
+async def run_scenario(workload: Workload, name: str, ops: int, concurrency: int) -> dict:
+    recorder = _Recorder()
+    step = getattr(workload, name)
+    remaining = [int(ops)]
+
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            try:
+                await recorder.timed(step())
+            except Exception:
+                pass
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    await workload.db.flush()
+    return recorder.summary(time.perf_counter() - started)
+
+
+def _sqlite_bytes(path: str) -> int:
+    total = 0
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            total += os.path.getsize(path + suffix)
+        except OSError:
+            pass
+    return total
+
+
+async def _storage_bytes(db: Database) -> int:
+    if db._driver == "sqlite":
+        return _sqlite_bytes(db.path)
+    return int((await db.storage_stats()).get("bytes", 0))
+
+
+async def bench_driver(driver: str, args, mysql_cfg: dict | None) -> dict:
+    group_commit = {"enabled": bool(args.group_commit)}
+    if driver == "mysql":
+        if not mysql_cfg or not mysql_cfg.get("database"):
+            return {"skipped": "database.mysql nicht konfiguriert"}
+        db = Database(mysql=mysql_cfg, group_commit=group_commit)
+    else:
+        path = os.path.join(args.workdir, "bench.db")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        db = Database(path=path, group_commit=group_commit, read_pool_size=args.readers)
+    try:
+        await db.init()
+    except Exception as exc:
+        return {"skipped": f"{type(exc).__name__}: {exc}"}
+    try:
+        workload = Workload(db, random.Random(args.seed), args.guilds, args.users, args.channels)
+        await workload.prepare()
+        size_start = await _storage_bytes(db)
+        results = {}
+        for name in args.scenarios:
+            before = await _storage_bytes(db)
+            summary = await run_scenario(workload, name, args.ops, args.concurrency)
+            summary["bytes_growth"] = await _storage_bytes(db) - before
+            results[name] = summary
+        return {
+            "scenarios": results,
+            "storage": {"bytes_start": size_start, "bytes_end": await _storage_bytes(db)},
+            "pool": db.pool_stats(),
+        }
+    finally:
+        await db.close()
+
+
+def _git_rev() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(previous: dict, current: dict) -> list[str]:
+    lines = []
+    for driver, data in (current.get("results") or {}).items():
+        old = ((previous.get("results") or {}).get(driver) or {}).get("scenarios") or {}
+        for name, now in (data.get("scenarios") or {}).items():
+            before = old.get(name)
+            if not before:
+                continue
+            for key in ("ops_per_sec", "p95_ms"):
+                a, b = float(before.get(key) or 0), float(now.get(key) or 0)
+                delta = ((b - a) / a * 100) if a else 0.0
+                lines.append(f"{driver:6} {name:11} {key:11} {a:>10.2f} → {b:>10.2f} ({delta:+.1f}%)")
+    return lines
+
+
+async def _run(args) -> dict:
+    mysql_cfg = None
+    if "mysql" in args.drivers:
+        from bot.core.settings import SettingsManager
+
+        settings = SettingsManager(config_path=args.config, override_path="data/settings.json")
+        await settings.load()
+        mysql_cfg = settings.get("database.mysql", {}) or {}
+        if args.mysql_database:
+            mysql_cfg = {**mysql_cfg, "database": args.mysql_database}
+    os.makedirs(args.workdir, exist_ok=True)
+    report = {
+        "meta": {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ops": args.ops,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "guilds": args.guilds,
+            "users": args.users,
+            "channels": args.channels,
+            "group_commit": bool(args.group_commit),
+            "readers": args.readers,
+        },
+        "results": {},
+    }
+    for driver in args.drivers:
+        report["results"][driver] = await bench_driver(driver, args, mysql_cfg)
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bot.bench.db_bench",
+        description="Lastprofil-Benchmark für die Database-Schicht.",
+    )
+    parser.add_argument("--drivers", default="sqlite", help="sqlite, mysql oder sqlite,mysql")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--ops", type=int, default=2000, help="Operationen pro Szenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--guilds", type=int, default=3)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--channels", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--group-commit", action="store_true")
+    parser.add_argument("--readers", type=int, default=2, help="SQLite-Leseverbindungen")
+    parser.add_argument("--workdir", default="data/bench")
+    parser.add_argument("--config", default="config/config.yml")
+    parser.add_argument("--mysql-database", default="", help="eigene Bench-Datenbank statt database.mysql.database")
+    parser.add_argument("--output", default="", help="JSON-Ergebnis hierhin schreiben (sonst stdout)")
+    parser.add_argument("--compare", default="", help="früheres JSON-Ergebnis zum Vergleich")
+    args = parser.parse_args(argv)
+    args.drivers = [d.strip() for d in args.drivers.split(",") if d.strip() in ("sqlite", "mysql")]
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip() in SCENARIOS]
+    if not args.drivers or not args.scenarios:
+        parser.error("keine gültigen --drivers/--scenarios")
+
+    report = asyncio.run(_run(args))
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        for line in compare(previous, report):
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import time
 import discord
 from datetime import datetime, timezone
 from discord import app_commands
@@ -38,6 +39,7 @@ from bot.modules.polls.services.poll_service import PollService
 from bot.modules.news.cogs.news_commands import NewsCommands
 from bot.modules.news.services.news_service import NewsService
 from bot.modules.placeholders.services.placeholder_service import PlaceholderService
+from bot.modules.retention.services.retention_service import RetentionService
 from bot.modules.welcome.cogs.welcome_listener import WelcomeListener
 from bot.modules.welcome.services.welcome_service import WelcomeService
 from bot.modules.ai.cogs.mention_ai_listener import MentionAIListener
@@ -87,10 +89,22 @@ from bot.modules.parlament.views.party_views import PartyCreatePanelView, PartyS
 from bot.modules.bot_status.services.bot_status_service import BotStatusService
 
 from bot.core.presence import PresenceRotator
+from bot.core.settings import SettingsChange
+from bot.core.state_store import StateStore
+from bot.core.scheduler import Scheduler
+from bot.core.settings_watch import SettingsWatcher
 from bot.modules.logs.forum_log_service import ForumLogService
 from bot.modules.logs.formatting.log_embeds import build_bot_error_embed
 from bot.utils.console import console
 
+# Settings-Abschnitt -> wiederkehrender Job, der nach einer Änderung sofort neu rechnen soll.
+_WAKE_ON_SECTION = {
+    "ticket": "ticket_automation",
+    "birthday": "birthday",
+    "news": "news",
+    "backup": "backup_autosave",
+}
+
 
 class StarryBot(commands.Bot):
     def __init__(self, settings, db, logger):
@@ -130,6 +144,13 @@ class StarryBot(commands.Bot):
         self.settings = settings
         self.db = db
         self.logger = logger
+        self.state_store = StateStore(self.db)
+        self.scheduler = Scheduler(self.db, on_error=self._on_job_error)
+        # Job -> (Fehlersignatur, zuletzt gemeldet, seitdem unterdrückt)
+        self._job_errors: dict[str, tuple[str, float, int]] = {}
+        self._job_error_interval = max(
+            0.0, float(self.settings.get("bot.scheduler.error_report_minutes", 60) or 0)
+        ) * 60
 
         self.ticket_service = TicketService(self, self.settings, self.db, self.logger)
         self.user_stats_service = UserStatsService(self, self.settings, self.db, self.logger)
@@ -156,20 +177,47 @@ class StarryBot(commands.Bot):
         self.custom_role_service = CustomRoleService(self, self.settings, self.db, self.logger)
         self.server_guide_service = ServerGuideService(self, self.settings, self.logger)
         self.reminder_afk_service = ReminderAfkService(self, self.settings, self.db, self.logger)
+        self.retention_service = RetentionService(self, self.settings, self.db, self.logger)
 
         self.forum_logs = ForumLogService(self, self.settings, self.db)
         self._boot_done = False
-
-        self.reload_settings_loop.start()
-        self.ticket_automation_loop.start()
-        self.backup_autosave_loop.start()
-        self.birthday_loop.start()
-        self.giveaway_loop.start()
-        self.poll_loop.start()
-        self.news_loop.start()
-        self.placeholder_loop.start()
-        self.parlament_loop.start()
-        self.reminder_loop.start()
+        self.settings_watcher = SettingsWatcher(
+            self.settings,
+            debounce_seconds=float(self.settings.get("bot.settings_watch.debounce_ms", 500) or 0) / 1000.0,
+        )
+        self.settings.subscribe(self._on_settings_changed)
+
+        self._register_jobs()
+
+    def _register_jobs(self):
+        jobs = self.scheduler
+        # Einmalige Fristen, von den Modulen beim Anlegen eingeplant.
+        jobs.register("giveaway_end", self.giveaway_service.finish_due)
+        jobs.register("poll_end", self.poll_service.finish_due)
+        jobs.register("reminder", self.reminder_afk_service.deliver_due)
+        jobs.register("afk_expiry", self.reminder_afk_service.expire_afk_due)
+        # Wiederkehrend. Wer seine nächste Frist kennt, gibt sie zurück; das Intervall ist nur der Fallback.
+        # Fehler fängt jeder Job selbst (_periodic), wie früher die einzelnen Loops.
+        jobs.every("ticket_automation", 900, self._periodic("ticket_automation", self.ticket_service.run_automation))
+        jobs.every("birthday", 3600, self._periodic("birthday", self.birthday_service.tick_midnight))
+        jobs.every("news", 300, self._periodic("news", self.news_service.tick))
+        jobs.every("backup_autosave", 600, self._periodic("backup_autosave", self._backup_autosave))
+        jobs.every("placeholder", 60, self._periodic("placeholder", self._placeholder_tick))
+        jobs.every("parlament", 60, self._periodic("parlament", self.parlament_service.refresh_all_panels))
+        retention_minutes = float(self.settings.get("retention.interval_minutes", 60) or 60)
+        jobs.every("retention", max(5.0, retention_minutes) * 60, self._periodic("retention", self._retention_tick))
+        sweep_seconds = max(1.0, float(self.settings.get("bot.scheduler.sweep_minutes", 60) or 60)) * 60
+        jobs.every("deadline_sweep", sweep_seconds, self._periodic("deadline_sweep", self._deadline_sweep), delay=sweep_seconds)
+
+    def _periodic(self, kind: str, handler):
+        async def run():
+            try:
+                return await handler()
+            except Exception as e:
+                # Kein Rückgabewert: der Scheduler nimmt das Intervall als nächsten Termin.
+                await self._report_job_error(kind, e)
+                return None
+        return run
 
     async def setup_hook(self):
         await self.add_cog(TicketDMListener(self))
@@ -240,141 +288,120 @@ class StarryBot(commands.Bot):
         self.presence = PresenceRotator(self, self.db, interval_seconds=20)
         self.presence.start()
 
+        # inotify, wenn verfügbar; sonst bleibt es beim 2-Sekunden-Poll.
+        watch = self.settings.get_bool("bot.settings_watch.enabled", True)
+        if not (watch and self.settings_watcher.start()):
+            self.reload_settings_loop.start()
+
+    async def _on_settings_changed(self, change: SettingsChange):
+        for section in change.sections:
+            kind = _WAKE_ON_SECTION.get(section)
+            if kind:
+                self.scheduler.wake(kind)
+        if change.source != "reload":
+            return
+        await self.logger.emit_system("settings_reloaded", {
+            "source": self.settings_watcher.backend or "poll",
+            "sections": sorted(change.sections),
+        })
+
     @tasks.loop(seconds=2.0)
     async def reload_settings_loop(self):
-        changed = await self.settings.reload_if_changed()
-        if changed:
-            await self.logger.emit_system("settings_reloaded", {"source": "dashboard_override"})
+        await self.settings.reload_if_changed()
 
-    @tasks.loop(seconds=60.0)
-    async def ticket_automation_loop(self):
-        try:
-            await self.ticket_service.run_automation()
-        except Exception:
-            pass
-
-    @tasks.loop(seconds=600.0)
-    async def backup_autosave_loop(self):
+    async def _backup_autosave(self) -> float | None:
         now = datetime.now(timezone.utc)
+        next_ts = None
         for guild in list(self.guilds):
             if not self.settings.get_guild_bool(guild.id, "backup.enabled", True):
                 continue
             if not self.settings.get_guild_bool(guild.id, "backup.auto_save_enabled", False):
                 continue
-            interval_hours = float(self.settings.get_guild(guild.id, "backup.auto_save_interval_hours", 24) or 24)
-            last = self.settings.get_guild(guild.id, "backup.last_auto_save_at", None)
+            interval = float(self.settings.get_guild(guild.id, "backup.auto_save_interval_hours", 24) or 24) * 3600
+            last = await self.state_store.get(guild.id, "backup", "last_auto_save_at", None)
+            if not last:
+                last = self.settings.get_guild(guild.id, "backup.last_auto_save_at", None)
+            due = now.timestamp()
             if last:
                 try:
-                    last_dt = datetime.fromisoformat(str(last))
+                    due = datetime.fromisoformat(str(last)).timestamp() + interval
                 except Exception:
-                    last_dt = None
-                if last_dt and (now - last_dt).total_seconds() < interval_hours * 3600:
-                    continue
+                    pass
+            if due > now.timestamp():
+                next_ts = due if next_ts is None else min(next_ts, due)
+                continue
             name = self.settings.get_guild(guild.id, "backup.auto_save_name", "autosave")
             try:
                 await self.backup_service.create_backup(guild, name=f"{name}-{now.strftime('%Y%m%d-%H%M')}")
-                await self.settings.set_guild_override(self.db, guild.id, "backup.last_auto_save_at", now.isoformat())
+                self.state_store.set(guild.id, "backup", "last_auto_save_at", now.isoformat())
+                due = now.timestamp() + interval
             except Exception:
-                pass
-
-    @tasks.loop(seconds=30.0)
-    async def birthday_loop(self):
-        try:
-            await self.birthday_service.tick_midnight()
-        except Exception:
-            pass
-
-    @tasks.loop(seconds=30.0)
-    async def giveaway_loop(self):
-        try:
-            await self.giveaway_service.tick()
-        except Exception:
-            pass
+                # Fehlgeschlagen: in zehn Minuten erneut versuchen, wie früher der Loop.
+                due = now.timestamp() + 600
+            next_ts = due if next_ts is None else min(next_ts, due)
+        return next_ts
 
-    @tasks.loop(seconds=30.0)
-    async def poll_loop(self):
-        try:
-            await self.poll_service.tick()
-        except Exception:
-            pass
-
-    @tasks.loop(seconds=60.0)
-    async def news_loop(self):
-        try:
-            await self.news_service.tick()
-        except Exception:
-            pass
-
-    @tasks.loop(seconds=60.0)
-    async def placeholder_loop(self):
-        try:
-            if not self.placeholder_service:
-                return
-            for guild in list(self.guilds):
+    async def _placeholder_tick(self):
+        for guild in list(self.guilds):
+            try:
                 await self.placeholder_service.tick(guild)
-        except Exception:
-            pass
-
-    @tasks.loop(seconds=60.0)
-    async def parlament_loop(self):
-        try:
-            if not self.parlament_service:
-                return
-            await self.parlament_service.refresh_all_panels()
-        except Exception:
-            pass
-
-    @tasks.loop(seconds=20.0)
-    async def reminder_loop(self):
-        try:
-            if self.reminder_afk_service:
-                await self.reminder_afk_service.tick()
-        except Exception:
-            pass
+            except Exception as e:
+                # Eine kaputte Gilde hält die übrigen nicht auf.
+                await self._report_job_error("placeholder", e, guild=guild)
+
+    async def _retention_tick(self):
+        if self.retention_service.enabled():
+            await self.retention_service.run()
+
+    async def _deadline_sweep(self):
+        # Sicherheitsnetz für Fristen, deren Job nicht greifen konnte (Gilde nicht im Cache, Modul deaktiviert).
+        for name, tick in (
+            ("giveaway", self.giveaway_service.tick),
+            ("poll", self.poll_service.tick),
+            ("reminder", self.reminder_afk_service.tick),
+        ):
+            try:
+                await tick()
+            except Exception as e:
+                await self._report_job_error(f"deadline_sweep:{name}", e)
+
+    async def _on_job_error(self, job, error: Exception):
+        guild = self.get_guild(job.guild_id) if job.guild_id else None
+        extra = {"ref": job.ref} if job.ref else None
+        await self._report_job_error(job.kind, error, extra=extra, guild=guild)
+
+    async def _report_job_error(self, kind: str, error: Exception, extra: dict | None = None,
+                                guild: discord.Guild | None = None):
+        # Immer in die Konsole; in den Fehlerkanal nur neue Fehler bzw. höchstens einmal pro
+        # Intervall je Job und Gilde, damit ein hängender Dienst den Kanal nicht flutet.
+        console.line("ERROR", f"Job {kind} fehlgeschlagen ({type(error).__name__}): {error}", color="red")
+        key = f"{kind}:{guild.id}" if guild else kind
+        signature = f"{type(error).__name__}: {error}"
+        now = time.monotonic()
+        last = self._job_errors.get(key)
+        if last and last[0] == signature and now - last[1] < self._job_error_interval:
+            self._job_errors[key] = (signature, last[1], last[2] + 1)
+            return
+        suppressed = last[2] if last and last[0] == signature else 0
+        self._job_errors[key] = (signature, now, 0)
+        if suppressed:
+            extra = {**(extra or {}), "suppressed": suppressed}
+        await self._emit_bot_error(f"scheduler:{kind}", error, extra=extra, guild=guild)
 
     @reload_settings_loop.error
     async def reload_settings_loop_error(self, error: Exception):
             await self._emit_bot_error("reload_settings_loop", error, extra=None, guild=None)
 
-    @ticket_automation_loop.error
-    async def ticket_automation_loop_error(self, error: Exception):
-            await self._emit_bot_error("ticket_automation_loop", error, extra=None, guild=None)
-
-    @backup_autosave_loop.error
-    async def backup_autosave_loop_error(self, error: Exception):
-            await self._emit_bot_error("backup_autosave_loop", error, extra=None, guild=None)
-
-    @birthday_loop.error
-    async def birthday_loop_error(self, error: Exception):
-            await self._emit_bot_error("birthday_loop", error, extra=None, guild=None)
-
-    @giveaway_loop.error
-    async def giveaway_loop_error(self, error: Exception):
-            await self._emit_bot_error("giveaway_loop", error, extra=None, guild=None)
-
-    @poll_loop.error
-    async def poll_loop_error(self, error: Exception):
-            await self._emit_bot_error("poll_loop", error, extra=None, guild=None)
-
-    @news_loop.error
-    async def news_loop_error(self, error: Exception):
-            await self._emit_bot_error("news_loop", error, extra=None, guild=None)
-
-    @placeholder_loop.error
-    async def placeholder_loop_error(self, error: Exception):
-            await self._emit_bot_error("placeholder_loop", error, extra=None, guild=None)
-
-    @parlament_loop.error
-    async def parlament_loop_error(self, error: Exception):
-            await self._emit_bot_error("parlament_loop", error, extra=None, guild=None)
-
-    @reminder_loop.error
-    async def reminder_loop_error(self, error: Exception):
-            await self._emit_bot_error("reminder_loop", error, extra=None, guild=None)
-
 
     async def on_ready(self):
         if self._boot_done:
+            # Neue Gateway-Session: verpasste Voice-Events per Abgleich nachholen.
+            if self.user_stats_service:
+                for guild in list(self.guilds):
+                    try:
+                        await self.user_stats_service.seed_voice_sessions(guild)
+                    except Exception:
+                        pass
             return
         self._boot_done = True
         try:
@@ -382,6 +409,11 @@ class StarryBot(commands.Bot):
         except Exception:
             pass
         await self.forum_logs.start()
+        try:
+            await self.scheduler.load()
+        except Exception as exc:
+            console.line("ERROR", f"Geplante Jobs nicht geladen ({type(exc).__name__}): {exc}", color="red")
+        self.scheduler.start()
         for guild in list(self.guilds):
             if self.user_stats_service:
                 try:
@@ -466,11 +498,30 @@ class StarryBot(commands.Bot):
             pass
 
     async def close(self):
+        self.settings_watcher.stop()
+        await self.scheduler.close()
         if self.bot_status_service:
             try:
                 await self.bot_status_service.send_stop()
             except Exception:
                 pass
+        if self.user_stats_service:
+            try:
+                await self.user_stats_service.aggregator.close()
+            except Exception as exc:
+                console.line("ERROR", f"User-Stats-Flush fehlgeschlagen ({type(exc).__name__}): {exc}", color="red")
+            try:
+                await self.user_stats_service.voice.close()
+            except Exception as exc:
+                console.line("ERROR", f"Voice-Checkpoint fehlgeschlagen ({type(exc).__name__}): {exc}", color="red")
+            try:
+                await self.user_stats_service.activity.close()
+            except Exception as exc:
+                console.line("ERROR", f"Aktivitäts-Flush fehlgeschlagen ({type(exc).__name__}): {exc}", color="red")
+        try:
+            await self.state_store.close()
+        except Exception as exc:
+            console.line("ERROR", f"State-Flush fehlgeschlagen ({type(exc).__name__}): {exc}", color="red")
         await super().close()
 
         try:
@@ -2,182 +2,687 @@ import os
 import asyncio
 import json
 import random
-import re
 import time
+import weakref
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from urllib.parse import quote
 
 import aiosqlite
 import aiomysql
 
-class _MySQLCursor:
-    def __init__(self, cur, lastrowid=None, lock=None):
-        self._cur = cur
-        self.lastrowid = lastrowid if lastrowid is not None else (cur.lastrowid if cur else None)
-        self._lock = lock
-        self._lock_released = False
-
-    def _release_lock(self):
-        if self._lock and not self._lock_released:
-            self._lock.release()
-            self._lock_released = True
+from bot.core.db_metrics import QueryMetrics, instrument_methods, reset_current_method
+from bot.core.migrations import LATEST_VERSION, SCHEMA_VERSION_TABLE, pending_for
+from bot.core.sql_dialect import StatementCache, mysql_statement
+
+def _to_epoch(value) -> int | None:
+    if value is None or value == "":
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+# Tabellen, die nur wachsen. "where" bekommt den Cutoff als ersten Parameter,
+# {scope} wird durch den Guild-Filter ersetzt ("" oder " AND guild_id = ?").
+RETENTION_TARGETS = {
+    "logs": {
+        "where": "created_at < ?{scope}",
+        "age": "iso",
+        "guild": None,
+        "id": True,
+    },
+    "afk_mention_events": {
+        "where": "created_at < ?{scope}",
+        "age": "iso",
+        "guild": "SELECT DISTINCT guild_id FROM afk_mention_events",
+        "id": True,
+    },
+    "reminders": {
+        "where": "delivered_at IS NOT NULL AND delivered_at < ?{scope}",
+        "age": "iso",
+        "guild": "SELECT DISTINCT guild_id FROM reminders",
+        "id": True,
+    },
+    "backups": {
+        "where": "created_at < ?{scope}",
+        "age": "iso",
+        "guild": "SELECT DISTINCT guild_id FROM backups",
+        "id": True,
+    },
+    "dashboard_sessions": {
+        "where": "expires_at < ?{scope}",
+        "age": "epoch",
+        "guild": None,
+        "id": False,
+    },
+    "invite_joins": {
+        "where": "left_at IS NOT NULL AND left_at < ?{scope}",
+        "age": "iso",
+        "guild": "SELECT DISTINCT guild_id FROM invite_joins",
+        "id": False,
+    },
+    "poll_votes": {
+        "where": "poll_id IN (SELECT id FROM polls WHERE status = 'closed' AND closed_at < ?{scope})",
+        "age": "iso",
+        "guild": "SELECT DISTINCT guild_id FROM polls WHERE status = 'closed'",
+        "id": False,
+    },
+    "giveaway_entries": {
+        "where": "giveaway_id IN (SELECT id FROM giveaways WHERE status = 'closed' AND end_ts < ?{scope})",
+        "age": "epoch",
+        "guild": "SELECT DISTINCT guild_id FROM giveaways WHERE status = 'closed'",
+        "id": False,
+    },
+}
+
+
+class _BufferedCursor:
+    def __init__(self, rows=None, lastrowid=None, rowcount=-1):
+        self._rows = list(rows or [])
+        self.lastrowid = lastrowid
+        self.rowcount = rowcount
 
     async def fetchone(self):
-        if not self._cur:
-            self._release_lock()
+        if not self._rows:
             return None
-        row = await self._cur.fetchone()
-        await self._cur.close()
-        self._cur = None
-        self._release_lock()
-        return row
+        return self._rows.pop(0)
 
     async def fetchall(self):
-        if not self._cur:
-            self._release_lock()
-            return []
-        rows = await self._cur.fetchall()
-        await self._cur.close()
-        self._cur = None
-        self._release_lock()
+        rows, self._rows = self._rows, []
         return rows
 
+    async def close(self):
+        self._rows = []
+
+
+class _PoolStats:
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self.waiting = 0
+        self.acquires = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, started: float):
+        waited = time.perf_counter() - started
+        self.acquires += 1
+        self.wait_total += waited
+        if waited > self.wait_max:
+            self.wait_max = waited
+        if self.metrics is not None:
+            self.metrics.record_lock_wait(waited)
+
+    def as_dict(self) -> dict:
+        return {
+            "queue_depth": int(self.waiting),
+            "acquires": int(self.acquires),
+            "wait_avg_ms": round((self.wait_total / self.acquires) * 1000, 3) if self.acquires else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+
+class _TaskWrites:
+    # Tasks mit eigenen, noch nicht committeten Schreibzugriffen. Nur sie müssen auf dem
+    # Writer lesen (read-your-writes); alle anderen lesen den committeten Stand im Pool.
+    def __init__(self):
+        self._tasks = weakref.WeakSet()
+
+    def mark(self):
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks.add(task)
+
+    def pending(self) -> bool:
+        task = asyncio.current_task()
+        return task is not None and task in self._tasks
+
+    def take(self) -> weakref.WeakSet:
+        # Vor dem Commit abräumen: wer während des Commits schreibt, bleibt markiert.
+        tasks, self._tasks = self._tasks, weakref.WeakSet()
+        return tasks
+
+    def restore(self, tasks: weakref.WeakSet):
+        self._tasks |= tasks
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+
+class _WriterGate:
+    # Database.transaction() bekommt den Writer exklusiv. Einzelne Statements anderer Tasks
+    # laufen wie bisher ohne Wartezeit, solange keine Transaktion offen ist; während einer
+    # Transaktion warten sie, damit weder Rollback noch Commit fremde Änderungen erfasst.
+    def __init__(self):
+        self._owner = None
+        self._active = 0
+        self._mutex = asyncio.Lock()
+        self._released = asyncio.Event()
+        self._released.set()
+        self._drained = asyncio.Event()
+        self._drained.set()
+
+    def owned(self) -> bool:
+        return self._owner is not None and self._owner is asyncio.current_task()
+
+    async def __aenter__(self):
+        task = asyncio.current_task()
+        while self._owner is not None and self._owner is not task:
+            await self._released.wait()
+        if self._owner is None:
+            self._active += 1
+            self._drained.clear()
+
+    async def __aexit__(self, *exc):
+        if not self.owned():
+            self._active -= 1
+            if not self._active:
+                self._drained.set()
+
+    @asynccontextmanager
+    async def exclusive(self):
+        # Nur für die Task selbst: Statements aus Kind-Tasks würden hier warten.
+        if self.owned():
+            yield
+            return
+        async with self._mutex:
+            self._owner = asyncio.current_task()
+            self._released.clear()
+            try:
+                while self._active:
+                    await self._drained.wait()
+                yield
+            finally:
+                self._owner = None
+                self._released.set()
+
+
+class _SQLiteConn:
+    def __init__(self, writer, path: str, readers: int = 0, metrics=None):
+        self._writer = writer
+        self._path = path
+        self._reader_count = max(0, int(readers or 0))
+        self._readers = []
+        self._idle = asyncio.Queue()
+        self._metrics = metrics
+        self._stats = _PoolStats(metrics)
+        self._writes = _TaskWrites()
+        self._gate = _WriterGate()
+
+    async def open_readers(self):
+        if self._readers or self._reader_count <= 0:
+            return
+        uri = "file:" + quote(os.path.abspath(self._path)) + "?mode=ro"
+        for _ in range(self._reader_count):
+            conn = await aiosqlite.connect(uri, uri=True)
+            await conn.execute("PRAGMA query_only=ON;")
+            await conn.execute("PRAGMA busy_timeout=5000;")
+            self._readers.append(conn)
+            self._idle.put_nowait(conn)
+
+    def _is_pool_read(self, sql: str) -> bool:
+        # Nicht am Transaktions-Flag des Writers festmachen: unter Group-Commit ist der
+        # fast immer offen, und dann liefe jeder Read über den Writer.
+        if not self._readers or self._writes.pending():
+            return False
+        head = sql.lstrip().upper()
+        return head.startswith("SELECT") and "LAST_INSERT_ROWID()" not in head
+
+    async def execute(self, sql: str, params=None):
+        if self._metrics is None:
+            return await self._execute(sql, params)
+        started = time.perf_counter()
+        try:
+            return await self._execute(sql, params)
+        finally:
+            self._metrics.record_statement(sql, params, time.perf_counter() - started)
+
+    async def _execute(self, sql: str, params=None):
+        if not self._is_pool_read(sql):
+            async with self._gate:
+                if not sql.lstrip().upper().startswith("SELECT"):
+                    self._writes.mark()
+                return await self._writer.execute(sql, params)
+        started = time.perf_counter()
+        self._stats.waiting += 1
+        try:
+            conn = await self._idle.get()
+        finally:
+            self._stats.waiting -= 1
+        self._stats.record(started)
+        try:
+            rows = await conn.execute_fetchall(sql, params)
+        finally:
+            self._idle.put_nowait(conn)
+        return _BufferedCursor(rows)
+
+    async def executemany(self, sql: str, seq):
+        started = time.perf_counter()
+        try:
+            async with self._gate:
+                self._writes.mark()
+                return await self._writer.executemany(sql, seq)
+        finally:
+            if self._metrics is not None:
+                self._metrics.record_statement(sql, None, time.perf_counter() - started)
+
+    async def executescript(self, sql: str):
+        async with self._gate:
+            self._writes.mark()
+            return await self._writer.executescript(sql)
+
+    async def commit(self):
+        async with self._gate:
+            marked = self._writes.take()
+            try:
+                await self._writer.commit()
+            except BaseException:
+                self._writes.restore(marked)
+                raise
+
+    async def rollback(self):
+        async with self._gate:
+            self._writes.take()
+            await self._writer.rollback()
+
+    def exclusive(self):
+        return self._gate.exclusive()
+
+    def owns_writer(self) -> bool:
+        return self._gate.owned()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._readers),
+            "free": self._idle.qsize(),
+            "writer_in_transaction": bool(self._writer.in_transaction),
+            "writer_dirty_tasks": len(self._writes),
+            **self._stats.as_dict(),
+        }
+
+    async def close(self):
+        for conn in self._readers:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+        self._readers = []
+        await self._writer.close()
+
 
 class _MySQLConn:
-    def __init__(self, conn, normalize_sql):
-        self._conn = conn
+    def __init__(self, pool, normalize_sql, metrics=None):
+        self._pool = pool
         self._normalize_sql = normalize_sql
+        self._writer = None
         self._lock = asyncio.Lock()
+        self._gate = _WriterGate()
+        self._writes = _TaskWrites()
+        self._metrics = metrics
+        self._stats = _PoolStats(metrics)
+
+    async def open(self):
+        self._writer = await self._pool.acquire()
+        await self._writer.autocommit(False)
+
+    def _is_select(self, normalized: str) -> bool:
+        return normalized.lstrip().upper().startswith("SELECT")
+
+    def _is_pool_read(self, normalized: str) -> bool:
+        if self._writes.pending() or not self._is_select(normalized):
+            return False
+        return "LAST_INSERT_ID()" not in normalized.upper()
+
+    async def _lock_writer(self):
+        started = time.perf_counter()
+        self._stats.waiting += 1
+        try:
+            await self._lock.acquire()
+        finally:
+            self._stats.waiting -= 1
+        self._stats.record(started)
+
+    async def _execute_read(self, normalized: str, params):
+        started = time.perf_counter()
+        self._stats.waiting += 1
+        try:
+            conn = await self._pool.acquire()
+        finally:
+            self._stats.waiting -= 1
+        self._stats.record(started)
+        try:
+            async with conn.cursor() as cur:
+                await cur.execute(normalized, params or ())
+                rows = await cur.fetchall()
+        finally:
+            self._pool.release(conn)
+        return _BufferedCursor(rows)
 
     async def execute(self, sql: str, params=None):
         normalized = self._normalize_sql(sql)
-        await self._lock.acquire()
-        cur = await self._conn.cursor()
+        if self._metrics is None:
+            return await self._execute(normalized, params)
+        started = time.perf_counter()
+        try:
+            return await self._execute(normalized, params)
+        finally:
+            self._metrics.record_statement(normalized, params, time.perf_counter() - started)
+
+    async def _execute(self, normalized: str, params=None):
+        if self._is_pool_read(normalized):
+            return await self._execute_read(normalized, params)
+        async with self._gate:
+            return await self._execute_writer(normalized, params)
+
+    async def _execute_writer(self, normalized: str, params=None):
+        await self._lock_writer()
         try:
-            await cur.execute(normalized, params or ())
-        except Exception as exc:
-            if normalized.lstrip().upper().startswith("CREATE INDEX"):
-                if hasattr(exc, "args") and exc.args:
-                    code = exc.args[0]
-                    if code == 1061:
-                        await cur.close()
-                        self._lock.release()
-                        return _MySQLCursor(None)
-            await cur.close()
+            cur = await self._writer.cursor()
+            try:
+                try:
+                    await cur.execute(normalized, params or ())
+                except Exception as exc:
+                    if normalized.lstrip().upper().startswith("CREATE INDEX"):
+                        if hasattr(exc, "args") and exc.args and exc.args[0] == 1061:
+                            return _BufferedCursor()
+                    raise
+                if self._is_select(normalized):
+                    return _BufferedCursor(await cur.fetchall())
+                self._writes.mark()
+                return _BufferedCursor(lastrowid=cur.lastrowid, rowcount=cur.rowcount)
+            finally:
+                await cur.close()
+        finally:
             self._lock.release()
-            raise
-        if normalized.lstrip().upper().startswith("SELECT"):
-            return _MySQLCursor(cur, lock=self._lock)
-        lastrowid = cur.lastrowid
-        await cur.close()
-        self._lock.release()
-        return _MySQLCursor(None, lastrowid=lastrowid)
 
     async def executemany(self, sql: str, seq):
         normalized = self._normalize_sql(sql)
-        async with self._lock:
-            cur = await self._conn.cursor()
-            await cur.executemany(normalized, seq)
-            await cur.close()
+        started = time.perf_counter()
+        async with self._gate:
+            await self._lock_writer()
+            try:
+                cur = await self._writer.cursor()
+                try:
+                    await cur.executemany(normalized, seq)
+                    self._writes.mark()
+                finally:
+                    await cur.close()
+            finally:
+                self._lock.release()
+                if self._metrics is not None:
+                    self._metrics.record_statement(normalized, None, time.perf_counter() - started)
 
     async def commit(self):
-        async with self._lock:
-            await self._conn.commit()
+        async with self._gate:
+            await self._lock_writer()
+            marked = self._writes.take()
+            try:
+                await self._writer.commit()
+            except BaseException:
+                self._writes.restore(marked)
+                raise
+            finally:
+                self._lock.release()
+
+    async def rollback(self):
+        async with self._gate:
+            await self._lock_writer()
+            try:
+                self._writes.take()
+                await self._writer.rollback()
+            finally:
+                self._lock.release()
+
+    def exclusive(self):
+        return self._gate.exclusive()
+
+    def owns_writer(self) -> bool:
+        return self._gate.owned()
+
+    def stats(self) -> dict:
+        return {
+            "size": int(self._pool.size),
+            "free": int(self._pool.freesize),
+            "min_size": int(self._pool.minsize),
+            "max_size": int(self._pool.maxsize),
+            "writer_dirty_tasks": len(self._writes),
+            **self._stats.as_dict(),
+        }
 
     async def close(self):
-        self._conn.close()
+        if self._writer is not None:
+            self._pool.release(self._writer)
+            self._writer = None
+        self._pool.close()
+        await self._pool.wait_closed()
 
 
 class Database:
-    def __init__(self, path: str | None = None, mysql: dict | None = None):
+    def __init__(
+        self,
+        path: str | None = None,
+        mysql: dict | None = None,
+        group_commit: dict | None = None,
+        read_pool_size: int = 0,
+        metrics: dict | None = None,
+    ):
         self.path = path
         self.mysql = mysql or None
+        self.read_pool_size = max(0, int(read_pool_size or 0))
         self._driver = "mysql" if mysql else "sqlite"
         self._conn = None
         self._mysql_db = None
+        group_cfg = group_commit or {}
+        self._group_commit = bool(group_cfg.get("enabled", False))
+        self._group_max_writes = max(1, int(group_cfg.get("max_writes", 200) or 200))
+        self._group_max_delay = max(1, int(group_cfg.get("max_delay_ms", 250) or 250)) / 1000.0
+        self._pending_writes = 0
+        self._flush_task = None
+        self._tx_owner = None
+        self._statements = StatementCache(mysql_statement)
+        metrics_cfg = metrics or {}
+        self.metrics = QueryMetrics(metrics_cfg) if metrics_cfg.get("enabled", False) else None
+
+    @classmethod
+    def from_settings(cls, settings) -> "Database":
+        db_type = str(settings.get("database.type", "sqlite") or "sqlite").lower()
+        group_commit_cfg = settings.get("database.group_commit", {}) or {}
+        metrics_cfg = settings.get("database.metrics", {}) or {}
+        if db_type == "mysql":
+            return cls(
+                mysql=settings.get("database.mysql", {}) or {},
+                group_commit=group_commit_cfg,
+                metrics=metrics_cfg,
+            )
+        return cls(
+            path=str(settings.get("database.sqlite_path", "data/starry.db") or "data/starry.db"),
+            group_commit=group_commit_cfg,
+            read_pool_size=int(settings.get("database.sqlite_readers", 2) or 0),
+            metrics=metrics_cfg,
+        )
 
-    async def init(self):
+    async def init(self) -> list[int]:
+        await self.connect()
+        applied = await self.migrate()
+        if self._driver == "sqlite":
+            await self._conn.open_readers()
+        return applied
+
+    async def connect(self):
         if self._driver == "sqlite":
             path = self.path or "data/starry.db"
             os.makedirs(os.path.dirname(path), exist_ok=True)
-            self._conn = await aiosqlite.connect(path)
+            self._conn = _SQLiteConn(
+                await aiosqlite.connect(path),
+                path,
+                readers=self.read_pool_size,
+                metrics=self.metrics,
+            )
             await self._conn.execute("PRAGMA journal_mode=WAL;")
             await self._conn.execute("PRAGMA foreign_keys=ON;")
         else:
             cfg = self.mysql or {}
+            pool_cfg = cfg.get("pool", {}) or {}
             self._mysql_db = str(cfg.get("database", "") or "")
+            min_size = max(2, int(pool_cfg.get("min_size", 2) or 2))
             self._conn = _MySQLConn(
-                await aiomysql.connect(
+                await aiomysql.create_pool(
                     host=str(cfg.get("host", "127.0.0.1")),
                     port=int(cfg.get("port", 3306)),
                     user=str(cfg.get("user", "root")),
                     password=str(cfg.get("password", "")),
                     db=self._mysql_db,
                     charset=str(cfg.get("charset", "utf8mb4")),
-                    autocommit=False,
+                    autocommit=True,
+                    minsize=min_size,
+                    maxsize=max(min_size, int(pool_cfg.get("max_size", 10) or 10)),
+                    pool_recycle=int(pool_cfg.get("recycle_seconds", 3600) or -1),
                 ),
                 self._normalize_sql,
+                metrics=self.metrics,
             )
+            await self._conn.open()
+
+    async def schema_version(self) -> int:
+        try:
+            cur = await self._conn.execute(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE};")
+            row = await cur.fetchone()
+        except Exception:
+            return 0
+        return int(row[0]) if row and row[0] is not None else 0
+
+    async def migrate(self) -> list[int]:
+        current = await self.schema_version()
+        if current >= LATEST_VERSION:
+            return []
         if self._driver == "mysql":
             try:
                 await self._conn.execute("SET SESSION sql_notes = 0")
             except Exception:
                 pass
-        await self._create_tables()
-        if self._driver == "mysql":
-            try:
-                await self._conn.execute("SET SESSION sql_notes = 1")
-            except Exception:
-                pass
-        await self._conn.commit()
+        applied = []
+        try:
+            await self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(128) NOT NULL,
+                applied_at TEXT NOT NULL
+            );
+            """)
+            for migration in pending_for(current):
+                step = migration.step_for(self._driver)
+                if step is not None:
+                    await step(self)
+                await self._conn.execute(
+                    f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name, applied_at) VALUES (?, ?, ?);",
+                    (int(migration.version), str(migration.name), datetime.now(timezone.utc).isoformat()),
+                )
+                await self._conn.commit()
+                applied.append(int(migration.version))
+        finally:
+            if self._driver == "mysql":
+                try:
+                    await self._conn.execute("SET SESSION sql_notes = 1")
+                except Exception:
+                    pass
+        return applied
 
     async def close(self):
         if not self._conn:
             return
+        try:
+            await self.flush()
+        except Exception:
+            pass
         try:
             await self._conn.close()
         except Exception:
             pass
         self._conn = None
+        if self.metrics is not None:
+            await self.metrics.flush_slow_log()
+
+    def pool_stats(self) -> dict:
+        if self._conn is not None and hasattr(self._conn, "stats"):
+            return self._conn.stats()
+        return {}
+
+    def query_metrics(self, top: int | None = None, sort: str = "p95_ms") -> dict:
+        if self.metrics is None:
+            return {}
+        return self.metrics.snapshot(top=top, sort=sort)
+
+    def _owns_transaction(self) -> bool:
+        return self._tx_owner is not None and self._tx_owner is asyncio.current_task()
+
+    @asynccontextmanager
+    async def transaction(self):
+        # Alles im Block wird gemeinsam committet oder bei einer Exception zurückgerollt.
+        # Der Writer gehört so lange dieser Task; andere Schreiber warten, Leser im Pool
+        # sehen den alten Stand. Verschachtelt zählt nur die äußerste Transaktion.
+        if self._owns_transaction():
+            yield self
+            return
+        async with self._conn.exclusive():
+            # Offene Group-Commit-Schreibvorgänge anderer Tasks vorher festschreiben,
+            # damit ein Rollback nur diesen Block trifft.
+            self._pending_writes = 0
+            await self._conn.commit()
+            self._tx_owner = asyncio.current_task()
+            try:
+                yield self
+            except BaseException:
+                self._pending_writes = 0
+                await self._conn.rollback()
+                raise
+            else:
+                await self._conn.commit()
+            finally:
+                self._tx_owner = None
+
+    async def _commit(self, flush: bool = False):
+        if self._owns_transaction():
+            return
+        if not self._group_commit:
+            await self._conn.commit()
+            return
+        self._pending_writes += 1
+        if flush or self._pending_writes >= self._group_max_writes:
+            await self.flush()
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        reset_current_method()
+        await asyncio.sleep(self._group_max_delay)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            pass
+
+    async def flush(self):
+        task = self._flush_task
+        self._flush_task = None
+        if task and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+        if not self._conn or self._pending_writes <= 0 or self._owns_transaction():
+            return
+        self._pending_writes = 0
+        await self._conn.commit()
 
     def _normalize_sql(self, sql: str) -> str:
         if self._driver != "mysql":
             return sql
-        stripped = sql.lstrip().upper()
-        if stripped.startswith("CREATE TABLE") or stripped.startswith("CREATE INDEX"):
-            return self._normalize_ddl(sql)
-        normalized = sql
-        normalized = normalized.replace("INSERT OR IGNORE", "INSERT IGNORE")
-        normalized = normalized.replace("INSERT OR REPLACE", "REPLACE")
-        normalized = re.sub(
-            r"ON\s+CONFLICT\s*\([^\)]*\)\s+DO\s+UPDATE\s+SET",
-            "ON DUPLICATE KEY UPDATE",
-            normalized,
-            flags=re.IGNORECASE,
-        )
-        normalized = re.sub(r"excluded\.([A-Za-z0-9_]+)", r"VALUES(\1)", normalized, flags=re.IGNORECASE)
-        normalized = normalized.replace("last_insert_rowid()", "LAST_INSERT_ID()")
-        normalized = normalized.replace("?", "%s")
-        return normalized
-
-    def _normalize_ddl(self, sql: str) -> str:
-        if self._driver != "mysql":
-            return sql
-        normalized = sql
-        normalized = re.sub(
-            r"CREATE\s+INDEX\s+IF\s+NOT\s+EXISTS",
-            "CREATE INDEX",
-            normalized,
-            flags=re.IGNORECASE,
-        )
-        normalized = re.sub(
-            r"INTEGER\s+PRIMARY\s+KEY\s+AUTOINCREMENT",
-            "BIGINT AUTO_INCREMENT PRIMARY KEY",
-            normalized,
-            flags=re.IGNORECASE,
-        )
-        normalized = re.sub(r"\bINTEGER\b", "BIGINT", normalized, flags=re.IGNORECASE)
-        normalized = normalized.replace("AUTOINCREMENT", "AUTO_INCREMENT")
-        return normalized
+        return self._statements.get(sql)
+
+    def statement_cache_stats(self) -> dict:
+        return self._statements.stats()
 
     async def _create_tables(self):
         await self._conn.execute("""
@@ -860,7 +1365,6 @@ class Database:
         await self._ensure_column("parliament_parties", "manifesto_attachments_json", "TEXT")
         await self._ensure_column("parliament_parties", "thread_info_message_id", "INTEGER")
         await self._ensure_column("parliament_parties", "party_role_id", "INTEGER")
-        await self._ensure_parliament_party_bigint_columns()
         await self._conn.commit()
 
     async def _ensure_flag_quiz_columns(self):
@@ -902,6 +1406,129 @@ class Database:
             except Exception:
                 continue
 
+    async def _ensure_epoch_columns(self):
+        await self._ensure_column("user_stats", "last_message_ts", "BIGINT")
+        await self._ensure_column("user_stats", "last_voice_ts", "BIGINT")
+        await self._ensure_column("user_stats", "last_active_ts", "BIGINT")
+        await self._ensure_column("reminders", "remind_ts", "BIGINT")
+        await self._ensure_column("afk_status", "until_ts", "BIGINT")
+        await self._ensure_column("giveaways", "end_ts", "BIGINT")
+        await self._ensure_column("polls", "end_ts", "BIGINT")
+        await self._ensure_column("tickets", "last_activity_ts", "BIGINT")
+
+        cur = await self._conn.execute("""
+        SELECT guild_id, user_id, last_message_at, last_voice_at FROM user_stats
+        WHERE last_active_ts IS NULL AND (last_message_at IS NOT NULL OR last_voice_at IS NOT NULL);
+        """)
+        params = []
+        for guild_id, user_id, msg_at, voice_at in await cur.fetchall():
+            msg_ts = _to_epoch(msg_at)
+            voice_ts = _to_epoch(voice_at)
+            active = max((v for v in (msg_ts, voice_ts) if v is not None), default=None)
+            params.append((msg_ts, voice_ts, active, int(guild_id), int(user_id)))
+        if params:
+            await self._conn.executemany("""
+            UPDATE user_stats SET last_message_ts = ?, last_voice_ts = ?, last_active_ts = ?
+            WHERE guild_id = ? AND user_id = ?;
+            """, params)
+        await self._backfill_epoch("reminders", ("id",), "remind_at", "remind_ts")
+        await self._backfill_epoch("afk_status", ("guild_id", "user_id"), "until_at", "until_ts")
+        await self._backfill_epoch("giveaways", ("id",), "end_at", "end_ts")
+        await self._backfill_epoch("polls", ("id",), "end_at", "end_ts")
+        await self._backfill_epoch("tickets", ("id",), "COALESCE(last_activity_at, created_at)", "last_activity_ts")
+
+        await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_user_stats_active_ts ON user_stats(last_active_ts)")
+        await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_user_stats_guild_active_ts ON user_stats(guild_id, last_active_ts)")
+        await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reminders_due_ts ON reminders(remind_ts)")
+        await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_afk_status_until_ts ON afk_status(until_ts)")
+        await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_giveaways_end_ts ON giveaways(end_ts)")
+        await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_polls_end_ts ON polls(end_ts)")
+        await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_activity_ts ON tickets(last_activity_ts)")
+
+    async def _create_activity_tables(self):
+        # channel_id = 0 ist die Summe der ganzen Gilde, bucket_ts = Stunden- bzw. Tagesbeginn (UTC).
+        for table in ("activity_hourly", "activity_daily"):
+            await self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                guild_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL,
+                bucket_ts INTEGER NOT NULL,
+                messages INTEGER NOT NULL DEFAULT 0,
+                active_users INTEGER NOT NULL DEFAULT 0,
+                voice_seconds INTEGER NOT NULL DEFAULT 0,
+                joins INTEGER NOT NULL DEFAULT 0,
+                leaves INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (guild_id, channel_id, bucket_ts)
+            );
+            """)
+        await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_activity_hourly_bucket ON activity_hourly(bucket_ts)")
+
+    async def _create_runtime_state_table(self):
+        await self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS runtime_state (
+            guild_id INTEGER NOT NULL,
+            scope VARCHAR(64) NOT NULL,
+            state_key VARCHAR(191) NOT NULL,
+            value_json TEXT NOT NULL,
+            expires_ts INTEGER,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (guild_id, scope, state_key)
+        );
+        """)
+        await self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runtime_state_expires ON runtime_state(expires_ts)")
+
+    async def _create_scheduled_jobs_table(self):
+        await self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            kind VARCHAR(32) NOT NULL,
+            ref VARCHAR(191) NOT NULL,
+            guild_id INTEGER NOT NULL DEFAULT 0,
+            due_ts BIGINT NOT NULL,
+            payload_json TEXT,
+            PRIMARY KEY (kind, ref)
+        );
+        """)
+        # Offene Fristen aus der Zeit vor dem Scheduler übernehmen.
+        jobs = []
+        cur = await self._conn.execute("SELECT id, guild_id, end_ts FROM giveaways WHERE status = 'open' AND end_ts IS NOT NULL;")
+        jobs += [("giveaway_end", str(r[0]), int(r[1]), int(r[2])) for r in await cur.fetchall()]
+        cur = await self._conn.execute("SELECT id, guild_id, end_ts FROM polls WHERE status = 'open' AND end_ts IS NOT NULL;")
+        jobs += [("poll_end", str(r[0]), int(r[1]), int(r[2])) for r in await cur.fetchall()]
+        cur = await self._conn.execute("SELECT id, guild_id, remind_ts FROM reminders WHERE delivered_at IS NULL AND remind_ts IS NOT NULL;")
+        jobs += [("reminder", str(r[0]), int(r[1]), int(r[2])) for r in await cur.fetchall()]
+        cur = await self._conn.execute("SELECT guild_id, user_id, until_ts FROM afk_status WHERE until_ts IS NOT NULL;")
+        jobs += [("afk_expiry", f"{int(r[0])}:{int(r[1])}", int(r[0]), int(r[2])) for r in await cur.fetchall()]
+        if jobs:
+            await self._conn.executemany("""
+            INSERT INTO scheduled_jobs (kind, ref, guild_id, due_ts, payload_json)
+            VALUES (?, ?, ?, ?, NULL)
+            ON CONFLICT(kind, ref) DO UPDATE SET due_ts = excluded.due_ts;
+            """, jobs)
+
+    async def _backfill_epoch(self, table: str, keys: tuple[str, ...], source: str, target: str):
+        cur = await self._conn.execute(
+            f"SELECT {', '.join(keys)}, {source} FROM {table} WHERE {target} IS NULL;"
+        )
+        params = []
+        for row in await cur.fetchall():
+            ts = _to_epoch(row[-1])
+            if ts is not None:
+                params.append((ts, *row[:-1]))
+        if params:
+            where = " AND ".join(f"{k} = ?" for k in keys)
+            await self._conn.executemany(f"UPDATE {table} SET {target} = ? WHERE {where};", params)
+
+    async def _enable_incremental_vacuum(self):
+        if self._driver != "sqlite":
+            return
+        cur = await self._conn.execute("PRAGMA auto_vacuum;")
+        row = await cur.fetchone()
+        if row and int(row[0]) == 2:
+            return
+        await self._conn.commit()
+        await self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+        await self._conn.execute("VACUUM;")
+
     async def _ensure_birthdays_global_seed(self):
         try:
             cur = await self._conn.execute("SELECT COUNT(*) FROM birthdays_global;")
@@ -943,16 +1570,18 @@ class Database:
         await self._conn.execute("""
         INSERT INTO tickets (
             guild_id, user_id, forum_channel_id, thread_id, summary_message_id,
-            category_key, status, created_at, priority, last_activity_at, last_user_message_at
+            category_key, status, created_at, priority, last_activity_at, last_user_message_at,
+            last_activity_ts
         )
-        VALUES (?, ?, ?, ?, ?, ?, 'open', ?, 2, ?, ?);
-        """, (guild_id, user_id, forum_channel_id, thread_id, summary_message_id, category_key, created_at, created_at, created_at))
+        VALUES (?, ?, ?, ?, ?, ?, 'open', ?, 2, ?, ?, ?);
+        """, (guild_id, user_id, forum_channel_id, thread_id, summary_message_id, category_key, created_at, created_at, created_at,
+              _to_epoch(created_at)))
         await self._conn.execute("""
         INSERT INTO ticket_stats (user_id, total_tickets)
         VALUES (?, 1)
         ON CONFLICT(user_id) DO UPDATE SET total_tickets = total_tickets + 1;
         """, (user_id,))
-        await self._conn.commit()
+        await self._commit(flush=True)
         cur = await self._conn.execute("SELECT last_insert_rowid();")
         row = await cur.fetchone()
         return int(row[0])
@@ -1010,7 +1639,7 @@ class Database:
             UPDATE tickets SET claimed_by = ?, status = 'claimed'
             WHERE id = ?;
             """, (staff_id, ticket_id))
-        await self._conn.commit()
+        await self._commit()
 
     async def close_ticket(self, ticket_id: int):
         closed_at = await self.now_iso()
@@ -1018,35 +1647,35 @@ class Database:
         UPDATE tickets SET status = 'closed', closed_at = ?
         WHERE id = ?;
         """, (closed_at, ticket_id))
-        await self._conn.commit()
+        await self._commit()
 
     async def reopen_ticket(self, ticket_id: int):
         await self._conn.execute("""
         UPDATE tickets SET status = 'open', closed_at = NULL
         WHERE id = ?;
         """, (ticket_id,))
-        await self._conn.commit()
+        await self._commit()
 
     async def set_status_label(self, ticket_id: int, status_label: str | None):
         await self._conn.execute("""
         UPDATE tickets SET status_label = ?
         WHERE id = ?;
         """, (status_label, ticket_id))
-        await self._conn.commit()
+        await self._commit()
 
     async def set_priority(self, ticket_id: int, priority: int):
         await self._conn.execute("""
         UPDATE tickets SET priority = ?
         WHERE id = ?;
         """, (priority, ticket_id))
-        await self._conn.commit()
+        await self._commit()
 
     async def set_category_key(self, ticket_id: int, category_key: str):
         await self._conn.execute("""
         UPDATE tickets SET category_key = ?
         WHERE id = ?;
         """, (category_key, ticket_id))
-        await self._conn.commit()
+        await self._commit()
 
     async def set_escalation(self, ticket_id: int, level: int, actor_id: int | None):
         now = await self.now_iso()
@@ -1054,37 +1683,37 @@ class Database:
         UPDATE tickets SET escalated_level = ?, escalated_by = ?, escalated_at = ?
         WHERE id = ?;
         """, (level, actor_id, now, ticket_id))
-        await self._conn.commit()
+        await self._commit()
 
     async def set_last_activity(self, ticket_id: int, when_iso: str):
         await self._conn.execute("""
-        UPDATE tickets SET last_activity_at = ?
+        UPDATE tickets SET last_activity_at = ?, last_activity_ts = ?
         WHERE id = ?;
-        """, (when_iso, ticket_id))
-        await self._conn.commit()
+        """, (when_iso, _to_epoch(when_iso), ticket_id))
+        await self._commit()
 
     async def set_last_user_message(self, ticket_id: int, when_iso: str):
         await self._conn.execute("""
-        UPDATE tickets SET last_user_message_at = ?, last_activity_at = ?
+        UPDATE tickets SET last_user_message_at = ?, last_activity_at = ?, last_activity_ts = ?
         WHERE id = ?;
-        """, (when_iso, when_iso, ticket_id))
-        await self._conn.commit()
+        """, (when_iso, when_iso, _to_epoch(when_iso), ticket_id))
+        await self._commit()
 
     async def set_last_staff_message(self, ticket_id: int, when_iso: str):
         await self._conn.execute("""
         UPDATE tickets
-        SET last_staff_message_at = ?, last_activity_at = ?,
+        SET last_staff_message_at = ?, last_activity_at = ?, last_activity_ts = ?,
             first_staff_reply_at = COALESCE(first_staff_reply_at, ?)
         WHERE id = ?;
-        """, (when_iso, when_iso, when_iso, ticket_id))
-        await self._conn.commit()
+        """, (when_iso, when_iso, _to_epoch(when_iso), when_iso, ticket_id))
+        await self._commit()
 
     async def set_sla_breached(self, ticket_id: int, when_iso: str):
         await self._conn.execute("""
         UPDATE tickets SET sla_breached_at = ?
         WHERE id = ?;
         """, (when_iso, ticket_id))
-        await self._conn.commit()
+        await self._commit()
 
     async def list_active_tickets(self, limit: int = 500):
         cur = await self._conn.execute("""
@@ -1099,12 +1728,49 @@ class Database:
         rows = await cur.fetchall()
         return rows
 
+    async def list_idle_tickets(self, guild_id: int, before_ts: int, limit: int = 500):
+        # Auto-Close-Kandidaten: Bereichsscan über idx_tickets_activity_ts, Spalten wie list_active_tickets.
+        cur = await self._conn.execute("""
+        SELECT id, guild_id, user_id, thread_id, status, claimed_by, category_key,
+               created_at, last_activity_at, last_user_message_at, last_staff_message_at,
+               first_staff_reply_at, sla_breached_at, priority, status_label, escalated_level
+        FROM tickets
+        WHERE last_activity_ts < ? AND guild_id = ? AND status IN ('open','claimed')
+        ORDER BY last_activity_ts
+        LIMIT ?;
+        """, (int(before_ts), int(guild_id), int(limit)))
+        return await cur.fetchall()
+
+    async def oldest_ticket_activity_ts(self, guild_id: int) -> int | None:
+        cur = await self._conn.execute("""
+        SELECT last_activity_ts FROM tickets
+        WHERE last_activity_ts IS NOT NULL AND guild_id = ? AND status IN ('open','claimed')
+        ORDER BY last_activity_ts
+        LIMIT 1;
+        """, (int(guild_id),))
+        row = await cur.fetchone()
+        return int(row[0]) if row else None
+
+    async def list_tickets_awaiting_response(self, guild_id: int, limit: int = 500):
+        # SLA-Kandidaten: offen, noch keine Team-Antwort und noch nicht als überschritten markiert.
+        cur = await self._conn.execute("""
+        SELECT id, guild_id, user_id, thread_id, status, claimed_by, category_key,
+               created_at, last_activity_at, last_user_message_at, last_staff_message_at,
+               first_staff_reply_at, sla_breached_at, priority, status_label, escalated_level
+        FROM tickets
+        WHERE guild_id = ? AND status IN ('open','claimed')
+          AND first_staff_reply_at IS NULL AND sla_breached_at IS NULL
+        ORDER BY id
+        LIMIT ?;
+        """, (int(guild_id), int(limit)))
+        return await cur.fetchall()
+
     async def set_rating(self, ticket_id: int, rating: int, comment: str | None):
         await self._conn.execute("""
         UPDATE tickets SET rating = ?, rating_comment = ?
         WHERE id = ?;
         """, (rating, comment, ticket_id))
-        await self._conn.commit()
+        await self._commit()
 
     async def get_ticket_count(self, user_id: int) -> int:
         cur = await self._conn.execute("SELECT total_tickets FROM ticket_stats WHERE user_id = ? LIMIT 1;", (user_id,))
@@ -1145,7 +1811,7 @@ class Database:
                 now,
             ),
         )
-        await self._conn.commit()
+        await self._commit(flush=True)
         cur = await self._conn.execute("SELECT last_insert_rowid();")
         row = await cur.fetchone()
         return int(row[0] if row else 0)
@@ -1160,7 +1826,7 @@ class Database:
             """,
             (int(summary_message_id), int(vote_message_id), now, int(suggestion_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_suggestion(self, suggestion_id: int):
         cur = await self._conn.execute(
@@ -1214,7 +1880,7 @@ class Database:
             """,
             (str(status), now, int(suggestion_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_suggestion_admin_response(self, suggestion_id: int, response: str | None):
         now = await self.now_iso()
@@ -1226,7 +1892,7 @@ class Database:
             """,
             (response if response is None else str(response), now, int(suggestion_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_suggestion_votes(self, suggestion_id: int, upvotes: int, downvotes: int):
         now = await self.now_iso()
@@ -1238,7 +1904,7 @@ class Database:
             """,
             (int(upvotes), int(downvotes), now, int(suggestion_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def list_suggestions(self, guild_id: int, limit: int = 2000):
         cur = await self._conn.execute(
@@ -1261,25 +1927,64 @@ class Database:
             guild_id, user_id, message_count, voice_seconds, welcome_count, xp, level
         ) VALUES (?, ?, 0, 0, 0, 0, 0);
         """, (int(guild_id), int(user_id)))
-        await self._conn.commit()
+        await self._commit()
 
     async def increment_message(self, guild_id: int, user_id: int, channel_id: int, xp_delta: int):
         now = await self.now_iso()
         await self._conn.execute("""
-        INSERT INTO user_stats (guild_id, user_id, message_count, voice_seconds, welcome_count, xp, level, last_message_at)
-        VALUES (?, ?, 1, 0, 0, ?, 0, ?)
+        INSERT INTO user_stats (
+            guild_id, user_id, message_count, voice_seconds, welcome_count, xp, level,
+            last_message_at, last_message_ts, last_active_ts
+        )
+        VALUES (?, ?, 1, 0, 0, ?, 0, ?, ?, ?)
         ON CONFLICT(guild_id, user_id) DO UPDATE SET
             message_count = message_count + 1,
             xp = xp + excluded.xp,
-            last_message_at = excluded.last_message_at;
-        """, (int(guild_id), int(user_id), int(xp_delta), now))
+            last_message_at = excluded.last_message_at,
+            last_message_ts = excluded.last_message_ts,
+            last_active_ts = excluded.last_active_ts;
+        """, (int(guild_id), int(user_id), int(xp_delta), now, _to_epoch(now), _to_epoch(now)))
         await self._conn.execute("""
         INSERT INTO user_channel_stats (guild_id, user_id, channel_id, message_count)
         VALUES (?, ?, ?, 1)
         ON CONFLICT(guild_id, user_id, channel_id) DO UPDATE SET
             message_count = message_count + 1;
         """, (int(guild_id), int(user_id), int(channel_id)))
-        await self._conn.commit()
+        await self._commit()
+
+    async def apply_message_batch(self, user_rows: list[tuple], channel_rows: list[tuple]):
+        # user_rows: (guild_id, user_id, messages, welcomes, xp, last_message_at)
+        # channel_rows: (guild_id, user_id, channel_id, messages)
+        if user_rows:
+            await self._conn.executemany("""
+            INSERT INTO user_stats (
+                guild_id, user_id, message_count, voice_seconds, welcome_count, xp, level,
+                last_message_at, last_message_ts, last_active_ts
+            )
+            VALUES (?, ?, ?, 0, ?, ?, 0, ?, ?, ?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                message_count = message_count + excluded.message_count,
+                welcome_count = welcome_count + excluded.welcome_count,
+                xp = xp + excluded.xp,
+                last_message_at = excluded.last_message_at,
+                last_message_ts = excluded.last_message_ts,
+                last_active_ts = excluded.last_active_ts;
+            """, [
+                (
+                    int(g), int(u), int(messages), int(welcomes), int(xp),
+                    last_at, _to_epoch(last_at), _to_epoch(last_at),
+                )
+                for g, u, messages, welcomes, xp, last_at in user_rows
+            ])
+        if channel_rows:
+            await self._conn.executemany("""
+            INSERT INTO user_channel_stats (guild_id, user_id, channel_id, message_count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id, user_id, channel_id) DO UPDATE SET
+                message_count = message_count + excluded.message_count;
+            """, [(int(g), int(u), int(c), int(n)) for g, u, c, n in channel_rows])
+        if user_rows or channel_rows:
+            await self._commit(flush=True)
 
     async def increment_welcome(self, guild_id: int, user_id: int):
         await self._conn.execute("""
@@ -1288,7 +1993,7 @@ class Database:
         ON CONFLICT(guild_id, user_id) DO UPDATE SET
             welcome_count = welcome_count + 1;
         """, (int(guild_id), int(user_id)))
-        await self._conn.commit()
+        await self._commit()
 
     async def increment_invite(self, guild_id: int, user_id: int):
         await self._conn.execute("""
@@ -1297,7 +2002,7 @@ class Database:
         ON CONFLICT(guild_id, user_id) DO UPDATE SET
             invite_count = invite_count + 1;
         """, (int(guild_id), int(user_id)))
-        await self._conn.commit()
+        await self._commit()
 
     async def increment_invite_left(self, guild_id: int, user_id: int):
         await self._conn.execute("""
@@ -1306,19 +2011,24 @@ class Database:
         ON CONFLICT(guild_id, user_id) DO UPDATE SET
             invite_left_count = invite_left_count + 1;
         """, (int(guild_id), int(user_id)))
-        await self._conn.commit()
+        await self._commit()
 
     async def add_voice_seconds(self, guild_id: int, user_id: int, seconds: int, xp_delta: int):
         now = await self.now_iso()
         await self._conn.execute("""
-        INSERT INTO user_stats (guild_id, user_id, message_count, voice_seconds, welcome_count, xp, level, last_voice_at)
-        VALUES (?, ?, 0, ?, 0, ?, 0, ?)
+        INSERT INTO user_stats (
+            guild_id, user_id, message_count, voice_seconds, welcome_count, xp, level,
+            last_voice_at, last_voice_ts, last_active_ts
+        )
+        VALUES (?, ?, 0, ?, 0, ?, 0, ?, ?, ?)
         ON CONFLICT(guild_id, user_id) DO UPDATE SET
             voice_seconds = voice_seconds + excluded.voice_seconds,
             xp = xp + excluded.xp,
-            last_voice_at = excluded.last_voice_at;
-        """, (int(guild_id), int(user_id), int(seconds), int(xp_delta), now))
-        await self._conn.commit()
+            last_voice_at = excluded.last_voice_at,
+            last_voice_ts = excluded.last_voice_ts,
+            last_active_ts = excluded.last_active_ts;
+        """, (int(guild_id), int(user_id), int(seconds), int(xp_delta), now, _to_epoch(now), _to_epoch(now)))
+        await self._commit()
 
     async def get_user_stats(self, guild_id: int, user_id: int):
         cur = await self._conn.execute("""
@@ -1332,7 +2042,26 @@ class Database:
         await self._conn.execute("""
         UPDATE user_stats SET level = ? WHERE guild_id = ? AND user_id = ?;
         """, (int(level), int(guild_id), int(user_id)))
-        await self._conn.commit()
+        await self._commit()
+
+    async def ensure_user_stats_rows(self, guild_id: int, user_ids: list[int]):
+        if not user_ids:
+            return
+        await self._conn.executemany("""
+        INSERT OR IGNORE INTO user_stats (
+            guild_id, user_id, message_count, voice_seconds, welcome_count, xp, level
+        ) VALUES (?, ?, 0, 0, 0, 0, 0);
+        """, [(int(guild_id), int(u)) for u in user_ids])
+        await self._commit(flush=True)
+
+    async def set_user_levels(self, guild_id: int, levels: list[tuple[int, int]]):
+        # levels: (user_id, level)
+        if not levels:
+            return
+        await self._conn.executemany("""
+        UPDATE user_stats SET level = ? WHERE guild_id = ? AND user_id = ?;
+        """, [(int(level), int(guild_id), int(u)) for u, level in levels])
+        await self._commit(flush=True)
 
     async def list_user_channel_stats(self, guild_id: int, user_id: int, limit: int = 10):
         cur = await self._conn.execute("""
@@ -1355,7 +2084,7 @@ class Database:
             """,
             (int(guild_id), int(member_id), int(inviter_id), str(invite_code), str(joined_at)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_invite_join(self, guild_id: int, member_id: int):
         cur = await self._conn.execute(
@@ -1377,7 +2106,7 @@ class Database:
             """,
             (str(left_at), int(guild_id), int(member_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def count_users_with_messages_at_least(self, guild_id: int, count: int):
         cur = await self._conn.execute("""
@@ -1393,6 +2122,29 @@ class Database:
         row = await cur.fetchone()
         return int(row[0] if row else 0)
 
+    async def count_active_users(self, since_seconds: int = 86400, guild_id: int | None = None) -> int:
+        since_ts = int(time.time()) - int(since_seconds)
+        if guild_id is None:
+            cur = await self._conn.execute(
+                "SELECT COUNT(*) FROM user_stats WHERE last_active_ts >= ?;",
+                (since_ts,),
+            )
+        else:
+            cur = await self._conn.execute(
+                "SELECT COUNT(*) FROM user_stats WHERE guild_id = ? AND last_active_ts >= ?;",
+                (int(guild_id), since_ts),
+            )
+        row = await cur.fetchone()
+        return int(row[0] if row else 0)
+
+    async def list_user_stats_for_guild(self, guild_id: int):
+        cur = await self._conn.execute("""
+        SELECT guild_id, user_id, message_count, voice_seconds, welcome_count, xp, level,
+               last_message_at, last_voice_at, invite_count, invite_left_count
+        FROM user_stats WHERE guild_id = ?;
+        """, (int(guild_id),))
+        return await cur.fetchall()
+
     async def count_users_in_stats(self, guild_id: int):
         cur = await self._conn.execute("""
         SELECT COUNT(*) FROM user_stats WHERE guild_id = ?;
@@ -1415,13 +2167,140 @@ class Database:
             channel_id = excluded.channel_id,
             joined_at = excluded.joined_at;
         """, (int(guild_id), int(user_id), int(channel_id), str(joined_at)))
-        await self._conn.commit()
+        await self._commit()
 
     async def clear_voice_session(self, guild_id: int, user_id: int):
         await self._conn.execute("""
         DELETE FROM user_voice_sessions WHERE guild_id = ? AND user_id = ?;
         """, (int(guild_id), int(user_id)))
-        await self._conn.commit()
+        await self._commit()
+
+    async def list_voice_sessions(self, guild_id: int):
+        cur = await self._conn.execute("""
+        SELECT user_id, channel_id, joined_at FROM user_voice_sessions WHERE guild_id = ?;
+        """, (int(guild_id),))
+        return await cur.fetchall()
+
+    async def apply_voice_batch(self, stats_rows: list[tuple], session_rows: list[tuple], closed: list[tuple]):
+        # stats_rows: (guild_id, user_id, seconds, xp, last_voice_at)
+        # session_rows: (guild_id, user_id, channel_id, joined_at)
+        # closed: (guild_id, user_id)
+        if stats_rows:
+            await self._conn.executemany("""
+            INSERT INTO user_stats (
+                guild_id, user_id, message_count, voice_seconds, welcome_count, xp, level,
+                last_voice_at, last_voice_ts, last_active_ts
+            )
+            VALUES (?, ?, 0, ?, 0, ?, 0, ?, ?, ?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                voice_seconds = voice_seconds + excluded.voice_seconds,
+                xp = xp + excluded.xp,
+                last_voice_at = excluded.last_voice_at,
+                last_voice_ts = excluded.last_voice_ts,
+                last_active_ts = excluded.last_active_ts;
+            """, [
+                (int(g), int(u), int(seconds), int(xp), at, _to_epoch(at), _to_epoch(at))
+                for g, u, seconds, xp, at in stats_rows
+            ])
+        if session_rows:
+            await self._conn.executemany("""
+            INSERT INTO user_voice_sessions (guild_id, user_id, channel_id, joined_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                channel_id = excluded.channel_id,
+                joined_at = excluded.joined_at;
+            """, [(int(g), int(u), int(c), str(at)) for g, u, c, at in session_rows])
+        if closed:
+            await self._conn.executemany("""
+            DELETE FROM user_voice_sessions WHERE guild_id = ? AND user_id = ?;
+            """, [(int(g), int(u)) for g, u in closed])
+        if stats_rows or session_rows or closed:
+            await self._commit(flush=True)
+
+    async def apply_activity_batch(self, hourly_rows: list[tuple], daily_rows: list[tuple]):
+        # hourly_rows: (guild_id, channel_id, bucket_ts, messages, active_users, voice_seconds, joins, leaves)
+        # daily_rows: (guild_id, channel_id, bucket_ts, active_users)
+        # active_users ist ein absoluter Stand des laufenden Buckets und wird nie kleiner.
+        if hourly_rows:
+            await self._conn.executemany("""
+            INSERT INTO activity_hourly (guild_id, channel_id, bucket_ts, messages, active_users, voice_seconds, joins, leaves)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(guild_id, channel_id, bucket_ts) DO UPDATE SET
+                messages = messages + excluded.messages,
+                active_users = CASE WHEN excluded.active_users > active_users THEN excluded.active_users ELSE active_users END,
+                voice_seconds = voice_seconds + excluded.voice_seconds,
+                joins = joins + excluded.joins,
+                leaves = leaves + excluded.leaves;
+            """, [tuple(int(v) for v in row) for row in hourly_rows])
+        if daily_rows:
+            await self._conn.executemany("""
+            INSERT INTO activity_daily (guild_id, channel_id, bucket_ts, active_users)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id, channel_id, bucket_ts) DO UPDATE SET
+                active_users = CASE WHEN excluded.active_users > active_users THEN excluded.active_users ELSE active_users END;
+            """, [tuple(int(v) for v in row) for row in daily_rows])
+        if hourly_rows or daily_rows:
+            await self._commit(flush=True)
+
+    async def compact_activity(self, before_ts: int) -> int:
+        # Stundenwerte vor before_ts in die Tagestabelle falten und danach löschen.
+        # Eine Transaktion: bricht der DELETE ab, wird auch die Addition zurückgerollt,
+        # sonst zählte der nächste Lauf dieselben Stunden ein zweites Mal.
+        async with self.transaction():
+            cur = await self._conn.execute("""
+            SELECT guild_id, channel_id, bucket_ts - (bucket_ts % 86400) AS day_ts,
+                   SUM(messages), SUM(voice_seconds), SUM(joins), SUM(leaves)
+            FROM activity_hourly
+            WHERE bucket_ts < ?
+            GROUP BY guild_id, channel_id, day_ts;
+            """, (int(before_ts),))
+            rows = await cur.fetchall()
+            if not rows:
+                return 0
+            await self._conn.executemany("""
+            INSERT INTO activity_daily (guild_id, channel_id, bucket_ts, messages, active_users, voice_seconds, joins, leaves)
+            VALUES (?, ?, ?, ?, 0, ?, ?, ?)
+            ON CONFLICT(guild_id, channel_id, bucket_ts) DO UPDATE SET
+                messages = messages + excluded.messages,
+                voice_seconds = voice_seconds + excluded.voice_seconds,
+                joins = joins + excluded.joins,
+                leaves = leaves + excluded.leaves;
+            """, [tuple(int(v or 0) for v in row) for row in rows])
+            await self._conn.execute("DELETE FROM activity_hourly WHERE bucket_ts < ?;", (int(before_ts),))
+        return len(rows)
+
+    async def get_activity_hourly(self, guild_id: int, channel_id: int, start_ts: int, end_ts: int):
+        cur = await self._conn.execute("""
+        SELECT bucket_ts, messages, active_users, voice_seconds, joins, leaves
+        FROM activity_hourly
+        WHERE guild_id = ? AND channel_id = ? AND bucket_ts >= ? AND bucket_ts < ?
+        ORDER BY bucket_ts;
+        """, (int(guild_id), int(channel_id), int(start_ts), int(end_ts)))
+        return await cur.fetchall()
+
+    async def get_activity_daily(self, guild_id: int, channel_id: int, start_ts: int, end_ts: int):
+        params = (int(guild_id), int(channel_id), int(start_ts), int(end_ts))
+        cur = await self._conn.execute("""
+        SELECT bucket_ts, messages, active_users, voice_seconds, joins, leaves
+        FROM activity_daily
+        WHERE guild_id = ? AND channel_id = ? AND bucket_ts >= ? AND bucket_ts < ?;
+        """, params)
+        days = {int(r[0]): [int(v or 0) for v in r[1:]] for r in await cur.fetchall()}
+        # Noch nicht verdichtete Tage kommen aus der Stundentabelle dazu.
+        cur = await self._conn.execute("""
+        SELECT bucket_ts - (bucket_ts % 86400) AS day_ts,
+               SUM(messages), SUM(voice_seconds), SUM(joins), SUM(leaves)
+        FROM activity_hourly
+        WHERE guild_id = ? AND channel_id = ? AND bucket_ts >= ? AND bucket_ts < ?
+        GROUP BY day_ts;
+        """, params)
+        for day_ts, messages, voice_seconds, joins, leaves in await cur.fetchall():
+            row = days.setdefault(int(day_ts), [0, 0, 0, 0, 0])
+            row[0] += int(messages or 0)
+            row[2] += int(voice_seconds or 0)
+            row[3] += int(joins or 0)
+            row[4] += int(leaves or 0)
+        return [(day_ts, *days[day_ts]) for day_ts in sorted(days)]
 
     async def list_tickets(self, limit: int = 200):
         cur = await self._conn.execute("""
@@ -1512,7 +2391,7 @@ class Database:
         INSERT INTO backups (guild_id, name, payload_json, created_at)
         VALUES (?, ?, ?, ?);
         """, (int(guild_id), str(name), str(payload_json), created_at))
-        await self._conn.commit()
+        await self._commit(flush=True)
         cur = await self._conn.execute("SELECT last_insert_rowid();")
         row = await cur.fetchone()
         return int(row[0])
@@ -1567,13 +2446,13 @@ class Database:
             month = excluded.month,
             year = excluded.year;
         """, (int(guild_id), int(user_id), int(day), int(month), int(year), created_at))
-        await self._conn.commit()
+        await self._commit()
 
     async def remove_birthday(self, guild_id: int, user_id: int):
         await self._conn.execute("""
         DELETE FROM birthdays WHERE guild_id = ? AND user_id = ?;
         """, (int(guild_id), int(user_id)))
-        await self._conn.commit()
+        await self._commit()
 
     async def get_birthday(self, guild_id: int, user_id: int):
         cur = await self._conn.execute("""
@@ -1619,14 +2498,14 @@ class Database:
             """,
             (int(user_id), int(day), int(month), int(year), created_at),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def remove_birthday_global(self, user_id: int):
         await self._conn.execute(
             "DELETE FROM birthdays_global WHERE user_id = ?;",
             (int(user_id),),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_birthday_global(self, user_id: int):
         cur = await self._conn.execute(
@@ -1691,7 +2570,7 @@ class Database:
                 """,
                 payload,
             )
-        await self._conn.commit()
+        await self._commit()
 
     async def list_birthdays_current(self, guild_id: int):
         cur = await self._conn.execute(
@@ -1710,7 +2589,7 @@ class Database:
             "DELETE FROM birthdays_current WHERE guild_id = ?;",
             (int(guild_id),),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_birthday_announcement(self, guild_id: int):
         cur = await self._conn.execute(
@@ -1753,14 +2632,14 @@ class Database:
                 updated_at,
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def clear_birthday_announcement(self, guild_id: int):
         await self._conn.execute(
             "DELETE FROM birthday_announcements WHERE guild_id = ?;",
             (int(guild_id),),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def replace_boosters_for_guild(self, guild_id: int, rows: list[tuple[int, int, str | None, str]]):
         await self._conn.execute(
@@ -1775,7 +2654,7 @@ class Database:
                 """,
                 rows,
             )
-        await self._conn.commit()
+        await self._commit()
 
     async def upsert_booster(self, guild_id: int, user_id: int, premium_since: str | None):
         updated_at = await self.now_iso()
@@ -1789,14 +2668,14 @@ class Database:
             """,
             (int(guild_id), int(user_id), premium_since, updated_at),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def remove_booster(self, guild_id: int, user_id: int):
         await self._conn.execute(
             "DELETE FROM boosters WHERE guild_id = ? AND user_id = ?;",
             (int(guild_id), int(user_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def list_boosters_for_guild(self, guild_id: int, limit: int = 100, offset: int = 0):
         cur = await self._conn.execute(
@@ -1825,7 +2704,23 @@ class Database:
         INSERT OR IGNORE INTO achievements (guild_id, user_id, code, unlocked_at)
         VALUES (?, ?, ?, ?);
         """, (int(guild_id), int(user_id), str(code), unlocked_at))
-        await self._conn.commit()
+        await self._commit()
+
+    async def add_achievements(self, rows: list[tuple[int, int, str]]):
+        if not rows:
+            return
+        unlocked_at = await self.now_iso()
+        await self._conn.executemany("""
+        INSERT OR IGNORE INTO achievements (guild_id, user_id, code, unlocked_at)
+        VALUES (?, ?, ?, ?);
+        """, [(int(g), int(u), str(code), unlocked_at) for g, u, code in rows])
+        await self._commit(flush=True)
+
+    async def list_achievements_for_guild(self, guild_id: int):
+        cur = await self._conn.execute("""
+        SELECT user_id, code FROM achievements WHERE guild_id = ?;
+        """, (int(guild_id),))
+        return await cur.fetchall()
 
     async def list_achievements(self, guild_id: int, user_id: int):
         cur = await self._conn.execute("""
@@ -1842,7 +2737,7 @@ class Database:
             value_json = excluded.value_json,
             updated_at = excluded.updated_at;
         """, (int(guild_id), str(key), str(value_json), updated_at))
-        await self._conn.commit()
+        await self._commit()
 
     async def get_guild_config(self, guild_id: int, key: str):
         cur = await self._conn.execute("""
@@ -1864,12 +2759,112 @@ class Database:
         )
         return await cur.fetchall()
 
+    async def replace_guild_configs(self, guild_id: int, values: dict[str, str]) -> tuple[int, int]:
+        # values: dotted key -> value_json. Schreibt nur geänderte Schlüssel,
+        # löscht entfallene und committet alles zusammen.
+        gid = int(guild_id)
+        async with self.transaction():
+            # Erst in der Transaktion lesen: sie hat offene Schreibvorgänge anderer Tasks
+            # bereits committet, der Diff sieht also auch noch nicht geflushte Schlüssel.
+            current = {str(k): str(v) for k, v in await self.list_guild_configs(gid)}
+            upserts = [(k, v) for k, v in values.items() if current.get(k) != v]
+            deletes = [k for k in current if k not in values]
+            if not upserts and not deletes:
+                return 0, 0
+            updated_at = await self.now_iso()
+            if deletes:
+                await self._conn.executemany(
+                    "DELETE FROM guild_configs WHERE guild_id = ? AND `key` = ?;",
+                    [(gid, k) for k in deletes],
+                )
+            if upserts:
+                await self._conn.executemany("""
+                INSERT INTO guild_configs (guild_id, `key`, value_json, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(guild_id, key) DO UPDATE SET
+                    value_json = excluded.value_json,
+                    updated_at = excluded.updated_at;
+                """, [(gid, k, v, updated_at) for k, v in upserts])
+        return len(upserts), len(deletes)
+
+    async def delete_guild_config_tree(self, guild_id: int, key: str):
+        # key selbst und alle Unterschlüssel (key.*); SUBSTR statt LIKE wegen "_" in den Namen.
+        prefix = f"{key}."
+        await self._conn.execute(
+            "DELETE FROM guild_configs WHERE guild_id = ? AND (`key` = ? OR SUBSTR(`key`, 1, ?) = ?);",
+            (int(guild_id), str(key), len(prefix), prefix),
+        )
+        await self._commit(flush=True)
+
     async def delete_guild_configs(self, guild_id: int):
         await self._conn.execute(
             "DELETE FROM guild_configs WHERE guild_id = ?;",
             (int(guild_id),),
         )
-        await self._conn.commit()
+        await self._commit()
+
+    async def list_runtime_state(self, guild_id: int, now_ts: int):
+        cur = await self._conn.execute("""
+        SELECT scope, state_key, value_json, expires_ts FROM runtime_state
+        WHERE guild_id = ? AND (expires_ts IS NULL OR expires_ts > ?);
+        """, (int(guild_id), int(now_ts)))
+        return await cur.fetchall()
+
+    async def apply_runtime_state_batch(self, upserts: list[tuple], deletes: list[tuple]):
+        # upserts: (guild_id, scope, state_key, value_json, expires_ts)
+        # deletes: (guild_id, scope, state_key)
+        if upserts:
+            updated_at = await self.now_iso()
+            await self._conn.executemany("""
+            INSERT INTO runtime_state (guild_id, scope, state_key, value_json, expires_ts, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(guild_id, scope, state_key) DO UPDATE SET
+                value_json = excluded.value_json,
+                expires_ts = excluded.expires_ts,
+                updated_at = excluded.updated_at;
+            """, [
+                (int(g), str(scope), str(key), str(value_json), int(expires) if expires else None, updated_at)
+                for g, scope, key, value_json, expires in upserts
+            ])
+        if deletes:
+            await self._conn.executemany(
+                "DELETE FROM runtime_state WHERE guild_id = ? AND scope = ? AND state_key = ?;",
+                [(int(g), str(scope), str(key)) for g, scope, key in deletes],
+            )
+        if upserts or deletes:
+            await self._commit(flush=True)
+
+    async def purge_runtime_state(self, now_ts: int) -> int:
+        cur = await self._conn.execute(
+            "DELETE FROM runtime_state WHERE expires_ts IS NOT NULL AND expires_ts <= ?;",
+            (int(now_ts),),
+        )
+        await self._commit()
+        return max(0, int(getattr(cur, "rowcount", 0) or 0))
+
+    async def list_scheduled_jobs(self):
+        cur = await self._conn.execute(
+            "SELECT kind, ref, guild_id, due_ts, payload_json FROM scheduled_jobs ORDER BY due_ts ASC;"
+        )
+        return await cur.fetchall()
+
+    async def upsert_scheduled_job(self, kind: str, ref: str, guild_id: int, due_ts: int, payload_json: str | None = None):
+        await self._conn.execute("""
+        INSERT INTO scheduled_jobs (kind, ref, guild_id, due_ts, payload_json)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(kind, ref) DO UPDATE SET
+            guild_id = excluded.guild_id,
+            due_ts = excluded.due_ts,
+            payload_json = excluded.payload_json;
+        """, (str(kind), str(ref), int(guild_id), int(due_ts), payload_json))
+        await self._commit(flush=True)
+
+    async def delete_scheduled_job(self, kind: str, ref: str):
+        await self._conn.execute(
+            "DELETE FROM scheduled_jobs WHERE kind = ? AND ref = ?;",
+            (str(kind), str(ref)),
+        )
+        await self._commit()
 
     async def count_achievement(self, guild_id: int, code: str):
         cur = await self._conn.execute("""
@@ -1884,12 +2879,12 @@ class Database:
         created_at = await self.now_iso()
         await self._conn.execute("""
         INSERT INTO giveaways (
-            guild_id, channel_id, title, sponsor, description, end_at,
+            guild_id, channel_id, title, sponsor, description, end_at, end_ts,
             winner_count, conditions_json, created_by, status, created_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'open', ?);
-        """, (int(guild_id), int(channel_id), str(title), sponsor, description, str(end_at),
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'open', ?);
+        """, (int(guild_id), int(channel_id), str(title), sponsor, description, str(end_at), _to_epoch(end_at),
               int(winner_count), str(conditions_json), int(created_by), created_at))
-        await self._conn.commit()
+        await self._commit(flush=True)
         cur = await self._conn.execute("SELECT last_insert_rowid();")
         row = await cur.fetchone()
         return int(row[0])
@@ -1898,7 +2893,7 @@ class Database:
         await self._conn.execute("""
         UPDATE giveaways SET message_id = ? WHERE id = ?;
         """, (int(message_id), int(giveaway_id)))
-        await self._conn.commit()
+        await self._commit()
 
     async def get_giveaway(self, giveaway_id: int):
         cur = await self._conn.execute("""
@@ -1925,11 +2920,22 @@ class Database:
         """, (int(guild_id),))
         return await cur.fetchall()
 
-    async def close_giveaway(self, giveaway_id: int):
-        await self._conn.execute("""
-        UPDATE giveaways SET status = 'closed' WHERE id = ?;
+    async def list_due_giveaways(self, guild_id: int, now_iso: str):
+        cur = await self._conn.execute("""
+        SELECT id, channel_id, message_id, end_at
+        FROM giveaways
+        WHERE guild_id = ? AND status = 'open' AND end_ts <= ?
+        ORDER BY end_ts ASC;
+        """, (int(guild_id), _to_epoch(now_iso)))
+        return await cur.fetchall()
+
+    async def close_giveaway(self, giveaway_id: int) -> bool:
+        # True nur für den Aufrufer, der das Giveaway tatsächlich geschlossen hat.
+        cur = await self._conn.execute("""
+        UPDATE giveaways SET status = 'closed' WHERE id = ? AND status = 'open';
         """, (int(giveaway_id),))
-        await self._conn.commit()
+        await self._commit(flush=True)
+        return int(getattr(cur, "rowcount", 0) or 0) == 1
 
     async def add_giveaway_entry(self, giveaway_id: int, user_id: int):
         entered_at = await self.now_iso()
@@ -1937,7 +2943,7 @@ class Database:
         INSERT OR IGNORE INTO giveaway_entries (giveaway_id, user_id, entered_at)
         VALUES (?, ?, ?);
         """, (int(giveaway_id), int(user_id), entered_at))
-        await self._conn.commit()
+        await self._commit()
 
     async def count_giveaway_entries(self, giveaway_id: int):
         cur = await self._conn.execute("""
@@ -1965,8 +2971,8 @@ class Database:
     ):
         created_at = await self.now_iso()
         await self._conn.execute("""
-        INSERT INTO polls (guild_id, channel_id, question, options_json, image_url, end_at, created_by, status, created_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, 'open', ?);
+        INSERT INTO polls (guild_id, channel_id, question, options_json, image_url, end_at, end_ts, created_by, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'open', ?);
         """, (
             int(guild_id),
             int(channel_id),
@@ -1974,10 +2980,11 @@ class Database:
             str(options_json),
             str(image_url).strip() if image_url else None,
             str(end_at).strip() if end_at else None,
+            _to_epoch(end_at),
             int(created_by),
             created_at,
         ))
-        await self._conn.commit()
+        await self._commit(flush=True)
         cur = await self._conn.execute("SELECT last_insert_rowid();")
         row = await cur.fetchone()
         return int(row[0])
@@ -1986,7 +2993,7 @@ class Database:
         await self._conn.execute("""
         UPDATE polls SET message_id = ? WHERE id = ?;
         """, (int(message_id), int(poll_id)))
-        await self._conn.commit()
+        await self._commit()
 
     async def get_poll(self, poll_id: int):
         cur = await self._conn.execute("""
@@ -1995,12 +3002,13 @@ class Database:
         """, (int(poll_id),))
         return await cur.fetchone()
 
-    async def close_poll(self, poll_id: int):
+    async def close_poll(self, poll_id: int) -> bool:
         closed_at = await self.now_iso()
-        await self._conn.execute("""
-        UPDATE polls SET status = 'closed', closed_at = ? WHERE id = ?;
+        cur = await self._conn.execute("""
+        UPDATE polls SET status = 'closed', closed_at = ? WHERE id = ? AND status = 'open';
         """, (closed_at, int(poll_id)))
-        await self._conn.commit()
+        await self._commit(flush=True)
+        return int(getattr(cur, "rowcount", 0) or 0) == 1
 
     async def add_poll_vote(self, poll_id: int, user_id: int, option_index: int):
         voted_at = await self.now_iso()
@@ -2008,7 +3016,7 @@ class Database:
         INSERT OR REPLACE INTO poll_votes (poll_id, user_id, option_index, voted_at)
         VALUES (?, ?, ?, ?);
         """, (int(poll_id), int(user_id), int(option_index), voted_at))
-        await self._conn.commit()
+        await self._commit()
 
     async def list_poll_votes(self, poll_id: int):
         cur = await self._conn.execute("""
@@ -2025,6 +3033,15 @@ class Database:
         """)
         return await cur.fetchall()
 
+    async def list_due_polls(self, now_iso: str):
+        cur = await self._conn.execute("""
+        SELECT id, guild_id, channel_id, message_id, options_json, end_at
+        FROM polls
+        WHERE status = 'open' AND end_ts <= ?
+        ORDER BY end_ts ASC;
+        """, (_to_epoch(now_iso),))
+        return await cur.fetchall()
+
     async def create_application(self, guild_id: int, user_id: int, thread_id: int, questions: list[str], answers: list[str]):
         created_at = await self.now_iso()
         await self._conn.execute("""
@@ -2032,7 +3049,7 @@ class Database:
         VALUES (?, ?, ?, 'open', ?, ?, ?);
         """, (int(guild_id), int(user_id), int(thread_id), json.dumps(questions, ensure_ascii=False),
               json.dumps(answers, ensure_ascii=False), created_at))
-        await self._conn.commit()
+        await self._commit(flush=True)
         cur = await self._conn.execute("SELECT last_insert_rowid();")
         row = await cur.fetchone()
         return int(row[0])
@@ -2062,7 +3079,7 @@ class Database:
             "UPDATE applications SET status = ?, closed_at = ? WHERE id = ?;",
             (str(status), closed_at, int(app_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def list_applications(self, limit: int = 200):
         cur = await self._conn.execute("""
@@ -2113,7 +3130,7 @@ class Database:
                 created_at,
             ),
         )
-        await self._conn.commit()
+        await self._commit(flush=True)
         cur = await self._conn.execute("SELECT last_insert_rowid();")
         row = await cur.fetchone()
         return int(row[0])
@@ -2141,7 +3158,7 @@ class Database:
                 created_at,
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_seelsorge_thread(self, guild_id: int, thread_id: int):
         cur = await self._conn.execute(
@@ -2191,7 +3208,7 @@ class Database:
                 created_at,
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_beichte_thread(self, guild_id: int, thread_id: int):
         cur = await self._conn.execute(
@@ -2261,7 +3278,7 @@ class Database:
                     created_at,
                 ),
             )
-            await self._conn.commit()
+            await self._commit()
             existing = await self.get_anonymous_identity(guild_id, thread_id, user_id)
             if existing is not None:
                 return int(existing)
@@ -2295,7 +3312,7 @@ class Database:
                 created_at,
             ),
         )
-        await self._conn.commit()
+        await self._commit()
         existing = await self.get_anonymous_identity(guild_id, thread_id, user_id)
         if existing is not None:
             return int(existing)
@@ -2339,7 +3356,7 @@ class Database:
             """,
             (int(guild_id), int(user_id), int(elected), int(candidated)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def increment_parliament_elected(self, guild_id: int, user_id: int, amount: int = 1):
         row = await self.get_parliament_stats(guild_id, user_id)
@@ -2353,7 +3370,7 @@ class Database:
             """,
             (int(guild_id), int(user_id), int(elected), int(candidated)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def create_parliament_vote(
         self,
@@ -2372,7 +3389,7 @@ class Database:
             """,
             (int(guild_id), int(channel_id), str(candidate_ids_json), int(created_by), created_at),
         )
-        await self._conn.commit()
+        await self._commit(flush=True)
         cur = await self._conn.execute("SELECT last_insert_rowid();")
         row = await cur.fetchone()
         return int(row[0])
@@ -2384,7 +3401,7 @@ class Database:
             """,
             (int(message_id), int(vote_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_parliament_vote(self, vote_id: int):
         cur = await self._conn.execute(
@@ -2419,7 +3436,7 @@ class Database:
             """,
             (str(ended_at), int(vote_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def add_parliament_vote_entry(self, vote_id: int, user_id: int, candidate_id: int):
         voted_at = await self.now_iso()
@@ -2430,7 +3447,7 @@ class Database:
             """,
             (int(vote_id), int(user_id), int(candidate_id), str(voted_at)),
         )
-        await self._conn.commit()
+        await self._commit()
         return await self.get_parliament_vote_entry(vote_id, user_id)
 
     async def get_parliament_vote_entry(self, vote_id: int, user_id: int):
@@ -2493,7 +3510,7 @@ class Database:
                 str(created_at),
             ),
         )
-        await self._conn.commit()
+        await self._commit(flush=True)
         cur = await self._conn.execute("SELECT last_insert_rowid();")
         row = await cur.fetchone()
         return int(row[0])
@@ -2596,7 +3613,7 @@ class Database:
             """,
             (int(approved_by), str(approved_at), int(party_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_parliament_party_status_rejected(self, party_id: int, rejected_by: int, reason: str | None = None):
         rejected_at = await self.now_iso()
@@ -2608,7 +3625,7 @@ class Database:
             """,
             (int(rejected_by), str(rejected_at), str(reason or "").strip() or None, int(party_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_parliament_party_logo(self, party_id: int, logo_url: str | None):
         await self._conn.execute(
@@ -2619,7 +3636,7 @@ class Database:
             """,
             (str(logo_url or "").strip() or None, int(party_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_parliament_party_basic_info(self, party_id: int, name: str, slug: str, description: str | None):
         await self._conn.execute(
@@ -2635,7 +3652,7 @@ class Database:
                 int(party_id),
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_parliament_party_manifesto(
         self,
@@ -2655,7 +3672,7 @@ class Database:
                 int(party_id),
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_parliament_party_forum_thread(self, party_id: int, forum_thread_id: int | None):
         await self._conn.execute(
@@ -2666,7 +3683,7 @@ class Database:
             """,
             (int(forum_thread_id) if forum_thread_id else None, int(party_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_parliament_party_thread_info_message(self, party_id: int, message_id: int | None):
         await self._conn.execute(
@@ -2677,7 +3694,7 @@ class Database:
             """,
             (int(message_id) if message_id else None, int(party_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_parliament_party_channels(
         self,
@@ -2705,7 +3722,7 @@ class Database:
                 int(party_id),
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def add_parliament_party_member(self, party_id: int, guild_id: int, user_id: int, role: str, added_by: int | None = None):
         added_at = await self.now_iso()
@@ -2716,7 +3733,7 @@ class Database:
             """,
             (int(party_id), int(guild_id), int(user_id), str(role), int(added_by) if added_by else None, str(added_at)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def remove_parliament_party_member(self, party_id: int, user_id: int):
         await self._conn.execute(
@@ -2726,7 +3743,7 @@ class Database:
             """,
             (int(party_id), int(user_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_parliament_party_member(self, party_id: int, user_id: int):
         cur = await self._conn.execute(
@@ -2807,7 +3824,7 @@ class Database:
                 int(submission_id),
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def mark_wzs_posted(self, submission_id: int, channel_id: int, message_id: int):
         posted_at = await self.now_iso()
@@ -2824,7 +3841,7 @@ class Database:
                 int(submission_id),
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def list_wzs_candidates(self, guild_id: int, limit: int = 200):
         cur = await self._conn.execute(
@@ -2860,7 +3877,7 @@ class Database:
         INSERT INTO logs (event, payload, created_at)
         VALUES (?, ?, ?);
         """, (event, json.dumps(payload, ensure_ascii=False), created_at))
-        await self._conn.commit()
+        await self._commit()
 
     async def upsert_dashboard_session(
         self,
@@ -2892,7 +3909,7 @@ class Database:
                 int(created_at),
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_dashboard_session(self, session_id: str):
         cur = await self._conn.execute(
@@ -2911,8 +3928,164 @@ class Database:
             "DELETE FROM dashboard_sessions WHERE session_id = ?;",
             (str(session_id),),
         )
-        await self._conn.commit()
+        await self._commit()
+
+
+    async def list_retention_guilds(self, table: str) -> list[int]:
+        query = RETENTION_TARGETS[table]["guild"]
+        if not query:
+            return []
+        cur = await self._conn.execute(query + ";")
+        rows = await cur.fetchall()
+        return [int(r[0]) for r in rows if r and r[0] is not None]
+
+    async def prune_table(
+        self,
+        table: str,
+        max_age_seconds: int | None = None,
+        max_rows: int | None = None,
+        keep_latest: int | None = None,
+        guild_id: int | None = None,
+        batch_size: int = 500,
+    ) -> int:
+        target = RETENTION_TARGETS[table]
+        scope = " AND guild_id = ?" if guild_id is not None else ""
+        scope_params = (int(guild_id),) if guild_id is not None else ()
+        deleted = 0
+        if max_age_seconds is not None and max_age_seconds >= 0:
+            cutoff_ts = int(time.time()) - int(max_age_seconds)
+            if target["age"] == "epoch":
+                cutoff = cutoff_ts
+            else:
+                cutoff = datetime.fromtimestamp(cutoff_ts, timezone.utc).isoformat()
+            deleted += await self._delete_batched(
+                table,
+                target["where"].format(scope=scope),
+                (cutoff, *scope_params),
+                batch_size,
+            )
+        limit = keep_latest if guild_id is not None and keep_latest is not None else max_rows
+        if target["id"] and limit is not None and limit >= 0:
+            cur = await self._conn.execute(
+                f"SELECT id FROM {table} WHERE 1 = 1{scope} ORDER BY id DESC LIMIT 1 OFFSET ?;",
+                (*scope_params, int(limit)),
+            )
+            row = await cur.fetchone()
+            if row:
+                deleted += await self._delete_batched(
+                    table,
+                    f"id <= ?{scope}",
+                    (int(row[0]), *scope_params),
+                    batch_size,
+                )
+        return deleted
+
+    async def _delete_batched(self, table: str, where: str, params: tuple, batch_size: int) -> int:
+        batch_size = max(1, int(batch_size))
+        if self._driver == "mysql":
+            sql = f"DELETE FROM {table} WHERE {where} LIMIT ?;"
+        else:
+            sql = f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT ?);"
+        total = 0
+        while True:
+            cur = await self._conn.execute(sql, (*params, batch_size))
+            count = max(0, int(getattr(cur, "rowcount", 0) or 0))
+            await self._commit(flush=True)
+            total += count
+            if count < batch_size:
+                return total
+            await asyncio.sleep(0)
+
+    async def list_tables(self) -> list[str]:
+        if self._driver == "mysql":
+            cur = await self._conn.execute(
+                "SELECT table_name FROM information_schema.tables WHERE table_schema = %s AND table_type = 'BASE TABLE' ORDER BY table_name;",
+                (self._mysql_db,),
+            )
+        else:
+            cur = await self._conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name;"
+            )
+        rows = await cur.fetchall()
+        return [str(r[0]) for r in rows if r]
 
+    async def table_columns(self, table: str) -> tuple[list[str], list[str]]:
+        if self._driver == "mysql":
+            cur = await self._conn.execute(
+                """
+                SELECT column_name, column_key
+                FROM information_schema.columns
+                WHERE table_schema = %s AND table_name = %s
+                ORDER BY ordinal_position;
+                """,
+                (self._mysql_db, table),
+            )
+            rows = await cur.fetchall()
+            columns = [str(r[0]) for r in rows]
+            cur = await self._conn.execute(
+                """
+                SELECT column_name
+                FROM information_schema.key_column_usage
+                WHERE table_schema = %s AND table_name = %s AND constraint_name = 'PRIMARY'
+                ORDER BY ordinal_position;
+                """,
+                (self._mysql_db, table),
+            )
+            pk = [str(r[0]) for r in await cur.fetchall()]
+            return columns, pk
+        cur = await self._conn.execute(f"PRAGMA table_info({table});")
+        rows = await cur.fetchall()
+        columns = [str(r[1]) for r in rows]
+        pk = [str(r[1]) for r in sorted((r for r in rows if r[5]), key=lambda r: int(r[5]))]
+        return columns, pk
+
+    async def table_column_types(self, table: str) -> dict[str, str]:
+        # Deklarierte Typen, klein geschrieben (SQLite: wie im CREATE TABLE, MySQL: data_type).
+        if self._driver == "mysql":
+            cur = await self._conn.execute(
+                """
+                SELECT column_name, data_type
+                FROM information_schema.columns
+                WHERE table_schema = %s AND table_name = %s;
+                """,
+                (self._mysql_db, table),
+            )
+            return {str(r[0]): str(r[1] or "").lower() for r in await cur.fetchall()}
+        cur = await self._conn.execute(f"PRAGMA table_info({table});")
+        return {str(r[1]): str(r[2] or "").lower() for r in await cur.fetchall()}
+
+    async def storage_stats(self) -> dict:
+        if self._driver == "mysql":
+            cur = await self._conn.execute(
+                """
+                SELECT COALESCE(SUM(data_length + index_length), 0), COALESCE(SUM(data_free), 0)
+                FROM information_schema.tables
+                WHERE table_schema = %s;
+                """,
+                (self._mysql_db,),
+            )
+            row = await cur.fetchone()
+            return {"bytes": int(row[0] or 0), "free_bytes": int(row[1] or 0)}
+        values = {}
+        for pragma in ("page_size", "page_count", "freelist_count"):
+            cur = await self._conn.execute(f"PRAGMA {pragma};")
+            row = await cur.fetchone()
+            values[pragma] = int(row[0]) if row else 0
+        return {
+            "bytes": values["page_size"] * values["page_count"],
+            "free_bytes": values["page_size"] * values["freelist_count"],
+        }
+
+    async def compact(self, tables: list[str]):
+        await self.flush()
+        if self._driver == "mysql":
+            if tables:
+                await self._conn.execute(f"OPTIMIZE TABLE {', '.join(tables)};")
+            return
+        await self._conn.executescript("PRAGMA incremental_vacuum;")
+        for table in tables:
+            await self._conn.execute(f"ANALYZE {table};")
+        await self._conn.commit()
 
     async def add_infraction(self, guild_id: int, user_id: int, moderator_id: int, action: str,
                              duration_seconds: int | None, reason: str | None) -> int:
@@ -2922,7 +4095,7 @@ class Database:
             (int(guild_id), int(user_id), int(moderator_id), str(action),
              int(duration_seconds) if duration_seconds is not None else None, str(reason) if reason else None, now)
         )
-        await self._conn.commit()
+        await self._commit(flush=True)
         return int(cur.lastrowid)
 
     async def count_recent_infractions(self, guild_id: int, user_id: int, actions: list[str], since_ts: int) -> int:
@@ -2968,7 +4141,7 @@ class Database:
             """,
             params,
         )
-        await self._conn.commit()
+        await self._commit()
         try:
             return int(cur.rowcount or 0)
         except Exception:
@@ -2979,7 +4152,7 @@ class Database:
             "UPDATE infractions SET reason = ? WHERE guild_id = ? AND id = ?;",
             (str(reason) if reason is not None else None, int(guild_id), int(case_id)),
         )
-        await self._conn.commit()
+        await self._commit()
         try:
             return int(cur.rowcount or 0) > 0
         except Exception:
@@ -3040,47 +4213,55 @@ class Database:
                 now,
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def delete_custom_role(self, guild_id: int, user_id: int):
         await self._conn.execute(
             "DELETE FROM custom_roles WHERE guild_id = ? AND user_id = ?;",
             (int(guild_id), int(user_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_afk_status(self, guild_id: int, user_id: int, reason: str | None, until_at: str | None = None):
         set_at = await self.now_iso()
         await self._conn.execute(
             """
-            INSERT INTO afk_status (guild_id, user_id, reason, set_at, until_at)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT INTO afk_status (guild_id, user_id, reason, set_at, until_at, until_ts)
+            VALUES (?, ?, ?, ?, ?, ?)
             ON CONFLICT(guild_id, user_id) DO UPDATE SET
                 reason = excluded.reason,
                 set_at = excluded.set_at,
-                until_at = excluded.until_at;
+                until_at = excluded.until_at,
+                until_ts = excluded.until_ts;
             """,
-            (int(guild_id), int(user_id), str(reason).strip() if reason else None, set_at, str(until_at) if until_at else None),
+            (
+                int(guild_id),
+                int(user_id),
+                str(reason).strip() if reason else None,
+                set_at,
+                str(until_at) if until_at else None,
+                _to_epoch(until_at),
+            ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def clear_afk_status(self, guild_id: int, user_id: int):
         await self._conn.execute(
             "DELETE FROM afk_status WHERE guild_id = ? AND user_id = ?;",
             (int(guild_id), int(user_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def update_afk_until(self, guild_id: int, user_id: int, until_at: str | None):
         await self._conn.execute(
             """
             UPDATE afk_status
-            SET until_at = ?
+            SET until_at = ?, until_ts = ?
             WHERE guild_id = ? AND user_id = ?;
             """,
-            (str(until_at) if until_at else None, int(guild_id), int(user_id)),
+            (str(until_at) if until_at else None, _to_epoch(until_at), int(guild_id), int(user_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_afk_status(self, guild_id: int, user_id: int):
         cur = await self._conn.execute(
@@ -3114,11 +4295,11 @@ class Database:
             """
             SELECT guild_id, user_id, reason, set_at, until_at
             FROM afk_status
-            WHERE until_at IS NOT NULL AND until_at <= ?
-            ORDER BY until_at ASC
+            WHERE until_ts <= ?
+            ORDER BY until_ts ASC
             LIMIT ?;
             """,
-            (str(now_iso), int(limit)),
+            (_to_epoch(now_iso), int(limit)),
         )
         return await cur.fetchall()
 
@@ -3147,7 +4328,7 @@ class Database:
                 str(created_at),
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def list_afk_mention_events(self, guild_id: int, afk_user_id: int, limit: int = 500):
         cur = await self._conn.execute(
@@ -3170,18 +4351,18 @@ class Database:
             """,
             (int(guild_id), int(afk_user_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def create_reminder(self, guild_id: int, user_id: int, channel_id: int, message: str, remind_at: str):
         created_at = await self.now_iso()
         cur = await self._conn.execute(
             """
-            INSERT INTO reminders (guild_id, user_id, channel_id, message, remind_at, created_at, delivered_at)
-            VALUES (?, ?, ?, ?, ?, ?, NULL);
+            INSERT INTO reminders (guild_id, user_id, channel_id, message, remind_at, remind_ts, created_at, delivered_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, NULL);
             """,
-            (int(guild_id), int(user_id), int(channel_id), str(message), str(remind_at), created_at),
+            (int(guild_id), int(user_id), int(channel_id), str(message), str(remind_at), _to_epoch(remind_at), created_at),
         )
-        await self._conn.commit()
+        await self._commit(flush=True)
         return int(getattr(cur, "lastrowid", 0) or 0)
 
     async def list_due_reminders(self, now_iso: str, limit: int = 50):
@@ -3189,21 +4370,34 @@ class Database:
             """
             SELECT id, guild_id, user_id, channel_id, message, remind_at, created_at, delivered_at
             FROM reminders
-            WHERE delivered_at IS NULL AND remind_at <= ?
-            ORDER BY remind_at ASC
+            WHERE remind_ts <= ? AND delivered_at IS NULL
+            ORDER BY remind_ts ASC
             LIMIT ?;
             """,
-            (str(now_iso), int(limit)),
+            (_to_epoch(now_iso), int(limit)),
         )
         return await cur.fetchall()
 
-    async def mark_reminder_delivered(self, reminder_id: int):
+    async def get_reminder(self, reminder_id: int):
+        cur = await self._conn.execute(
+            """
+            SELECT id, guild_id, user_id, channel_id, message, remind_at, created_at, delivered_at
+            FROM reminders
+            WHERE id = ?
+            LIMIT 1;
+            """,
+            (int(reminder_id),),
+        )
+        return await cur.fetchone()
+
+    async def mark_reminder_delivered(self, reminder_id: int) -> bool:
         delivered_at = await self.now_iso()
-        await self._conn.execute(
-            "UPDATE reminders SET delivered_at = ? WHERE id = ?;",
+        cur = await self._conn.execute(
+            "UPDATE reminders SET delivered_at = ? WHERE id = ? AND delivered_at IS NULL;",
             (str(delivered_at), int(reminder_id)),
         )
-        await self._conn.commit()
+        await self._commit(flush=True)
+        return int(getattr(cur, "rowcount", 0) or 0) == 1
 
     async def list_active_reminders_for_user(self, guild_id: int, user_id: int, limit: int = 20):
         cur = await self._conn.execute(
@@ -3226,7 +4420,7 @@ class Database:
             """,
             (int(reminder_id), int(guild_id), int(user_id)),
         )
-        await self._conn.commit()
+        await self._commit()
         try:
             return int(cur.rowcount or 0) > 0
         except Exception:
@@ -3244,7 +4438,7 @@ class Database:
             """,
             (int(guild_id), int(channel_id) if channel_id else None, now),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_flag_quiz_dashboard_message(self, guild_id: int, message_id: int | None):
         now = await self.now_iso()
@@ -3258,7 +4452,7 @@ class Database:
             """,
             (int(guild_id), int(message_id) if message_id else None, now),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_flag_player_stats(self, guild_id: int, user_id: int):
         cur = await self._conn.execute(
@@ -3348,7 +4542,7 @@ class Database:
                 now,
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def list_flag_players_top_points_weekly(self, guild_id: int, week_key: str, limit: int = 10):
         cur = await self._conn.execute(
@@ -3458,7 +4652,7 @@ class Database:
                 now,
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def list_flag_stats_top_asked(self, guild_id: int, limit: int = 10):
         cur = await self._conn.execute(
@@ -3488,7 +4682,7 @@ class Database:
             "ON CONFLICT(guild_id,`key`) DO UPDATE SET forum_id=excluded.forum_id, thread_id=excluded.thread_id",
             (int(guild_id), int(forum_id), str(key), int(thread_id), now)
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def add_ticket_participant(self, ticket_id: int, user_id: int, added_by: int | None = None) -> None:
         now = int(time.time())
@@ -3496,7 +4690,7 @@ class Database:
             "INSERT OR IGNORE INTO ticket_participants(ticket_id,user_id,added_by,added_at) VALUES(?,?,?,?)",
             (int(ticket_id), int(user_id), int(added_by) if added_by else None, now)
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def list_ticket_participants(self, ticket_id: int) -> list[int]:      
         cur = await self._conn.execute(
@@ -3530,7 +4724,7 @@ class Database:
                 created_at,
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_tempvoice_room_by_channel(self, guild_id: int, channel_id: int):
         cur = await self._conn.execute(
@@ -3576,7 +4770,7 @@ class Database:
             """,
             (int(owner_id), int(guild_id), int(channel_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def set_tempvoice_panel_message(
         self,
@@ -3598,14 +4792,14 @@ class Database:
                 int(channel_id),
             ),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def delete_tempvoice_room(self, guild_id: int, channel_id: int):
         await self._conn.execute(
             "DELETE FROM tempvoice_rooms WHERE guild_id = ? AND channel_id = ?;",
             (int(guild_id), int(channel_id)),
         )
-        await self._conn.commit()
+        await self._commit()
 
     async def get_counting_state(self, guild_id: int, channel_id: int):
         cur = await self._conn.execute(
@@ -3686,4 +4880,10 @@ class Database:
                 str(last_count_at) if last_count_at is not None else None,
             ),
         )
-        await self._conn.commit()
+        await self._commit()
+
+
+instrument_methods(
+    Database,
+    skip={"init", "connect", "close", "flush", "migrate", "now_iso"},
+)
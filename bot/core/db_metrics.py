@@ -0,0 +1,223 @@
+import os
+import re
+import json
+import math
+import time
+import asyncio
+import inspect
+import functools
+import contextvars
+from collections import deque
+from datetime import datetime, timezone
+
+_current_method = contextvars.ContextVar("db_current_method", default=None)
+
+_WS_RE = re.compile(r"\s+")
+
+
+def reset_current_method():
+    # Für Hintergrund-Tasks: sie erben sonst die Methode, die sie angelegt hat.
+    _current_method.set(None)
+
+
+def _normalize_statement(sql: str) -> str:
+    return _WS_RE.sub(" ", str(sql or "")).strip()
+
+
+def _redact_param(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "<bool>"
+    if isinstance(value, int):
+        return "<int>"
+    if isinstance(value, float):
+        return "<float>"
+    if isinstance(value, (bytes, bytearray)):
+        return f"<bytes:{len(value)}>"
+    return f"<{type(value).__name__}:{len(str(value))}>"
+
+
+def _redact_params(params) -> list[str]:
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        return [f"{k}={_redact_param(v)}" for k, v in params.items()]
+    try:
+        return [_redact_param(v) for v in params]
+    except TypeError:
+        return [_redact_param(params)]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def _count_rows(result) -> int:
+    if result is None or isinstance(result, (bool, int, float, str, bytes, dict)):
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple):
+        return 1
+    return 0
+
+
+class _MethodStats:
+    __slots__ = ("calls", "errors", "rows", "lock_wait", "statements", "max_seconds", "samples")
+
+    def __init__(self, sample_size: int):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.lock_wait = 0.0
+        self.statements = 0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=sample_size)
+
+    def as_dict(self) -> dict:
+        ordered = sorted(self.samples)
+        return {
+            "calls": int(self.calls),
+            "errors": int(self.errors),
+            "statements": int(self.statements),
+            "rows": int(self.rows),
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(_percentile(ordered, 95) * 1000, 3),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "lock_wait_ms": round(self.lock_wait * 1000, 3),
+        }
+
+
+class QueryMetrics:
+    def __init__(self, cfg: dict | None = None):
+        cfg = cfg or {}
+        self.enabled = bool(cfg.get("enabled", True))
+        self.slow_query_ms = max(0, int(cfg.get("slow_query_ms", 250) or 0))
+        self.slow_log_path = str(cfg.get("slow_log_path", "") or "").strip() or None
+        self.sample_size = max(16, int(cfg.get("sample_size", 1024) or 1024))
+        self._methods: dict[str, _MethodStats] = {}
+        self._slow = deque(maxlen=max(1, int(cfg.get("slow_log_keep", 100) or 100)))
+        self._started_at = time.time()
+        self._slow_lines: list[str] = []
+        self._slow_task: asyncio.Task | None = None
+
+    def _stats(self, method: str) -> _MethodStats:
+        stats = self._methods.get(method)
+        if stats is None:
+            stats = _MethodStats(self.sample_size)
+            self._methods[method] = stats
+        return stats
+
+    def enter(self, method: str):
+        return _current_method.set(method)
+
+    def leave(self, token):
+        _current_method.reset(token)
+
+    def record_call(self, method: str, seconds: float, rows: int, failed: bool = False):
+        stats = self._stats(method)
+        stats.calls += 1
+        stats.rows += int(rows)
+        if failed:
+            stats.errors += 1
+        stats.samples.append(seconds)
+        if seconds > stats.max_seconds:
+            stats.max_seconds = seconds
+
+    def record_lock_wait(self, seconds: float):
+        if not self.enabled:
+            return
+        self._stats(_current_method.get() or "<direct>").lock_wait += seconds
+
+    def record_statement(self, sql: str, params, seconds: float):
+        if not self.enabled:
+            return
+        method = _current_method.get() or "<direct>"
+        self._stats(method).statements += 1
+        if not self.slow_query_ms or seconds * 1000 < self.slow_query_ms:
+            return
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "method": method,
+            "ms": round(seconds * 1000, 3),
+            "sql": _normalize_statement(sql),
+            "params": _redact_params(params),
+        }
+        self._slow.append(entry)
+        if self.slow_log_path:
+            # Nicht auf dem Event-Loop schreiben: der blockiert sonst genau dann, wenn die DB ohnehin langsam ist.
+            self._slow_lines.append(json.dumps(entry, ensure_ascii=False) + "\n")
+            if self._slow_task is None or self._slow_task.done():
+                try:
+                    self._slow_task = asyncio.get_running_loop().create_task(self.flush_slow_log())
+                except RuntimeError:
+                    self._slow_task = None
+
+    def _append_slow_lines(self, lines: list[str]):
+        os.makedirs(os.path.dirname(self.slow_log_path) or ".", exist_ok=True)
+        with open(self.slow_log_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    async def flush_slow_log(self) -> int:
+        written = 0
+        while self._slow_lines:
+            lines, self._slow_lines = self._slow_lines, []
+            try:
+                await asyncio.to_thread(self._append_slow_lines, lines)
+                written += len(lines)
+            except Exception:
+                pass
+        return written
+
+    def snapshot(self, top: int | None = None, sort: str = "p95_ms") -> dict:
+        methods = {name: stats.as_dict() for name, stats in self._methods.items()}
+        ordered = sorted(methods.items(), key=lambda kv: kv[1].get(sort, 0), reverse=True)
+        if top:
+            ordered = ordered[: int(top)]
+        return {
+            "since": datetime.fromtimestamp(self._started_at, timezone.utc).isoformat(),
+            "slow_query_ms": self.slow_query_ms,
+            "methods": dict(ordered),
+            "slow_queries": list(self._slow),
+        }
+
+    def reset(self):
+        self._methods.clear()
+        self._slow.clear()
+        self._started_at = time.time()
+
+
+def instrument_methods(cls, skip: set[str] | frozenset = frozenset()):
+    for name, fn in list(vars(cls).items()):
+        if name.startswith("_") or name in skip:
+            continue
+        if not inspect.iscoroutinefunction(fn):
+            continue
+        setattr(cls, name, _timed(name, fn))
+    return cls
+
+
+def _timed(name: str, fn):
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        metrics = self.metrics
+        if metrics is None or not metrics.enabled:
+            return await fn(self, *args, **kwargs)
+        token = metrics.enter(name)
+        started = time.perf_counter()
+        try:
+            result = await fn(self, *args, **kwargs)
+        except BaseException:
+            metrics.record_call(name, time.perf_counter() - started, 0, failed=True)
+            raise
+        finally:
+            metrics.leave(token)
+        metrics.record_call(name, time.perf_counter() - started, _count_rows(result))
+        return result
+
+    return wrapper
@@ -0,0 +1,325 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from datetime import date, datetime, timezone
+
+from bot.core.migrations import SCHEMA_VERSION_TABLE
+
+_MASK = (1 << 64) - 1
+SKIP_TABLES = {SCHEMA_VERSION_TABLE}
+
+
+def _quote(name: str) -> str:
+    # Backticks verstehen SQLite und MySQL; nötig u. a. für die Spalte `key`.
+    return "`" + str(name).replace("`", "``") + "`"
+
+
+def column_kind(declared: str) -> str:
+    # Grobe Klasse nach den Affinitätsregeln von SQLite, passt auch auf MySQL-data_type.
+    t = str(declared or "").lower()
+    if not t:
+        return "any"
+    if "int" in t or t in {"bool", "boolean", "bit"}:
+        return "int"
+    if t.startswith("float"):
+        return "float"
+    if any(k in t for k in ("real", "doub", "dec", "numeric")):
+        return "real"
+    if any(k in t for k in ("date", "time")):
+        return "datetime"
+    if "blob" in t or "binary" in t:
+        return "blob"
+    return "text"
+
+
+# Weichen Quelle und Ziel ab (TEXT → DATETIME, REAL → FLOAT), gilt die gröbere Klasse.
+_KIND_RANK = ("any", "text", "blob", "int", "datetime", "real", "float")
+
+
+def merge_kinds(a: str, b: str) -> str:
+    return max(a, b, key=_KIND_RANK.index)
+
+
+def _canonical_any(value) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _canonical_datetime(value) -> str:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _canonical(value, kind: str = "any") -> str:
+    # Treiber liefern je nach Spaltentyp Decimal/int, datetime/str oder float32-Rundungen;
+    # erst auf den deklarierten Typ normalisieren, dann hashen.
+    if value is None:
+        return "\x00"
+    try:
+        if kind == "int":
+            return str(int(value))
+        if kind == "real":
+            return format(float(value), ".15g")
+        if kind == "float":
+            return format(float(value), ".6g")
+        if kind == "datetime":
+            return _canonical_datetime(value)
+        if kind == "blob":
+            raw = value.encode("utf-8") if isinstance(value, str) else bytes(value)
+            return raw.hex()
+        if kind == "text" and isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value).decode("utf-8", "replace")
+    except (TypeError, ValueError, ArithmeticError):
+        pass
+    return _canonical_any(value)
+
+
+def row_digest(row, kinds: list[str] | None = None) -> int:
+    kinds = kinds or ["any"] * len(row)
+    raw = "\x1f".join(_canonical(v, k) for v, k in zip(row, kinds)).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "big")
+
+
+def _keyset_where(pk: list[str]) -> str:
+    # (a, b) > (?, ?) ausgeschrieben, damit beide Dialekte den PK-Index nutzen.
+    parts = []
+    for i, col in enumerate(pk):
+        eq = [f"{_quote(c)} = ?" for c in pk[:i]]
+        parts.append("(" + " AND ".join(eq + [f"{_quote(col)} > ?"]) + ")")
+    return " OR ".join(parts)
+
+
+def _keyset_params(last: list) -> tuple:
+    params = []
+    for i in range(len(last)):
+        params.extend(last[: i + 1])
+    return tuple(params)
+
+
+class TransferState:
+    def __init__(self, path: str):
+        self.path = path
+        self.tables: dict[str, dict] = {}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.tables = (json.load(f) or {}).get("tables", {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"tables": self.tables}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def table(self, name: str) -> dict:
+        return self.tables.setdefault(name, {"last_key": None, "rows": 0, "checksum": 0, "done": False})
+
+
+class _Throttle:
+    def __init__(self, rows_per_second: float):
+        self.rate = float(rows_per_second or 0)
+        self.started = time.perf_counter()
+        self.rows = 0
+
+    async def account(self, rows: int):
+        self.rows += rows
+        if self.rate <= 0:
+            return
+        ahead = self.rows / self.rate - (time.perf_counter() - self.started)
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+
+
+async def _stream(db, table: str, columns: list[str], pk: list[str], batch_size: int, last_key=None):
+    select = f"SELECT {', '.join(_quote(c) for c in columns)} FROM {_quote(table)}"
+    order = f" ORDER BY {', '.join(_quote(c) for c in pk)} LIMIT ?;"
+    key_idx = [columns.index(c) for c in pk]
+    while True:
+        if last_key is None:
+            cur = await db._conn.execute(select + order, (batch_size,))
+        else:
+            cur = await db._conn.execute(
+                select + f" WHERE {_keyset_where(pk)}" + order,
+                (*_keyset_params(list(last_key)), batch_size),
+            )
+        rows = await cur.fetchall()
+        if not rows:
+            return
+        last_key = [rows[-1][i] for i in key_idx]
+        yield rows, last_key
+        if len(rows) < batch_size:
+            return
+
+
+async def copy_table(source, target, table: str, state: TransferState, batch_size: int, throttle: _Throttle, log=print) -> dict:
+    entry = state.table(table)
+    if entry.get("done"):
+        log(f"  {table}: bereits übertragen ({entry['rows']} Zeilen)")
+        return entry
+    src_cols, pk = await source.table_columns(table)
+    dst_cols, _ = await target.table_columns(table)
+    if not dst_cols:
+        entry.update({"done": True, "skipped": "fehlt im Ziel"})
+        log(f"  {table}: übersprungen (Tabelle fehlt im Ziel)")
+        return entry
+    if not pk:
+        entry.update({"done": True, "skipped": "kein Primärschlüssel"})
+        log(f"  {table}: übersprungen (kein Primärschlüssel)")
+        return entry
+    columns = [c for c in src_cols if c in set(dst_cols)]
+    src_types = await source.table_column_types(table)
+    dst_types = await target.table_column_types(table)
+    kinds = [merge_kinds(column_kind(src_types.get(c)), column_kind(dst_types.get(c))) for c in columns]
+    if entry.get("rows") and entry.get("kinds") != kinds:
+        # Stand aus einer älteren Prüfsummen-Variante: Tabelle neu übertragen (REPLACE ist idempotent).
+        entry.update({"last_key": None, "rows": 0, "checksum": 0})
+    insert = (
+        f"INSERT OR REPLACE INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)});"
+    )
+    started = time.perf_counter()
+    copied = 0
+    async for rows, last_key in _stream(source, table, columns, pk, batch_size, entry.get("last_key")):
+        await target._conn.executemany(insert, [tuple(r) for r in rows])
+        await target._conn.commit()
+        checksum = int(entry.get("checksum", 0))
+        for r in rows:
+            checksum = (checksum + row_digest(r, kinds)) & _MASK
+        entry.update({"last_key": last_key, "rows": int(entry["rows"]) + len(rows), "checksum": checksum})
+        entry["columns"] = columns
+        entry["pk"] = pk
+        entry["kinds"] = kinds
+        state.save()
+        copied += len(rows)
+        await throttle.account(len(rows))
+    entry["done"] = True
+    entry.setdefault("columns", columns)
+    entry.setdefault("pk", pk)
+    entry.setdefault("kinds", kinds)
+    state.save()
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    log(f"  {table}: {entry['rows']} Zeilen ({copied} neu, {copied / elapsed:,.0f} Zeilen/s)")
+    return entry
+
+
+async def verify_table(target, table: str, entry: dict, batch_size: int) -> tuple[bool, int, int]:
+    if entry.get("skipped"):
+        return True, 0, 0
+    rows = 0
+    checksum = 0
+    kinds = entry.get("kinds")
+    async for batch, _ in _stream(target, table, entry["columns"], entry["pk"], batch_size):
+        rows += len(batch)
+        for r in batch:
+            checksum = (checksum + row_digest(r, kinds)) & _MASK
+    ok = rows == int(entry["rows"]) and checksum == int(entry["checksum"])
+    return ok, rows, checksum
+
+
+def _build(settings, driver: str, sqlite_path: str | None):
+    from bot.core.db import Database
+
+    if driver == "mysql":
+        return Database(mysql=settings.get("database.mysql", {}) or {})
+    path = sqlite_path or str(settings.get("database.sqlite_path", "data/starry.db") or "data/starry.db")
+    return Database(path=path)
+
+
+async def _run(args) -> int:
+    from bot.core.settings import SettingsManager
+
+    settings = SettingsManager(
+        config_path="config/config.yml",
+        override_path="data/settings.json",
+    )
+    await settings.load()
+    source = _build(settings, args.source, args.sqlite_path)
+    target = _build(settings, args.target, args.sqlite_path)
+    state = TransferState(args.state)
+    if args.resume:
+        state.load()
+    elif os.path.exists(args.state):
+        os.remove(args.state)
+    if args.source == "sqlite" and not os.path.exists(source.path):
+        print(f"Quelle {source.path} existiert nicht.")
+        return 2
+    # Quelle nur verbinden: init() würde Migrationen und Seeds auf der Quelle ausführen.
+    # Nur das Ziel bekommt das aktuelle Schema.
+    await source.connect()
+    await target.init()
+    try:
+        tables = [t for t in await source.list_tables() if t not in SKIP_TABLES]
+        if args.tables:
+            wanted = {t.strip() for t in args.tables.split(",") if t.strip()}
+            tables = [t for t in tables if t in wanted]
+        print(f"{args.source} → {args.target}: {len(tables)} Tabellen, Batch {args.batch_size}")
+        throttle = _Throttle(args.rows_per_second)
+        started = time.perf_counter()
+        for table in tables:
+            await copy_table(source, target, table, state, args.batch_size, throttle)
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        print(f"Fertig: {throttle.rows} Zeilen in {elapsed:.1f}s ({throttle.rows / elapsed:,.0f} Zeilen/s)")
+        if args.no_verify:
+            return 0
+        failed = 0
+        for table in tables:
+            entry = state.table(table)
+            ok, rows, checksum = await verify_table(target, table, entry, args.batch_size)
+            if not ok:
+                failed += 1
+                print(
+                    f"  ABWEICHUNG {table}: Quelle {entry['rows']} Zeilen / {int(entry['checksum']):016x}, "
+                    f"Ziel {rows} Zeilen / {checksum:016x}"
+                )
+        print("Prüfsummen ok." if not failed else f"{failed} Tabelle(n) mit Abweichungen.")
+        return 1 if failed else 0
+    finally:
+        await source.close()
+        await target.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bot.core.db_transfer",
+        description="Überträgt alle Tabellen zwischen SQLite und MySQL.",
+    )
+    parser.add_argument("--from", dest="source", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--to", dest="target", choices=("sqlite", "mysql"), default="mysql")
+    parser.add_argument("--sqlite-path", default=None, help="abweichender Pfad zur SQLite-Datei")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--rows-per-second", type=float, default=0, help="Durchsatzgrenze, 0 = unbegrenzt")
+    parser.add_argument("--tables", default="", help="kommagetrennte Auswahl")
+    parser.add_argument("--state", default="data/db_transfer_state.json")
+    parser.add_argument("--resume", action="store_true", help="abgebrochene Übertragung fortsetzen")
+    parser.add_argument("--no-verify", action="store_true", help="Prüfsummenvergleich überspringen")
+    args = parser.parse_args(argv)
+    if args.source == args.target:
+        parser.error("--from und --to müssen verschieden sein")
+    args.batch_size = max(1, int(args.batch_size))
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import os
+import sys
+import asyncio
+import argparse
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    sqlite: Callable[..., Awaitable[None]] | None = None
+    mysql: Callable[..., Awaitable[None]] | None = None
+
+    def step_for(self, driver: str):
+        return self.mysql if driver == "mysql" else self.sqlite
+
+
+async def _baseline(db):
+    await db._create_tables()
+
+
+async def _parliament_party_bigint(db):
+    await db._ensure_parliament_party_bigint_columns()
+
+
+async def _epoch_time_columns(db):
+    await db._ensure_epoch_columns()
+
+
+async def _incremental_vacuum(db):
+    await db._enable_incremental_vacuum()
+
+
+async def _activity_rollups(db):
+    await db._create_activity_tables()
+
+
+async def _runtime_state(db):
+    await db._create_runtime_state_table()
+
+
+async def _scheduled_jobs(db):
+    await db._create_scheduled_jobs_table()
+
+
+# Reihenfolge = Versionsnummer. Neue Schritte immer hinten anhängen, bestehende nie ändern.
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline", sqlite=_baseline, mysql=_baseline),
+    Migration(2, "parliament_party_bigint_columns", mysql=_parliament_party_bigint),
+    Migration(3, "epoch_time_columns", sqlite=_epoch_time_columns, mysql=_epoch_time_columns),
+    Migration(4, "sqlite_incremental_vacuum", sqlite=_incremental_vacuum),
+    Migration(5, "activity_rollups", sqlite=_activity_rollups, mysql=_activity_rollups),
+    Migration(6, "runtime_state", sqlite=_runtime_state, mysql=_runtime_state),
+    Migration(7, "scheduled_jobs", sqlite=_scheduled_jobs, mysql=_scheduled_jobs),
+]
+
+LATEST_VERSION = max(m.version for m in MIGRATIONS)
+
+
+def pending_for(version: int) -> list[Migration]:
+    return [m for m in MIGRATIONS if m.version > int(version)]
+
+
+def _print_plan(driver: str, current: int) -> list[Migration]:
+    pending = pending_for(current)
+    print(f"Treiber: {driver} | Schema-Version: {current} | Ziel: {LATEST_VERSION}")
+    if not pending:
+        print("Schema ist aktuell.")
+        return pending
+    for m in pending:
+        step = "ja" if m.step_for(driver) else "nein (nur Versionseintrag)"
+        print(f"  [{m.version:03d}] {m.name} – DDL: {step}")
+    return pending
+
+
+async def _run(dry_run: bool) -> int:
+    from bot.core.settings import SettingsManager
+    from bot.core.db import Database
+
+    settings = SettingsManager(
+        config_path="config/config.yml",
+        override_path="data/settings.json",
+    )
+    await settings.load()
+    db = Database.from_settings(settings)
+    if dry_run and db._driver == "sqlite" and not os.path.exists(db.path or "data/starry.db"):
+        # connect() würde Verzeichnis und leere Datei anlegen; ein Dry-Run ändert nichts.
+        pending = _print_plan(db._driver, 0)
+        print(f"{len(pending)} Migration(en) ausstehend (Dry-Run, Datenbank existiert noch nicht).")
+        return 0
+    await db.connect()
+    try:
+        current = await db.schema_version()
+        pending = _print_plan(db._driver, current)
+        if not pending:
+            return 0
+        if dry_run:
+            print(f"{len(pending)} Migration(en) ausstehend (Dry-Run, nichts geändert).")
+            return 0
+        applied = await db.migrate()
+        print(f"{len(applied)} Migration(en) angewendet.")
+        return 0
+    finally:
+        await db.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bot.core.migrations",
+        description="Zeigt ausstehende Schema-Migrationen an und wendet sie an.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="nur anzeigen, was angewendet würde",
+    )
+    args = parser.parse_args(argv)
+    return asyncio.run(_run(args.dry_run))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
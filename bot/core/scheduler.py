@@ -0,0 +1,213 @@
+import json
+import math
+import time
+import heapq
+import asyncio
+import inspect
+import itertools
+from dataclasses import dataclass
+
+
+@dataclass
+class Job:
+    kind: str
+    ref: str
+    due_ts: float
+    guild_id: int = 0
+    payload: dict | None = None
+    persist: bool = True
+    attempts: int = 0
+    seq: int = 0
+
+
+class Scheduler:
+    # Ein Loop für alle Fristen (Giveaway-Ende, Reminder, AFK-Ablauf, Mitternacht, ...).
+    # Min-Heap im Speicher, einmalige Jobs zusätzlich in scheduled_jobs, damit sie einen
+    # Neustart überleben. Geschlafen wird genau bis zur nächsten Frist.
+    def __init__(self, db, max_sleep_seconds: float = 900.0, retry_seconds: float = 30.0,
+                 max_attempts: int = 5, on_error=None):
+        self.db = db
+        # Obergrenze nur gegen Uhrsprünge (Suspend, NTP); ohne Jobs wird gar nicht geweckt.
+        self.max_sleep_seconds = max(1.0, float(max_sleep_seconds))
+        self.retry_seconds = max(1.0, float(retry_seconds))
+        self.max_attempts = max(1, int(max_attempts))
+        self.on_error = on_error
+        self._handlers: dict[str, object] = {}
+        self._intervals: dict[str, float] = {}
+        self._jobs: dict[tuple[str, str], Job] = {}
+        # wake() für einen gerade laufenden wiederkehrenden Job
+        self._woken: dict[str, float] = {}
+        self._heap: list[tuple[float, int, str, str]] = []
+        self._seq = itertools.count(1)
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._running: set[asyncio.Task] = set()
+        self.fired = 0
+        self.failed = 0
+
+    def register(self, kind: str, handler):
+        # handler(job) für einmalige Fristen; darf sync oder async sein.
+        self._handlers[str(kind)] = handler
+
+    def every(self, kind: str, seconds: float, handler, delay: float = 0.0):
+        # Wiederkehrende Arbeit ohne eigene Frist. handler() darf den nächsten Zeitpunkt
+        # (Epoch) zurückgeben, sonst gilt das Intervall.
+        kind = str(kind)
+        self._handlers[kind] = handler
+        self._intervals[kind] = max(1.0, float(seconds))
+        self._push(Job(kind, "", time.time() + max(0.0, float(delay)), persist=False))
+
+    async def load(self) -> int:
+        count = 0
+        for kind, ref, guild_id, due_ts, payload_json in await self.db.list_scheduled_jobs():
+            key = (str(kind), str(ref))
+            if key in self._jobs:
+                continue
+            try:
+                payload = json.loads(payload_json) if payload_json else None
+            except Exception:
+                payload = None
+            self._push(Job(key[0], key[1], float(due_ts or 0), int(guild_id or 0), payload))
+            count += 1
+        return count
+
+    async def schedule(self, kind: str, ref, due_ts: float, guild_id: int = 0, payload: dict | None = None,
+                       persist: bool = True):
+        job = Job(str(kind), str(ref), float(due_ts), int(guild_id or 0), payload, persist=persist)
+        if persist:
+            await self.db.upsert_scheduled_job(
+                job.kind, job.ref, job.guild_id, math.ceil(job.due_ts),
+                json.dumps(payload, ensure_ascii=False) if payload is not None else None,
+            )
+        self._push(job)
+
+    async def cancel(self, kind: str, ref):
+        key = (str(kind), str(ref))
+        job = self._jobs.pop(key, None)
+        if job is None or job.persist:
+            await self.db.delete_scheduled_job(*key)
+
+    def wake(self, kind: str, ref="", at: float | None = None):
+        # Wiederkehrenden Job vorziehen (neues Ticket, geänderte Settings). Nie nach hinten.
+        job = self._jobs.get((str(kind), str(ref)))
+        due = time.time() if at is None else float(at)
+        if job is None:
+            if str(kind) in self._intervals:
+                self._woken[str(kind)] = min(due, self._woken.get(str(kind), math.inf))
+            return
+        if job.due_ts <= due:
+            return
+        self._push(Job(job.kind, job.ref, due, job.guild_id, job.payload, job.persist))
+
+    def _push(self, job: Job):
+        job.seq = next(self._seq)
+        self._jobs[(job.kind, job.ref)] = job
+        heapq.heappush(self._heap, (job.due_ts, job.seq, job.kind, job.ref))
+        if self._heap[0][1] == job.seq:
+            self._wake.set()
+
+    def _peek(self) -> Job | None:
+        # Verworfene bzw. verschobene Einträge bleiben im Heap, bis sie oben ankommen.
+        while self._heap:
+            _, seq, kind, ref = self._heap[0]
+            job = self._jobs.get((kind, ref))
+            if job is not None and job.seq == seq:
+                return job
+            heapq.heappop(self._heap)
+        return None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            job = self._peek()
+            if job is None:
+                await self._wake.wait()
+                continue
+            delay = job.due_ts - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=min(delay, self.max_sleep_seconds))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            del self._jobs[(job.kind, job.ref)]
+            task = asyncio.get_running_loop().create_task(self._execute(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _execute(self, job: Job):
+        handler = self._handlers.get(job.kind)
+        interval = self._intervals.get(job.kind)
+        key = (job.kind, job.ref)
+        result, error = None, None
+        try:
+            if handler is None:
+                raise LookupError(f"kein Handler für {job.kind}")
+            result = handler() if interval is not None else handler(job)
+            if inspect.isawaitable(result):
+                result = await result
+            self.fired += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            error = exc
+            self.failed += 1
+        if error is not None:
+            await self._report(job, error)
+        if key in self._jobs:
+            # Während der Ausführung neu geplant: der neue Termin gilt.
+            return
+        if interval is not None:
+            now = time.time()
+            nxt = float(result) if isinstance(result, (int, float)) and error is None else now + interval
+            nxt = min(nxt, self._woken.pop(job.kind, math.inf))
+            self._push(Job(job.kind, job.ref, max(now, nxt), persist=False))
+            return
+        if error is not None and handler is not None and job.attempts + 1 < self.max_attempts:
+            job.attempts += 1
+            job.due_ts = time.time() + self.retry_seconds * 2 ** (job.attempts - 1)
+            self._push(job)
+            return
+        if job.persist:
+            try:
+                await self.db.delete_scheduled_job(*key)
+            except Exception as exc:
+                await self._report(job, exc)
+
+    async def _report(self, job: Job, error: Exception):
+        if not self.on_error:
+            return
+        try:
+            result = self.on_error(job, error)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            pass
+
+    async def close(self):
+        task = self._task
+        self._task = None
+        running = list(self._running)
+        self._running.clear()
+        pending = [t for t in [task, *running] if t is not None and not t.done()]
+        for t in pending:
+            t.cancel()
+        # Abwarten, bis abgebrochene Handler wirklich beendet sind, bevor der Bot die DB schließt.
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> dict:
+        nxt = self._peek()
+        return {
+            "jobs": len(self._jobs),
+            "periodic": len(self._intervals),
+            "next_kind": nxt.kind if nxt else None,
+            "next_in_seconds": round(max(0.0, nxt.due_ts - time.time()), 3) if nxt else None,
+            "fired": int(self.fired),
+            "failed": int(self.failed),
+        }
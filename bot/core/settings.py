@@ -2,7 +2,148 @@ import os
 import json
 import yaml
 import asyncio
+import inspect
 from copy import deepcopy
+from dataclasses import dataclass
+
+_MISSING = object()
+_INVALID = object()
+# Markiert Schlüssel, die eine Gilden-Ebene durch einen Nicht-Dict-Wert verdeckt.
+_SHADOWED = object()
+
+
+def _to_bool(v) -> bool:
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, str):
+        return v.lower() in {"true", "1", "yes", "on"}
+    return bool(v)
+
+
+def _overlay(base, layer):
+    # Rekursives Zusammenführen ohne Kopien: nur die Pfade, die layer berührt,
+    # bekommen neue (flache) Dicts, alles andere wird mit base geteilt.
+    if not layer:
+        return base
+    if not isinstance(base, dict):
+        return layer
+    out = dict(base)
+    for key, value in layer.items():
+        below = out.get(key)
+        out[key] = _overlay(below, value) if isinstance(below, dict) and isinstance(value, dict) else value
+    return out
+
+
+@dataclass(frozen=True)
+class SettingsChange:
+    # Oberste Config-Abschnitte, die sich geändert haben (z. B. "user_stats").
+    sections: frozenset[str]
+    guild_id: int | None = None
+    source: str = "reload"
+
+
+class SettingsTable:
+    # Flache Sicht auf eine zusammengeführte Konfiguration: "a.b.c" -> Wert.
+    # Zwischenknoten stehen mit drin, get("a.b") liefert also weiterhin das Dict.
+    # Mit parent enthält die Tabelle nur die Schlüssel der eigenen Ebene und
+    # fragt für alles andere die darunterliegende Tabelle.
+    # Mit reuse werden nur die Abschnitte in sections neu indiziert, der Rest
+    # (inkl. int/bool-Ansichten) wird aus der alten Tabelle übernommen.
+    __slots__ = ("version", "merged", "parent", "_values", "_ints", "_bools")
+
+    def __init__(self, merged: dict, version: int, parent: "SettingsTable | None" = None, layer: dict | None = None,
+                 reuse: "SettingsTable | None" = None, sections: set[str] | None = None):
+        self.version = int(version)
+        self.merged = merged
+        self.parent = parent
+        self._values: dict[str, object] = {}
+        self._ints: dict[str, object] = {}
+        self._bools: dict[str, bool] = {}
+        if parent is not None:
+            self._index_layer(layer or {}, merged, "")
+        elif reuse is not None:
+            self._carry(reuse, sections or set())
+        else:
+            self._index(merged, "")
+
+    def _carry(self, old: "SettingsTable", sections: set[str]):
+        for target, source in ((self._values, old._values), (self._ints, old._ints), (self._bools, old._bools)):
+            for dotted, value in source.items():
+                if dotted.partition(".")[0] not in sections:
+                    target[dotted] = value
+        for key, value in self.merged.items():
+            if str(key) in sections:
+                self._values[str(key)] = value
+                if isinstance(value, dict):
+                    self._index(value, str(key))
+
+    def _index(self, node: dict, prefix: str):
+        for key, value in node.items():
+            dotted = f"{prefix}.{key}" if prefix else str(key)
+            self._values[dotted] = value
+            if isinstance(value, dict):
+                self._index(value, dotted)
+
+    def _index_layer(self, layer: dict, merged: dict, prefix: str):
+        for key, value in layer.items():
+            dotted = f"{prefix}.{key}" if prefix else str(key)
+            node = merged[key]
+            below = self.parent._values.get(dotted)
+            self._values[dotted] = node
+            if isinstance(value, dict) and isinstance(below, dict):
+                self._index_layer(value, node, dotted)
+                continue
+            if isinstance(below, dict):
+                self._shadow(below, dotted)
+            if isinstance(value, dict):
+                self._index(value, dotted)
+
+    def _shadow(self, node: dict, prefix: str):
+        for key, value in node.items():
+            dotted = f"{prefix}.{key}"
+            self._values[dotted] = _SHADOWED
+            if isinstance(value, dict):
+                self._shadow(value, dotted)
+
+    def get(self, dotted: str, default=None):
+        v = self._values.get(dotted, _MISSING)
+        if v is _MISSING:
+            return self.parent.get(dotted, default) if self.parent is not None else default
+        return default if v is _SHADOWED else v
+
+    def get_int(self, dotted: str, default: int = 0) -> int:
+        if self.parent is not None and dotted not in self._values:
+            return self.parent.get_int(dotted, default)
+        v = self._ints.get(dotted, _MISSING)
+        if v is _MISSING:
+            raw = self._values.get(dotted, _MISSING)
+            if raw is _MISSING or raw is _SHADOWED:
+                try:
+                    return int(default)
+                except Exception:
+                    return default
+            try:
+                v = int(raw)
+            except Exception:
+                v = _INVALID
+            self._ints[dotted] = v
+        return default if v is _INVALID else v
+
+    def get_bool(self, dotted: str, default: bool = False) -> bool:
+        if self.parent is not None and dotted not in self._values:
+            return self.parent.get_bool(dotted, default)
+        v = self._bools.get(dotted)
+        if v is None:
+            raw = self._values.get(dotted, _MISSING)
+            if raw is _MISSING or raw is _SHADOWED:
+                return _to_bool(default)
+            v = _to_bool(raw)
+            self._bools[dotted] = v
+        return v
+
+    def size(self) -> int:
+        return len(self._values)
+
 
 class SettingsManager:
     def __init__(self, config_path: str, override_path: str):
@@ -12,25 +153,42 @@ class SettingsManager:
         self._base = {}
         self._override = {}
         self._merged = {}
+        self._base_mtime = 0.0
         self._override_mtime = 0.0
+        self._subscribers = []
         self._guild_overrides = {}
-        self._guild_cache = {}
+        self._version = 0
+        self._table = SettingsTable({}, 0)
+        self._guild_cache: dict[int, SettingsTable] = {}
 
     async def load(self):
         async with self._lock:
             self._base = self._load_yaml(self.config_path)
             self._override = self._load_json(self.override_path)
-            self._merged = self._merge(deepcopy(self._base), deepcopy(self._override))
+            self._merged = _overlay(self._base, self._override)
+            self._base_mtime = self._get_mtime(self.config_path)
             self._override_mtime = self._get_mtime(self.override_path)
+            self._rebuild()
 
-    async def reload_if_changed(self) -> bool:
-        mtime = self._get_mtime(self.override_path)
-        if mtime <= 0:
-            return False
-        if mtime == self._override_mtime:
-            return False
-        await self.load()
-        return True
+    async def reload_if_changed(self) -> set[str]:
+        # Liefert die geänderten Abschnitte; leer, wenn sich nichts getan hat.
+        base_mtime = self._get_mtime(self.config_path)
+        override_mtime = self._get_mtime(self.override_path)
+        base_changed = base_mtime > 0 and base_mtime != self._base_mtime
+        override_changed = override_mtime > 0 and override_mtime != self._override_mtime
+        if not base_changed and not override_changed:
+            return set()
+        async with self._lock:
+            if base_changed:
+                self._base = self._load_yaml(self.config_path)
+                self._base_mtime = base_mtime
+            if override_changed:
+                self._override = self._load_json(self.override_path)
+                self._override_mtime = override_mtime
+            changed = self._apply_merged(_overlay(self._base, self._override))
+        if changed:
+            await self._publish(SettingsChange(frozenset(changed)))
+        return changed
 
     async def set_override(self, path: str, value):
         async with self._lock:
@@ -39,8 +197,10 @@ class SettingsManager:
             os.makedirs(os.path.dirname(self.override_path), exist_ok=True)
             with open(self.override_path, "w", encoding="utf-8") as f:
                 json.dump(self._override, f, ensure_ascii=False, indent=2)
-            self._merged = self._merge(deepcopy(self._base), deepcopy(self._override))
             self._override_mtime = self._get_mtime(self.override_path)
+            changed = self._apply_merged(_overlay(self._base, self._override))
+        if changed:
+            await self._publish(SettingsChange(frozenset(changed), source="override"))
 
     async def replace_overrides(self, data: dict):
         async with self._lock:
@@ -48,8 +208,29 @@ class SettingsManager:
             with open(self.override_path, "w", encoding="utf-8") as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             self._override = data
-            self._merged = self._merge(deepcopy(self._base), deepcopy(self._override))
             self._override_mtime = self._get_mtime(self.override_path)
+            changed = self._apply_merged(_overlay(self._base, self._override))
+        if changed:
+            await self._publish(SettingsChange(frozenset(changed), source="override"))
+
+    def subscribe(self, callback):
+        # callback(change: SettingsChange), darf sync oder async sein.
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    async def _publish(self, change: SettingsChange):
+        for callback in list(self._subscribers):
+            try:
+                result = callback(change)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                pass
 
     def dump(self) -> dict:
         return deepcopy(self._merged)
@@ -60,57 +241,33 @@ class SettingsManager:
     def dump_guild_overrides(self, guild_id: int) -> dict:
         return deepcopy(self._guild_overrides.get(int(guild_id), {}))
 
+    def table(self, guild_id: int | None = None) -> SettingsTable:
+        # Versionierter Handle: version ändert sich bei jedem Neuaufbau, abgeleitete
+        # Strukturen können daran ihren Cache festmachen.
+        if not guild_id:
+            return self._table
+        return self._guild_table(int(guild_id))
+
+    def version(self, guild_id: int | None = None) -> int:
+        return self.table(guild_id).version
+
     def get(self, dotted: str, default=None):
-        node = self._merged
-        for part in dotted.split("."):
-            if not isinstance(node, dict):
-                return default
-            if part not in node:
-                return default
-            node = node[part]
-        return node
+        return self._table.get(dotted, default)
 
     def get_int(self, dotted: str, default: int = 0) -> int:
-        v = self.get(dotted, default)
-        try:
-            return int(v)
-        except Exception:
-            return default
+        return self._table.get_int(dotted, default)
 
     def get_bool(self, dotted: str, default: bool = False) -> bool:
-        v = self.get(dotted, default)
-        if isinstance(v, bool):
-            return v
-        if isinstance(v, str):
-            return v.lower() in {"true", "1", "yes", "on"}
-        return bool(v)
+        return self._table.get_bool(dotted, default)
 
     def get_guild(self, guild_id: int, dotted: str, default=None):
-        if not guild_id:
-            return self.get(dotted, default)
-        node = self._get_guild_merged(int(guild_id))
-        for part in dotted.split("."):
-            if not isinstance(node, dict):
-                return default
-            if part not in node:
-                return default
-            node = node[part]
-        return node
+        return self.table(guild_id).get(dotted, default)
 
     def get_guild_int(self, guild_id: int, dotted: str, default: int = 0) -> int:
-        v = self.get_guild(guild_id, dotted, default)
-        try:
-            return int(v)
-        except Exception:
-            return default
+        return self.table(guild_id).get_int(dotted, default)
 
     def get_guild_bool(self, guild_id: int, dotted: str, default: bool = False) -> bool:
-        v = self.get_guild(guild_id, dotted, default)
-        if isinstance(v, bool):
-            return v
-        if isinstance(v, str):
-            return v.lower() in {"true", "1", "yes", "on"}
-        return bool(v)
+        return self.table(guild_id).get_bool(dotted, default)
 
     async def load_guild_overrides(self, db, guild_id: int | None = None):
         if guild_id:
@@ -144,15 +301,36 @@ class SettingsManager:
             self._set_path(node, path, value)
             self._guild_overrides[int(guild_id)] = node
             self._guild_cache.pop(int(guild_id), None)
+        await self._publish(SettingsChange(frozenset({str(path).split(".")[0]}), guild_id=int(guild_id), source="guild_override"))
 
     async def replace_guild_overrides(self, db, guild_id: int, data: dict):
         async with self._lock:
-            await db.delete_guild_configs(int(guild_id))
             flat = self._flatten(data)
-            for key, value in flat.items():
-                await db.set_guild_config(int(guild_id), str(key), json.dumps(value, ensure_ascii=False))
+            await db.replace_guild_configs(
+                int(guild_id),
+                {str(key): json.dumps(value, ensure_ascii=False) for key, value in flat.items()},
+            )
+            # Speicher erst nach dem Commit umschalten, vorher sieht die Gilde die alte Config.
+            sections = {str(k) for k in set(self._guild_overrides.get(int(guild_id), {})) | set(data)}
             self._guild_overrides[int(guild_id)] = data
             self._guild_cache.pop(int(guild_id), None)
+        await self._publish(SettingsChange(frozenset(sections), guild_id=int(guild_id), source="guild_override"))
+
+    async def remove_guild_override(self, db, guild_id: int, path: str) -> bool:
+        # Entfernt einen Override samt aller Unterschlüssel; False, wenn es ihn nicht gibt.
+        gid = int(guild_id)
+        async with self._lock:
+            parts = str(path).split(".")
+            node = self._guild_overrides.get(gid, {})
+            for p in parts[:-1]:
+                node = node.get(p) if isinstance(node, dict) else None
+            if not isinstance(node, dict) or parts[-1] not in node:
+                return False
+            await db.delete_guild_config_tree(gid, str(path))
+            node.pop(parts[-1], None)
+            self._guild_cache.pop(gid, None)
+        await self._publish(SettingsChange(frozenset({parts[0]}), guild_id=gid, source="guild_override"))
+        return True
 
     def _load_yaml(self, path: str) -> dict:
         if not os.path.exists(path):
@@ -170,14 +348,6 @@ class SettingsManager:
         except Exception:
             return {}
 
-    def _merge(self, base: dict, override: dict) -> dict:
-        for k, v in override.items():
-            if k in base and isinstance(base[k], dict) and isinstance(v, dict):
-                base[k] = self._merge(base[k], v)
-            else:
-                base[k] = v
-        return base
-
     def _set_path(self, root: dict, dotted: str, value):
         parts = dotted.split(".")
         node = root
@@ -187,14 +357,39 @@ class SettingsManager:
             node = node[p]
         node[parts[-1]] = value
 
-    def _get_guild_merged(self, guild_id: int) -> dict:
+    def _next_version(self) -> int:
+        self._version += 1
+        return self._version
+
+    def _apply_merged(self, merged: dict) -> set[str]:
+        # Nur geänderte oberste Abschnitte werden ersetzt; unveränderte behalten
+        # ihre Objekte, damit an ihnen hängende Caches gültig bleiben.
+        old = self._merged
+        changed = {str(k) for k in set(old) | set(merged) if old.get(k, _MISSING) != merged.get(k, _MISSING)}
+        if not changed:
+            return changed
+        self._merged = {k: (v if str(k) in changed else old[k]) for k, v in merged.items()}
+        self._table = SettingsTable(self._merged, self._next_version(), reuse=self._table, sections=changed)
+        self._guild_cache = {}
+        return changed
+
+    def _rebuild(self):
+        # Gilden-Ebenen liegen auf der globalen Tabelle und werden lazy neu aufgesetzt.
+        self._table = SettingsTable(self._merged, self._next_version())
+        self._guild_cache = {}
+
+    def _guild_table(self, guild_id: int) -> SettingsTable:
         gid = int(guild_id)
         cached = self._guild_cache.get(gid)
         if cached is not None:
             return cached
-        merged = self._merge(deepcopy(self._base), deepcopy(self._guild_overrides.get(gid, {})))
-        self._guild_cache[gid] = merged
-        return merged
+        layer = self._guild_overrides.get(gid) or {}
+        table = SettingsTable(_overlay(self._merged, layer), self._next_version(), parent=self._table, layer=layer)
+        self._guild_cache[gid] = table
+        return table
+
+    def _get_guild_merged(self, guild_id: int) -> dict:
+        return self._guild_table(guild_id).merged
 
     def _flatten(self, root: dict, prefix: str = "") -> dict:
         out = {}
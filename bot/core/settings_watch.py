@@ -0,0 +1,135 @@
+import os
+import struct
+import asyncio
+import ctypes
+import ctypes.util
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# Verzeichnisse beobachten statt Dateien: Editoren und json.dump über
+# os.replace tauschen die Datei aus, ein Datei-Watch wäre danach tot.
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT = struct.Struct("iIII")
+
+
+class _Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._watches: dict[int, str] = {}
+
+    def add(self, directory: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), directory)
+        self._watches[wd] = directory
+
+    def read(self) -> list[str]:
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except (BlockingIOError, InterruptedError):
+            return []
+        paths = []
+        pos = 0
+        while pos + _EVENT.size <= len(data):
+            wd, _mask, _cookie, length = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            name = data[pos:pos + length].rstrip(b"\0")
+            pos += length
+            directory = self._watches.get(wd)
+            if directory and name:
+                paths.append(os.path.join(directory, os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class SettingsWatcher:
+    def __init__(self, settings, debounce_seconds: float = 0.5):
+        self.settings = settings
+        self.debounce_seconds = max(0.0, float(debounce_seconds))
+        self.backend: str | None = None
+        self._inotify: _Inotify | None = None
+        self._paths: set[str] = set()
+        self._due = 0.0
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self) -> bool:
+        # False = kein inotify verfügbar, der Aufrufer fällt auf Polling zurück.
+        if self._inotify is not None:
+            return True
+        self._paths = {
+            os.path.abspath(p)
+            for p in (self.settings.config_path, self.settings.override_path)
+            if p
+        }
+        try:
+            loop = asyncio.get_running_loop()
+            inotify = _Inotify()
+        except Exception:
+            return False
+        try:
+            for directory in sorted({os.path.dirname(p) for p in self._paths}):
+                inotify.add(directory)
+            loop.add_reader(inotify.fd, self._on_readable)
+        except Exception:
+            inotify.close()
+            return False
+        self._inotify = inotify
+        self._loop = loop
+        self.backend = "inotify"
+        return True
+
+    def _on_readable(self):
+        if self._inotify is None:
+            return
+        if any(path in self._paths for path in self._inotify.read()):
+            self._schedule()
+
+    def _schedule(self):
+        # Nachlaufendes Debounce: jedes weitere Event schiebt den Reload nach hinten.
+        self._due = self._loop.time() + self.debounce_seconds
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._reload_when_quiet())
+
+    async def _reload_when_quiet(self):
+        while True:
+            delay = self._due - self._loop.time()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        try:
+            await self.settings.reload_if_changed()
+        except Exception:
+            pass
+
+    def stop(self):
+        inotify = self._inotify
+        self._inotify = None
+        if inotify is not None:
+            try:
+                self._loop.remove_reader(inotify.fd)
+            except Exception:
+                pass
+            inotify.close()
+        task = self._task
+        self._task = None
+        if task and not task.done():
+            task.cancel()
+        self.backend = None
@@ -0,0 +1,66 @@
+import re
+
+_ON_CONFLICT_RE = re.compile(r"ON\s+CONFLICT\s*\([^\)]*\)\s+DO\s+UPDATE\s+SET", re.IGNORECASE)
+_EXCLUDED_RE = re.compile(r"excluded\.([A-Za-z0-9_]+)", re.IGNORECASE)
+_CREATE_INDEX_RE = re.compile(r"CREATE\s+INDEX\s+IF\s+NOT\s+EXISTS", re.IGNORECASE)
+_AUTOINCREMENT_PK_RE = re.compile(r"INTEGER\s+PRIMARY\s+KEY\s+AUTOINCREMENT", re.IGNORECASE)
+_INTEGER_RE = re.compile(r"\bINTEGER\b", re.IGNORECASE)
+
+
+def mysql_ddl(sql: str) -> str:
+    normalized = _CREATE_INDEX_RE.sub("CREATE INDEX", sql)
+    normalized = _AUTOINCREMENT_PK_RE.sub("BIGINT AUTO_INCREMENT PRIMARY KEY", normalized)
+    normalized = _INTEGER_RE.sub("BIGINT", normalized)
+    return normalized.replace("AUTOINCREMENT", "AUTO_INCREMENT")
+
+
+def mysql_statement(sql: str) -> str:
+    stripped = sql.lstrip().upper()
+    if stripped.startswith("CREATE TABLE") or stripped.startswith("CREATE INDEX"):
+        return mysql_ddl(sql)
+    normalized = sql.replace("INSERT OR IGNORE", "INSERT IGNORE")
+    normalized = normalized.replace("INSERT OR REPLACE", "REPLACE")
+    normalized = _ON_CONFLICT_RE.sub("ON DUPLICATE KEY UPDATE", normalized)
+    normalized = _EXCLUDED_RE.sub(r"VALUES(\1)", normalized)
+    normalized = normalized.replace("last_insert_rowid()", "LAST_INSERT_ID()")
+    return normalized.replace("?", "%s")
+
+
+class StatementCache:
+    def __init__(self, translate, max_entries: int = 4096):
+        self._translate = translate
+        self._max_entries = max(1, int(max_entries))
+        self._cache: dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def get(self, sql: str) -> str:
+        translated = self._cache.get(sql)
+        if translated is not None:
+            self.hits += 1
+            return translated
+        translated = self._translate(sql)
+        if len(self._cache) < self._max_entries:
+            self._cache[sql] = translated
+            self.misses += 1
+        else:
+            self.uncached += 1
+        return translated
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.uncached
+        return {
+            "entries": len(self._cache),
+            "max_entries": self._max_entries,
+            "hits": int(self.hits),
+            "misses": int(self.misses),
+            "uncached": int(self.uncached),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
@@ -0,0 +1,142 @@
+import json
+import time
+import asyncio
+
+
+def _now() -> int:
+    return int(time.time())
+
+
+class StateStore:
+    # Laufzeitzustand der Module (zuletzt gepostete News, Panel-Nachrichten, ...)
+    # getrennt von der Guild-Config: eine Zeile pro Schlüssel, Schreiben gepuffert.
+    def __init__(self, db, flush_seconds: float = 2.0, purge_seconds: float = 3600.0):
+        self.db = db
+        self.flush_seconds = max(0.1, float(flush_seconds))
+        self.purge_seconds = max(60.0, float(purge_seconds))
+        # guild_id -> scope -> key -> (value, expires_ts)
+        self._data: dict[int, dict[str, dict[str, tuple]]] = {}
+        self._dirty: dict[tuple[int, str, str], bool] = {}
+        self._loaded: set[int] = set()
+        self._load_locks: dict[int, asyncio.Lock] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._last_purge = float("-inf")
+        self.flushes = 0
+
+    async def _guild(self, guild_id: int) -> dict[str, dict[str, tuple]]:
+        gid = int(guild_id)
+        if gid in self._loaded:
+            return self._data[gid]
+        lock = self._load_locks.setdefault(gid, asyncio.Lock())
+        async with lock:
+            if gid in self._loaded:
+                return self._data[gid]
+            scopes = {}
+            for scope, key, value_json, expires_ts in await self.db.list_runtime_state(gid, _now()):
+                try:
+                    value = json.loads(value_json)
+                except Exception:
+                    continue
+                scopes.setdefault(str(scope), {})[str(key)] = (value, int(expires_ts) if expires_ts else None)
+            # Schreibzugriffe, die vor dem Laden eingereiht wurden, gewinnen.
+            pending = self._data.get(gid)
+            if pending:
+                for scope, entries in pending.items():
+                    scopes.setdefault(scope, {}).update(entries)
+            for (g, scope, key), alive in self._dirty.items():
+                if g == gid and not alive:
+                    scopes.get(scope, {}).pop(key, None)
+            self._data[gid] = scopes
+            self._loaded.add(gid)
+            return scopes
+
+    @staticmethod
+    def _alive(entry: tuple | None) -> bool:
+        return entry is not None and (entry[1] is None or entry[1] > _now())
+
+    async def get(self, guild_id: int, scope: str, key: str, default=None):
+        entry = (await self._guild(guild_id)).get(str(scope), {}).get(str(key))
+        return entry[0] if self._alive(entry) else default
+
+    async def get_int(self, guild_id: int, scope: str, key: str, default: int = 0) -> int:
+        value = await self.get(guild_id, scope, key, None)
+        try:
+            return int(value) if value is not None else default
+        except Exception:
+            return default
+
+    async def items(self, guild_id: int, scope: str, legacy: dict | None = None, ttl_seconds: float | None = None) -> dict:
+        # legacy: Altbestand aus den Guild-Overrides, wird beim ersten Zugriff übernommen.
+        scopes = await self._guild(guild_id)
+        if not scopes.get(str(scope)) and isinstance(legacy, dict) and legacy:
+            for key, value in legacy.items():
+                self.set(guild_id, scope, key, value, ttl_seconds=ttl_seconds)
+        entries = scopes.get(str(scope), {})
+        return {k: e[0] for k, e in entries.items() if self._alive(e)}
+
+    def set(self, guild_id: int, scope: str, key: str, value, ttl_seconds: float | None = None, keep_ttl: bool = False):
+        gid, scope, key = int(guild_id), str(scope), str(key)
+        entries = self._data.setdefault(gid, {}).setdefault(scope, {})
+        old = entries.get(key)
+        if keep_ttl and old is not None:
+            expires = old[1]
+        else:
+            expires = _now() + int(ttl_seconds) if ttl_seconds else None
+        entries[key] = (value, expires)
+        self._dirty[(gid, scope, key)] = True
+        self._schedule_flush()
+
+    def delete(self, guild_id: int, scope: str, key: str):
+        gid, scope, key = int(guild_id), str(scope), str(key)
+        self._data.get(gid, {}).get(scope, {}).pop(key, None)
+        self._dirty[(gid, scope, key)] = False
+        self._schedule_flush()
+
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                self._flush_task = None
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_seconds)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            pass
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            dirty, self._dirty = self._dirty, {}
+            upserts, deletes = [], []
+            for (gid, scope, key), alive in dirty.items():
+                entry = self._data.get(gid, {}).get(scope, {}).get(key)
+                if alive and entry is not None:
+                    upserts.append((gid, scope, key, json.dumps(entry[0], ensure_ascii=False), entry[1]))
+                else:
+                    deletes.append((gid, scope, key))
+            if dirty:
+                try:
+                    await self.db.apply_runtime_state_batch(upserts, deletes)
+                except BaseException:
+                    for k, alive in dirty.items():
+                        self._dirty.setdefault(k, alive)
+                    raise
+                self.flushes += 1
+            if time.monotonic() - self._last_purge >= self.purge_seconds:
+                self._last_purge = time.monotonic()
+                await self.db.purge_runtime_state(_now())
+            return len(dirty)
+
+    async def close(self):
+        task = self._flush_task
+        self._flush_task = None
+        if task and not task.done():
+            task.cancel()
+        await self.flush()
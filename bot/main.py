@@ -53,17 +53,19 @@ async def main():
 
     token = _load_token(settings)
 
-    db_type = str(settings.get("database.type", "sqlite") or "sqlite").lower()
-    if db_type == "mysql":
-        mysql_cfg = settings.get("database.mysql", {}) or {}
-        db = Database(mysql=mysql_cfg)
+    db = Database.from_settings(settings)
+    if db._driver == "mysql":
         console.line("DB", "Treiber: MySQL", color="blue")
     else:
-        sqlite_path = str(settings.get("database.sqlite_path", "data/starry.db") or "data/starry.db")
-        db = Database(path=sqlite_path)
-        console.line("DB", f"Treiber: SQLite ({sqlite_path})", color="blue")
-    await db.init()
+        console.line("DB", f"Treiber: SQLite ({db.path}, {db.read_pool_size} Lese-Verbindungen)", color="blue")
+    if db._group_commit:
+        console.line("DB", "Group-Commit aktiv.", color="blue")
+    if db.metrics is not None:
+        console.line("DB", f"Query-Metriken aktiv (Slow-Log ab {db.metrics.slow_query_ms} ms).", color="blue")
+    applied = await db.init()
     console.line("DB", "Verbindung initialisiert.", color="green")
+    if applied:
+        console.line("DB", f"Schema-Migrationen angewendet: {', '.join(str(v) for v in applied)}", color="green")
     await settings.load_guild_overrides(db)
     console.line("BOOT", "Guild-Overrides geladen.", color="green")
 
@@ -144,6 +146,12 @@ async def main():
     except Exception:
         pass
 
+    try:
+        console.line("DB", "Ausstehende Schreibvorgänge werden committet …", color="yellow")
+        await db.flush()
+    except Exception as exc:
+        console.line("ERROR", f"DB-Flush fehlgeschlagen ({type(exc).__name__}): {exc}", color="red")
+
     try:
         console.line("DB", "Datenbankverbindung wird geschlossen …", color="yellow")
         await db.close()
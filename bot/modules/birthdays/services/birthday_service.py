@@ -1,6 +1,6 @@
 import calendar
 import json
-from datetime import datetime, timezone, date
+from datetime import datetime, timezone, date, time, timedelta
 from zoneinfo import ZoneInfo
 import discord
 from bot.modules.birthdays.formatting.birthday_embeds import build_birthday_announcement_view
@@ -190,6 +190,23 @@ class BirthdayService:
         except Exception:
             pass
 
+    def birthday_role_targets(self, member: discord.Member, year: int) -> dict[int, bool]:
+        # Gleiche Regeln wie ensure_birthday_achievement, nur ohne API-Calls.
+        gid = member.guild.id
+        age = datetime.now(self._tz(gid)).year - int(year)
+        targets: dict[int, bool] = {}
+        under_role_id = self.settings.get_guild_int(gid, "birthday.under_18_role_id")
+        adult_role_id = self.settings.get_guild_int(gid, "birthday.adult_role_id")
+        if under_role_id:
+            targets[under_role_id] = age < 18
+        if adult_role_id:
+            targets[adult_role_id] = age >= 18
+        for key in ("birthday.success_role_id", "birthday.role_id"):
+            role_id = self.settings.get_guild_int(gid, key)
+            if role_id:
+                targets[role_id] = True
+        return targets
+
     async def _apply_age_roles(self, member: discord.Member, year: int):
         now = datetime.now(self._tz(member.guild.id))
         age = now.year - int(year)
@@ -451,7 +468,19 @@ class BirthdayService:
             pass
         return True
 
-    async def tick_midnight(self):
+    def next_midnight_ts(self) -> float | None:
+        # Frühester lokaler Tageswechsel über alle aktiven Gilden (Zeitzonen pro Gilde).
+        next_ts = None
+        for guild in list(self.bot.guilds):
+            if not self.settings.get_guild_bool(guild.id, "birthday.enabled", True):
+                continue
+            tz = self._tz(guild.id)
+            tomorrow = datetime.now(tz).date() + timedelta(days=1)
+            ts = datetime.combine(tomorrow, time(0, 0), tzinfo=tz).timestamp()
+            next_ts = ts if next_ts is None else min(next_ts, ts)
+        return next_ts
+
+    async def tick_midnight(self) -> float | None:
         rows = None
         try:
             rows = await self.db.list_birthdays_global_all()
@@ -461,6 +490,7 @@ class BirthdayService:
             if not self.settings.get_guild_bool(guild.id, "birthday.enabled", True):
                 continue
             await self.announce_today(guild, rows=rows)
+        return self.next_midnight_ts()
 
     async def auto_react(self, message: discord.Message):
         if not message.guild:
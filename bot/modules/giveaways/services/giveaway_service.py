@@ -158,6 +158,7 @@ class GiveawayService:
         except Exception:
             pass
         await self.db.set_giveaway_message(giveaway_id, msg.id)
+        await self.bot.scheduler.schedule("giveaway_end", giveaway_id, end_at.timestamp(), guild_id=guild.id)
         return giveaway_id
 
     async def build_confirm_embed(self, guild: discord.Guild, data: dict, conditions: dict):
@@ -223,19 +224,25 @@ class GiveawayService:
         for guild in list(self.bot.guilds):
             if not self.settings.get_guild_bool(guild.id, "giveaway.enabled", True):
                 continue
-            rows = await self.db.list_open_giveaways(guild.id)
+            rows = await self.db.list_due_giveaways(guild.id, now.isoformat())
             for row in rows:
-                giveaway_id, channel_id, message_id, end_at = row
-                try:
-                    end_dt = datetime.fromisoformat(str(end_at))
-                except Exception:
-                    continue
-                if end_dt > now:
-                    continue
+                giveaway_id, channel_id, message_id, _ = row
                 await self._finish_giveaway(guild, int(giveaway_id), int(channel_id), int(message_id or 0))
 
+    async def finish_due(self, job):
+        row = await self.db.get_giveaway(int(job.ref))
+        if not row or str(row[11]) != "open":
+            return
+        guild = self.bot.get_guild(int(row[1]))
+        # Deaktiviert oder Gilde nicht im Cache: bleibt offen, der stündliche tick() holt es nach.
+        if not guild or not self.settings.get_guild_bool(guild.id, "giveaway.enabled", True):
+            return
+        await self._finish_giveaway(guild, int(row[0]), int(row[2]), int(row[3] or 0))
+
     async def _finish_giveaway(self, guild: discord.Guild, giveaway_id: int, channel_id: int, message_id: int):
-        await self.db.close_giveaway(giveaway_id)
+        # Job und stündlicher tick() können gleichzeitig laufen: nur wer schließt, zieht.
+        if not await self.db.close_giveaway(giveaway_id):
+            return
         entries = await self.db.list_giveaway_entries(giveaway_id)
         row = await self.db.get_giveaway(giveaway_id)
         if not row:
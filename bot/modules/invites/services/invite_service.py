@@ -16,6 +16,11 @@ class InviteService:
     def _enabled(self, guild_id: int) -> bool:
         return bool(self.settings.get_guild_bool(guild_id, "invites.enabled", True))
 
+    async def _refresh_inviter_stats(self, guild_id: int, user_id: int):
+        stats_service = getattr(self.bot, "user_stats_service", None)
+        if stats_service:
+            await stats_service.refresh_member_stats(guild_id, user_id)
+
     def _log_channel_id(self, guild_id: int) -> int:
         return int(self.settings.get_guild_int(guild_id, "invites.log_channel_id", 0))
 
@@ -178,6 +183,7 @@ class InviteService:
         if used_code and inviter_id:
             try:
                 await self.db.increment_invite(guild.id, inviter_id)
+                await self._refresh_inviter_stats(guild.id, inviter_id)
             except Exception:
                 pass
             try:
@@ -215,5 +221,6 @@ class InviteService:
         if inviter_id:
             try:
                 await self.db.increment_invite_left(member.guild.id, inviter_id)
+                await self._refresh_inviter_stats(member.guild.id, inviter_id)
             except Exception:
                 pass
@@ -33,19 +33,24 @@ class NewsService:
     def _youtube_stats_enabled(self, guild_id: int) -> bool:
         return self.settings.get_guild_bool(guild_id, "news.youtube_stats_enabled", False)
 
-    async def tick(self):
+    async def tick(self) -> float | None:
+        # Gibt den nächsten fälligen Zeitpunkt (Epoch) über alle Gilden zurück.
         now = datetime.now(timezone.utc)
         due = []
+        next_ts = None
         for guild in list(self.bot.guilds):
             if not self.settings.get_guild_bool(guild.id, "news.enabled", True):
                 continue
-            interval = self._interval_minutes(guild)
+            interval = max(60.0, self._interval_minutes(guild) * 60)
             last_check = self._last_check.get(guild.id)
-            if last_check and (now - last_check).total_seconds() < interval * 60:
-                continue
-            due.append(guild)
+            if last_check and (now - last_check).total_seconds() < interval:
+                guild_next = last_check.timestamp() + interval
+            else:
+                due.append(guild)
+                guild_next = now.timestamp() + interval
+            next_ts = guild_next if next_ts is None else min(next_ts, guild_next)
         if not due:
-            return
+            return next_ts
 
         for guild in due:
             try:
@@ -57,6 +62,7 @@ class NewsService:
                 await self._maybe_update_youtube_stats(guild)
             except Exception:
                 pass
+        return next_ts
 
     async def send_latest_news(self, guild: discord.Guild, force: bool = True) -> tuple[bool, str | None]:
         items = await self._fetch_latest_items(guild)
@@ -110,7 +116,7 @@ class NewsService:
         if channel is None:
             return False, "News-Channel ist nicht konfiguriert."
 
-        last_map = self.settings.get_guild(guild.id, "news.last_posted_ids", {}) or {}
+        last_map = await self._adopt_legacy(guild.id, "news.last_posted", "news.last_posted_ids")
         last_id = str(last_map.get(source_key, "") or "")
         if not force and last_id and last_id == item.id:
             return False, None
@@ -120,16 +126,11 @@ class NewsService:
         msg = await channel.send(view=view)
 
         try:
-            last_map[str(source_key)] = item.id
-            await self.settings.set_guild_override(self.db, guild.id, "news.last_posted_ids", last_map)
-            await self.settings.set_guild_override(self.db, guild.id, "news.last_posted_id", item.id)
+            state = self.bot.state_store
+            state.set(guild.id, "news.last_posted", str(source_key), item.id)
+            state.set(guild.id, "news", "last_posted_id", item.id)
             if item.published_at:
-                await self.settings.set_guild_override(
-                    self.db,
-                    guild.id,
-                    "news.last_posted_at",
-                    item.published_at.isoformat(),
-                )
+                state.set(guild.id, "news", "last_posted_at", item.published_at.isoformat())
             if item.video_id:
                 await self._store_youtube_alert(guild, item, channel.id, msg.id)
         except Exception:
@@ -540,13 +541,35 @@ class NewsService:
             "subscribers": subs,
         }
 
+    def _youtube_alert_ttl(self, guild_id: int) -> float:
+        days = float(self.settings.get_guild(guild_id, "news.youtube_alerts_ttl_days", 30) or 0)
+        return days * 86400 if days > 0 else 0
+
+    async def _youtube_alerts(self, guild_id: int) -> dict:
+        return await self._adopt_legacy(
+            guild_id, "news.youtube_alerts", "news.youtube_alerts",
+            ttl_seconds=self._youtube_alert_ttl(guild_id),
+        )
+
+    async def _adopt_legacy(self, guild_id: int, scope: str, path: str, ttl_seconds: float | None = None) -> dict:
+        # Altbestand aus den Guild-Overrides in den StateStore übernehmen und danach aus der
+        # Config löschen, sonst wird er bei jedem Speichern mitgeschrieben und überall geladen.
+        legacy = self.settings.get_guild(guild_id, path, None)
+        items = await self.bot.state_store.items(guild_id, scope, legacy=legacy, ttl_seconds=ttl_seconds)
+        if legacy:
+            try:
+                await self.bot.state_store.flush()
+                await self.settings.remove_guild_override(self.db, guild_id, path)
+            except Exception:
+                pass
+        return items
+
     async def _store_youtube_alert(self, guild: discord.Guild, item: NewsItem, channel_id: int, message_id: int):
-        alerts = self.settings.get_guild(guild.id, "news.youtube_alerts", {}) or {}
         if not item.video_id:
             return
         stats = item.stats or {}
         channel = item.channel or {}
-        alerts[str(item.video_id)] = {
+        payload = {
             "video_id": str(item.video_id),
             "message_id": int(message_id),
             "channel_id": int(channel_id),
@@ -563,7 +586,13 @@ class NewsService:
             "channel_subscribers": channel.get("subscribers"),
             "last_stats_at": None,
         }
-        await self.settings.set_guild_override(self.db, guild.id, "news.youtube_alerts", alerts)
+        self.bot.state_store.set(
+            guild.id,
+            "news.youtube_alerts",
+            str(item.video_id),
+            payload,
+            ttl_seconds=self._youtube_alert_ttl(guild.id),
+        )
 
     async def _maybe_update_youtube_stats(self, guild: discord.Guild):
         if not self._youtube_stats_enabled(guild.id):
@@ -578,10 +607,9 @@ class NewsService:
             return
         self._last_stats_check[guild.id] = now
 
-        alerts = self.settings.get_guild(guild.id, "news.youtube_alerts", {}) or {}
-        if not isinstance(alerts, dict) or not alerts:
+        alerts = await self._youtube_alerts(guild.id)
+        if not alerts:
             return
-        updated = False
         for video_id, payload in list(alerts.items()):
             if not isinstance(payload, dict):
                 continue
@@ -605,7 +633,7 @@ class NewsService:
                     payload["channel_avatar"] = channel.get("avatar_url")
                     payload["channel_subscribers"] = channel.get("subscribers")
             payload["last_stats_at"] = now.isoformat()
-            alerts[str(video_id)] = payload
+            self.bot.state_store.set(guild.id, "news.youtube_alerts", str(video_id), payload, keep_ttl=True)
 
             channel = guild.get_channel(chan_id)
             if channel is None:
@@ -644,12 +672,6 @@ class NewsService:
             view = build_news_view(self.settings, guild, item, ping_text=ping_text)
             try:
                 await msg.edit(view=view)
-                updated = True
-            except Exception:
-                pass
-        if updated:
-            try:
-                await self.settings.set_guild_override(self.db, guild.id, "news.youtube_alerts", alerts)
             except Exception:
                 pass
 
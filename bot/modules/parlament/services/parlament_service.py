@@ -189,7 +189,9 @@ class ParliamentService:
             updated_at=datetime.now(timezone.utc),
         )
 
-        message_id = self._gi(guild.id, "parlament.panel_message_id", 0)
+        message_id = await self.bot.state_store.get_int(guild.id, "parlament", "panel_message_id", 0)
+        if not message_id:
+            message_id = self._gi(guild.id, "parlament.panel_message_id", 0)
         msg = None
         if message_id:
             try:
@@ -205,7 +207,7 @@ class ParliamentService:
 
         try:
             msg = await channel.send(view=view)
-            await self.settings.set_guild_override(self.db, guild.id, "parlament.panel_message_id", int(msg.id))
+            self.bot.state_store.set(guild.id, "parlament", "panel_message_id", int(msg.id))
         except Exception:
             pass
 
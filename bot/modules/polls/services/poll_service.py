@@ -111,6 +111,10 @@ class PollService:
         view = await self.build_poll_view(guild, poll_id, option_data)
         msg = await channel.send(view=view)
         await self.db.set_poll_message(poll_id, msg.id)
+        if end_at:
+            await self.bot.scheduler.schedule(
+                "poll_end", poll_id, datetime.fromisoformat(end_at).timestamp(), guild_id=guild.id
+            )
         return poll_id
 
     async def build_poll_embed(self, guild: discord.Guild | None, poll_id: int):
@@ -215,22 +219,12 @@ class PollService:
 
     async def tick(self):
         now = datetime.now(timezone.utc)
-        rows = await self.db.list_open_polls()
+        rows = await self.db.list_due_polls(now.isoformat())
         for row in rows:
             try:
-                poll_id, guild_id, channel_id, message_id, _, end_at = row
-            except Exception:
-                continue
-            if not end_at:
-                continue
-            try:
-                end_dt = datetime.fromisoformat(str(end_at))
+                poll_id, guild_id, channel_id, message_id, _, _ = row
             except Exception:
                 continue
-            if end_dt.tzinfo is None:
-                end_dt = end_dt.replace(tzinfo=timezone.utc)
-            if end_dt > now:
-                continue
             guild = self.bot.get_guild(int(guild_id))
             if not guild:
                 try:
@@ -241,6 +235,15 @@ class PollService:
                 continue
             await self._finish_poll(guild, int(poll_id), int(channel_id), int(message_id or 0), reason="auto")
 
+    async def finish_due(self, job):
+        row = await self.db.get_poll(int(job.ref))
+        if not row or str(row[9]) != "open":
+            return
+        guild = self.bot.get_guild(int(row[1]))
+        if guild and not self.settings.get_guild_bool(guild.id, "poll.enabled", True):
+            return
+        await self._finish_poll(guild, int(row[0]), int(row[2]), int(row[3] or 0), reason="auto")
+
     async def close_poll(self, guild: discord.Guild, poll_id: int):
         row = await self.db.get_poll(poll_id)
         if not row:
@@ -250,6 +253,8 @@ class PollService:
         if str(row[9]) != "open":
             return False, "poll_already_closed"
         await self._finish_poll(guild, int(row[0]), int(row[2]), int(row[3] or 0), reason="manual")
+        if row[7]:
+            await self.bot.scheduler.cancel("poll_end", int(row[0]))
         return True, None
 
     async def _finish_poll(
@@ -260,7 +265,9 @@ class PollService:
         message_id: int,
         reason: str = "auto",
     ):
-        await self.db.close_poll(poll_id)
+        # Job, stündlicher tick() und manuelles Schließen: nur wer schließt, wertet aus.
+        if not await self.db.close_poll(poll_id):
+            return
         row = await self.db.get_poll(poll_id)
         if not row:
             return
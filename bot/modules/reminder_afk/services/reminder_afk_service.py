@@ -160,6 +160,8 @@ class ReminderAfkService:
                 return False, "Zeitformat ungültig. Beispiele: `10m`, `2h`, `1d12h`, `45s`.", None
             until_at = (datetime.now(timezone.utc) + timedelta(seconds=int(sec))).isoformat()
         await self.db.set_afk_status(member.guild.id, member.id, text, until_at=until_at)
+        if until_at:
+            await self._schedule_afk_expiry(member.guild.id, member.id, until_at)
         await self.db.clear_afk_mention_events(member.guild.id, member.id)
         self._afk_set_grace_cache[(int(member.guild.id), int(member.id))] = datetime.now(timezone.utc).timestamp()
         nick_ok, nick_reason = await self._apply_afk_nick_prefix(member)
@@ -228,6 +230,7 @@ class ReminderAfkService:
         seconds = self._afk_extend_default_seconds(member.guild.id)
         new_until = (base + timedelta(seconds=seconds)).isoformat()
         await self.db.update_afk_until(member.guild.id, member.id, new_until)
+        await self._schedule_afk_expiry(member.guild.id, member.id, new_until)
         try:
             dt_new = datetime.fromisoformat(new_until)
             return True, f"AFK verlängert bis {format_dt(dt_new, style='R')}."
@@ -303,6 +306,7 @@ class ReminderAfkService:
         remind_at = (datetime.now(timezone.utc) + timedelta(seconds=int(seconds))).isoformat()
         rid = await self.db.create_reminder(guild.id, user.id, int(channel_id), msg[:800], remind_at)
         dt = datetime.fromisoformat(remind_at)
+        await self.bot.scheduler.schedule("reminder", rid, dt.timestamp(), guild_id=guild.id)
         return True, f"Reminder erstellt: `#{rid}` • {format_dt(dt, style='R')} ({format_dt(dt, style='f')})"
 
     async def list_reminders(self, guild_id: int, user_id: int) -> list[str]:
@@ -324,26 +328,50 @@ class ReminderAfkService:
         ok = await self.db.delete_active_reminder(guild_id, user_id, reminder_id)
         if not ok:
             return False, "Reminder nicht gefunden oder schon erledigt."
+        await self.bot.scheduler.cancel("reminder", int(reminder_id))
         return True, f"Reminder `#{int(reminder_id)}` gelöscht."
 
+    async def _schedule_afk_expiry(self, guild_id: int, user_id: int, until_at: str):
+        try:
+            due = datetime.fromisoformat(str(until_at)).timestamp()
+        except Exception:
+            return
+        await self.bot.scheduler.schedule("afk_expiry", f"{int(guild_id)}:{int(user_id)}", due, guild_id=guild_id)
+
+    async def _expire_afk(self, gid: int, uid: int):
+        await self.db.clear_afk_status(gid, uid)
+        guild = self.bot.get_guild(gid)
+        if guild is not None:
+            member = guild.get_member(uid)
+            if member is None:
+                try:
+                    member = await guild.fetch_member(uid)
+                except Exception:
+                    member = None
+            if member is not None:
+                await self._remove_afk_nick_prefix(member)
+        # Events behalten wir, damit bei nächster Nachricht eine echte Summary kommen kann.
+
     async def _tick_expired_afk(self):
         now_iso = datetime.now(timezone.utc).isoformat()
         rows = await self.db.list_expired_afk_status(now_iso, limit=50)
         for row in rows:
-            gid = int(row[0])
-            uid = int(row[1])
-            await self.db.clear_afk_status(gid, uid)
-            guild = self.bot.get_guild(gid)
-            if guild is not None:
-                member = guild.get_member(uid)
-                if member is None:
-                    try:
-                        member = await guild.fetch_member(uid)
-                    except Exception:
-                        member = None
-                if member is not None:
-                    await self._remove_afk_nick_prefix(member)
-            # Events behalten wir, damit bei nächster Nachricht eine echte Summary kommen kann.
+            await self._expire_afk(int(row[0]), int(row[1]))
+
+    async def expire_afk_due(self, job):
+        gid, uid = (int(x) for x in str(job.ref).split(":", 1))
+        row = await self.db.get_afk_status(gid, uid)
+        # Inzwischen beendet, ohne Ende neu gesetzt oder verlängert: nichts zu tun bzw. neu eingeplant.
+        if not row or not row[4]:
+            return
+        try:
+            until = datetime.fromisoformat(str(row[4]))
+        except Exception:
+            return
+        if until > datetime.now(timezone.utc):
+            await self._schedule_afk_expiry(gid, uid, str(row[4]))
+            return
+        await self._expire_afk(gid, uid)
 
     async def tick(self):
         await self._tick_expired_afk()
@@ -351,43 +379,52 @@ class ReminderAfkService:
         now = datetime.now(timezone.utc).isoformat()
         rows = await self.db.list_due_reminders(now, limit=50)
         for r in rows:
-            rid = int(r[0])
-            guild_id = int(r[1])
-            user_id = int(r[2])
-            channel_id = int(r[3])
-            msg = str(r[4])
-            guild = self.bot.get_guild(guild_id)
-            if guild is None:
-                await self.db.mark_reminder_delivered(rid)
-                continue
-            member = guild.get_member(user_id)
-            if member is None:
-                try:
-                    member = await guild.fetch_member(user_id)
-                except Exception:
-                    member = None
-            delivered = False
-            if member is not None:
-                try:
-                    await member.send(f"⏰ **Reminder**\n{msg}")
-                    delivered = True
-                except Exception:
-                    delivered = False
+            await self._deliver_reminder(r)
 
-            channel = guild.get_channel(channel_id)
-            if channel is None:
-                try:
-                    channel = await guild.fetch_channel(channel_id)
-                except Exception:
-                    channel = None
-            if isinstance(channel, discord.abc.Messageable):
-                try:
-                    await channel.send(f"⏰ {f'<@{user_id}>' if not delivered else ''} **Reminder:** {msg}")
-                    delivered = True
-                except Exception:
-                    pass
+    async def deliver_due(self, job):
+        row = await self.db.get_reminder(int(job.ref))
+        if not row or row[7]:
+            return
+        await self._deliver_reminder(row)
+
+    async def _deliver_reminder(self, r):
+        rid = int(r[0])
+        guild_id = int(r[1])
+        user_id = int(r[2])
+        channel_id = int(r[3])
+        msg = str(r[4])
+        # Vor dem Senden beanspruchen, sonst schicken Job und tick() denselben Reminder doppelt.
+        if not await self.db.mark_reminder_delivered(rid):
+            return
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        member = guild.get_member(user_id)
+        if member is None:
+            try:
+                member = await guild.fetch_member(user_id)
+            except Exception:
+                member = None
+        delivered = False
+        if member is not None:
+            try:
+                await member.send(f"⏰ **Reminder**\n{msg}")
+                delivered = True
+            except Exception:
+                delivered = False
 
-            await self.db.mark_reminder_delivered(rid)
+        channel = guild.get_channel(channel_id)
+        if channel is None:
+            try:
+                channel = await guild.fetch_channel(channel_id)
+            except Exception:
+                channel = None
+        if isinstance(channel, discord.abc.Messageable):
+            try:
+                await channel.send(f"⏰ {f'<@{user_id}>' if not delivered else ''} **Reminder:** {msg}")
+                delivered = True
+            except Exception:
+                pass
 
     async def handle_message_for_afk(self, message: discord.Message):
         if not message.guild or not isinstance(message.author, discord.Member):
@@ -0,0 +1 @@
+from .services.retention_service import RetentionService
@@ -0,0 +1,101 @@
+import time
+import asyncio
+import discord
+
+from bot.core.db import RETENTION_TARGETS
+from bot.utils.console import console
+
+
+class RetentionService:
+    def __init__(self, bot: discord.Client, settings, db, logger):
+        self.bot = bot
+        self.settings = settings
+        self.db = db
+        self.logger = logger
+        self._lock = asyncio.Lock()
+        self._last_compact = 0.0
+        self.last_report: dict = {}
+
+    def enabled(self) -> bool:
+        return self.settings.get_bool("retention.enabled", False)
+
+    def _policy(self, table: str, guild_id: int | None = None) -> dict:
+        base = f"retention.tables.{table}"
+        raw = self.settings.get_guild(guild_id, base, None) if guild_id else self.settings.get(base, None)
+        if not isinstance(raw, dict):
+            return {}
+        out = {}
+        for key in ("max_age_days", "max_rows", "keep_latest"):
+            value = raw.get(key)
+            if value is None or value == "":
+                continue
+            try:
+                out[key] = max(0, float(value)) if key == "max_age_days" else max(0, int(value))
+            except Exception:
+                continue
+        return out
+
+    async def _prune(self, table: str, policy: dict, guild_id: int | None, batch_size: int) -> int:
+        if not policy:
+            return 0
+        max_age = policy.get("max_age_days")
+        return await self.db.prune_table(
+            table,
+            max_age_seconds=int(max_age * 86400) if max_age is not None else None,
+            max_rows=policy.get("max_rows") if guild_id is None else None,
+            keep_latest=policy.get("keep_latest"),
+            guild_id=guild_id,
+            batch_size=batch_size,
+        )
+
+    async def run(self, compact: bool | None = None) -> dict:
+        async with self._lock:
+            started = time.perf_counter()
+            batch_size = max(1, self.settings.get_int("retention.batch_size", 500))
+            before = await self.db.storage_stats()
+            deleted = {}
+            for table, target in RETENTION_TARGETS.items():
+                count = 0
+                if target["guild"]:
+                    for guild_id in await self.db.list_retention_guilds(table):
+                        count += await self._prune(table, self._policy(table, guild_id), guild_id, batch_size)
+                        await asyncio.sleep(0)
+                    global_policy = self._policy(table)
+                    if global_policy.get("max_rows") is not None:
+                        count += await self._prune(table, {"max_rows": global_policy["max_rows"]}, None, batch_size)
+                else:
+                    count += await self._prune(table, self._policy(table), None, batch_size)
+                if count:
+                    deleted[table] = count
+
+            if compact is None:
+                interval = float(self.settings.get("retention.compact_interval_hours", 24) or 24) * 3600
+                compact = time.time() - self._last_compact >= interval
+            if compact:
+                await self.db.compact(list(RETENTION_TARGETS.keys()))
+                self._last_compact = time.time()
+
+            after = await self.db.storage_stats()
+            report = {
+                "deleted": deleted,
+                "deleted_total": sum(deleted.values()),
+                "compacted": bool(compact),
+                "bytes_before": before.get("bytes", 0),
+                "bytes_after": after.get("bytes", 0),
+                "reclaimed_bytes": max(0, before.get("bytes", 0) - after.get("bytes", 0)),
+                "free_bytes": after.get("free_bytes", 0),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+            self.last_report = report
+            if report["deleted_total"] or report["reclaimed_bytes"]:
+                console.line(
+                    "DB",
+                    f"Retention: {report['deleted_total']} Zeilen gelöscht, "
+                    f"{report['reclaimed_bytes'] // 1024} KiB freigegeben.",
+                    color="blue",
+                )
+                try:
+                    await self.logger.emit_system("retention_run", report)
+                except Exception:
+                    pass
+            return report
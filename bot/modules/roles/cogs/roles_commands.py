@@ -77,25 +77,45 @@ class RolesCommands(commands.Cog):
             await interaction.followup.send(f"Rollen-Sync fehlgeschlagen: `{type(e).__name__}`", ephemeral=True)
 
     @roles.command(name="rescan", description="🧭 𑁉 Erfolge & Rollen neu prüfen")
-    async def rescan(self, interaction: discord.Interaction):
+    @app_commands.describe(fortsetzen="Abgebrochenen Rescan fortsetzen statt von vorn zu beginnen")
+    async def rescan(self, interaction: discord.Interaction, fortsetzen: bool = False):
         if not interaction.guild or not isinstance(interaction.user, discord.Member):
             return await interaction.response.send_message("Nur im Server nutzbar.", ephemeral=True)
         if not is_staff(self.bot.settings, interaction.user):
             return await interaction.response.send_message("Keine Berechtigung.", ephemeral=True)
         await interaction.response.send_message("Rescan läuft… (kann etwas dauern)", ephemeral=True)
+
+        phases = {"prefetch": "Daten werden geladen", "roles": "Rollen werden angepasst", "done": "Fertig"}
+
+        async def progress(phase: str, done: int, total: int, result: dict):
+            await interaction.edit_original_response(
+                content=(
+                    f"Rescan: {phases.get(phase, phase)} … **{done}/{total}**"
+                    f"{' (fortgesetzt)' if result.get('resumed') else ''}"
+                )
+            )
+
         try:
             if not getattr(self.bot, "user_stats_service", None):
                 return await interaction.followup.send("User-Stats-Service fehlt.", ephemeral=True)
             result = await self.bot.user_stats_service.rescan_guild(
                 interaction.guild,
                 birthday_service=getattr(self.bot, "birthday_service", None),
+                progress=progress,
+                resume=fortsetzen,
             )
             await interaction.followup.send(
                 f"Rescan fertig. Users: **{result['scanned']}** | "
                 f"Erfolge neu: **{result['achievements_new']}** | "
-                f"Birthday neu: **{result['birthday_new']}**",
+                f"Birthday neu: **{result['birthday_new']}** | "
+                f"Rollen-Updates: **{result.get('role_updates', 0)}** | "
+                f"Fehlgeschlagen: **{result.get('failed', 0)}**",
                 ephemeral=True,
             )
+        except RuntimeError as e:
+            if str(e) == "rescan_already_running":
+                return await interaction.followup.send("Für diesen Server läuft bereits ein Rescan.", ephemeral=True)
+            await interaction.followup.send(f"Rescan fehlgeschlagen: `{type(e).__name__}`", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"Rescan fehlgeschlagen: `{type(e).__name__}`", ephemeral=True)
 
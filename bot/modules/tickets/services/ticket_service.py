@@ -264,6 +264,28 @@ def _normalize_open_ticket_row(row):
     return None
 
 
+def _normalize_active_ticket_row(row):
+    # Spalten wie Database.list_active_tickets / list_idle_tickets
+    return {
+        "ticket_id": int(row[0]),
+        "guild_id": int(row[1]),
+        "user_id": int(row[2]) if row[2] is not None else 0,
+        "thread_id": int(row[3]),
+        "status": str(row[4]),
+        "claimed_by": int(row[5]) if row[5] is not None else None,
+        "category_key": str(row[6]) if row[6] is not None else None,
+        "created_at": row[7],
+        "last_activity_at": row[8],
+        "last_user_message_at": row[9],
+        "last_staff_message_at": row[10],
+        "first_staff_reply_at": row[11],
+        "sla_breached_at": row[12],
+        "priority": row[13],
+        "status_label": row[14],
+        "escalated_level": row[15],
+    }
+
+
 async def _resolve_user_id_from_thread(thread: discord.Thread, summary_message_id: int | None):
     if summary_message_id:
         try:
@@ -453,12 +475,14 @@ class TicketService:
         except Exception as e:
             return False, f"{type(e).__name__}: {e}"
 
-    async def _touch_ticket(self, ticket_id: int):
+    async def _touch_ticket(self, ticket_id: int, guild_id: int | None = None):
         try:
             now_iso = datetime.now(timezone.utc).isoformat()
             await self.db.set_last_activity(int(ticket_id), now_iso)
         except Exception:
             pass
+        if guild_id:
+            self._wake_automation(int(guild_id))
 
     async def _resolve_ticket_context(self, interaction: discord.Interaction, allow_closed: bool = False):
         if not interaction.guild or not isinstance(interaction.user, discord.Member):
@@ -685,6 +709,7 @@ class TicketService:
                     await self.db.set_last_user_message(int(existing["ticket_id"]), now_iso)
                 except Exception:
                     pass
+                self._wake_automation(guild.id)
                 try:
                     await message.author.send(
                         view=build_dm_message_appended_embed(self.settings, guild, int(existing["ticket_id"]))
@@ -792,6 +817,7 @@ class TicketService:
             category_key=category_key,
         )
         await self.db.add_ticket_participant(int(ticket_id), int(user.id), added_by=None)
+        self._wake_automation(guild.id)
 
         view.ticket_id = int(ticket_id)
         try:
@@ -910,6 +936,7 @@ class TicketService:
             await self.db.set_last_staff_message(int(t["ticket_id"]), now_iso)
         except Exception:
             pass
+        self._wake_automation(t["guild_id"])
 
         await self.logger.emit(
             self.bot,
@@ -957,7 +984,7 @@ class TicketService:
 
         if claimed_by and int(claimed_by) == interaction.user.id:
             await self.db.set_claim(ticket_id, None)
-            await self._touch_ticket(int(ticket_id))
+            await self._touch_ticket(int(ticket_id), t["guild_id"])
 
             try:
                 view = build_thread_status_embed(
@@ -985,7 +1012,7 @@ class TicketService:
             return
 
         await self.db.set_claim(ticket_id, interaction.user.id)
-        await self._touch_ticket(int(ticket_id))
+        await self._touch_ticket(int(ticket_id), t["guild_id"])
 
         try:
             arrow2 = em(self.settings, "arrow2", interaction.guild) or "➜"
@@ -1048,7 +1075,7 @@ class TicketService:
         except Exception:
             pass
 
-        await self._touch_ticket(int(t["ticket_id"]))
+        await self._touch_ticket(int(t["ticket_id"]), t["guild_id"])
 
         await _ephemeral(interaction, "Notiz gespeichert.")
         await self.logger.emit(self.bot, "ticket_note", {"ticket_id": int(t["ticket_id"]), "staff_id": interaction.user.id})
@@ -1108,7 +1135,7 @@ class TicketService:
         except Exception:
             pass
 
-        await self._touch_ticket(int(t["ticket_id"]))
+        await self._touch_ticket(int(t["ticket_id"]), t["guild_id"])
 
         await _ephemeral(interaction, f"{user.mention} hinzugefügt.")
         await self.logger.emit(
@@ -1125,7 +1152,7 @@ class TicketService:
             return False, "ticket_closed"
 
         await self.db.add_ticket_participant(int(t["ticket_id"]), int(user.id), added_by=int(actor.id))
-        await self._touch_ticket(int(t["ticket_id"]))
+        await self._touch_ticket(int(t["ticket_id"]), t["guild_id"])
 
         try:
             await thread.add_user(user)
@@ -1172,12 +1199,12 @@ class TicketService:
 
         if claimed:
             await self.db.set_claim(ticket_id, actor.id)
-            await self._touch_ticket(int(ticket_id))
+            await self._touch_ticket(int(ticket_id), t["guild_id"])
             title = "✅ Ticket übernommen"
             body = f"Hey! Ich bin {actor.mention} und werde dir heute helfen."
         else:
             await self.db.set_claim(ticket_id, None)
-            await self._touch_ticket(int(ticket_id))
+            await self._touch_ticket(int(ticket_id), t["guild_id"])
             title = "🔓 Ticket freigegeben"
             body = f"{actor.mention} kümmert sich nicht mehr um dieses Ticket."
 
@@ -1500,7 +1527,7 @@ class TicketService:
             return await _ephemeral(interaction, "Ticket ist bereits offen.")
 
         await self.db.reopen_ticket(int(t["ticket_id"]))
-        await self._touch_ticket(int(t["ticket_id"]))
+        await self._touch_ticket(int(t["ticket_id"]), t["guild_id"])
 
         try:
             await thread.edit(archived=False, locked=False)
@@ -1559,7 +1586,7 @@ class TicketService:
             return await _ephemeral(interaction, "Bitte einen Status angeben.")
 
         await self.db.set_status_label(int(t["ticket_id"]), label)
-        await self._touch_ticket(int(t["ticket_id"]))
+        await self._touch_ticket(int(t["ticket_id"]), t["guild_id"])
 
         try:
             view = build_thread_status_embed(
@@ -1612,7 +1639,7 @@ class TicketService:
             return await _ephemeral(interaction, "Priority muss zwischen 1 und 4 liegen.")
 
         await self.db.set_priority(int(t["ticket_id"]), priority)
-        await self._touch_ticket(int(t["ticket_id"]))
+        await self._touch_ticket(int(t["ticket_id"]), t["guild_id"])
 
         label = self._priority_label(priority)
         try:
@@ -1666,7 +1693,7 @@ class TicketService:
             return await _ephemeral(interaction, "Eskalation-Level muss zwischen 1 und 5 liegen.")
 
         await self.db.set_escalation(int(t["ticket_id"]), level, int(interaction.user.id))
-        await self._touch_ticket(int(t["ticket_id"]))
+        await self._touch_ticket(int(t["ticket_id"]), t["guild_id"])
 
         note = _truncate((reason or "").strip(), 500) if reason else ""
         body = f"Eskalations-Level: **{level}**"
@@ -1757,7 +1784,7 @@ class TicketService:
             pass
 
         await self.db.set_category_key(int(t["ticket_id"]), category_key)
-        await self._touch_ticket(int(t["ticket_id"]))
+        await self._touch_ticket(int(t["ticket_id"]), t["guild_id"])
 
         try:
             view = build_thread_status_embed(
@@ -2020,123 +2047,148 @@ body {{ font-family: "gg sans","Noto Sans","Helvetica Neue",Arial,sans-serif; ba
         except Exception as e:
             return False, f"{type(e).__name__}: {e}", None
 
-    async def run_automation(self):
+    def _wake_automation(self, guild_id: int):
+        # Frist eines Tickets hat sich geändert (neu, wieder geöffnet, Aktivität, Claim/Status):
+        # die Automation muss spätestens zur frühestmöglichen Frist wieder laufen. wake() zieht
+        # nur vor, ein späterer Termin ändert am geplanten Lauf nichts.
+        windows = [
+            float(self._g(guild_id, "ticket.sla_first_response_minutes", 0) or 0) * 60,
+            float(self._g(guild_id, "ticket.auto_close_hours", 0) or 0) * 3600,
+        ]
+        windows = [w for w in windows if w > 0]
+        if windows:
+            self.bot.scheduler.wake("ticket_automation", at=datetime.now(timezone.utc).timestamp() + min(windows))
+
+    async def run_automation(self) -> float | None:
+        # Gibt die nächste SLA- bzw. Auto-Close-Frist (Epoch) zurück, None = keine offen.
+        # Geladen werden nur Kandidaten: Auto-Close per Bereichsscan auf last_activity_ts,
+        # SLA aus den Tickets ohne erste Team-Antwort.
         await self.bot.wait_until_ready()
         now = datetime.now(timezone.utc)
-        rows = await self.db.list_active_tickets(limit=500)
-        for row in rows:
-            t = {
-                "ticket_id": int(row[0]),
-                "guild_id": int(row[1]),
-                "user_id": int(row[2]) if row[2] is not None else 0,
-                "thread_id": int(row[3]),
-                "status": str(row[4]),
-                "claimed_by": int(row[5]) if row[5] is not None else None,
-                "category_key": str(row[6]) if row[6] is not None else None,
-                "created_at": row[7],
-                "last_activity_at": row[8],
-                "last_user_message_at": row[9],
-                "last_staff_message_at": row[10],
-                "first_staff_reply_at": row[11],
-                "sla_breached_at": row[12],
-                "priority": row[13],
-                "status_label": row[14],
-                "escalated_level": row[15],
-            }
-            guild_id = int(t["guild_id"])
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                continue
-
+        now_ts = now.timestamp()
+        next_due = None
+        for guild in list(self.bot.guilds):
+            guild_id = int(guild.id)
             auto_close_hours = float(self._g(guild_id, "ticket.auto_close_hours", 0) or 0)
             sla_minutes = float(self._g(guild_id, "ticket.sla_first_response_minutes", 0) or 0)
+            # ticket_id -> [ticket, SLA fällig, Auto-Close fällig]
+            due: dict[int, list] = {}
+
+            if sla_minutes > 0:
+                for row in await self.db.list_tickets_awaiting_response(guild_id):
+                    t = _normalize_active_ticket_row(row)
+                    created_at = _parse_iso(t.get("created_at"))
+                    if not created_at:
+                        continue
+                    sla_due = created_at + timedelta(minutes=sla_minutes)
+                    if sla_due <= now:
+                        due[t["ticket_id"]] = [t, True, False]
+                    else:
+                        ts = sla_due.timestamp()
+                        next_due = ts if next_due is None else min(next_due, ts)
+
+            window = auto_close_hours * 3600
+            if window > 0:
+                for row in await self.db.list_idle_tickets(guild_id, int(now_ts - window)):
+                    t = _normalize_active_ticket_row(row)
+                    due.setdefault(t["ticket_id"], [t, False, False])[2] = True
+
+            for t, sla_hit, close_hit in due.values():
+                await self._automate_ticket(guild, t, now, sla_hit, close_hit)
+
+            if window > 0:
+                oldest = await self.db.oldest_ticket_activity_ts(guild_id)
+                if oldest is not None:
+                    # Noch fällige Tickets (über dem Limit oder Schließen fehlgeschlagen):
+                    # in einer Minute erneut, wie früher der Loop.
+                    ts = max(oldest + window, now_ts + 60)
+                    next_due = ts if next_due is None else min(next_due, ts)
+        return next_due
+
+    async def _automate_ticket(self, guild: discord.Guild, t: dict, now: datetime, sla_hit: bool, close_hit: bool):
+        # Thread erst holen, wenn wirklich etwas fällig ist.
+        thread = guild.get_thread(int(t["thread_id"]))
+        if not thread:
+            try:
+                fetched = await self.bot.fetch_channel(int(t["thread_id"]))
+                thread = fetched if isinstance(fetched, discord.Thread) else None
+            except Exception:
+                thread = None
 
-            thread = guild.get_thread(int(t["thread_id"]))
-            if not thread:
-                try:
-                    fetched = await self.bot.fetch_channel(int(t["thread_id"]))
-                    thread = fetched if isinstance(fetched, discord.Thread) else None
-                except Exception:
-                    thread = None
-
-            if sla_minutes > 0 and not t.get("first_staff_reply_at") and not t.get("sla_breached_at"):
-                created_at = _parse_iso(t.get("created_at"))
-                if created_at and now - created_at >= timedelta(minutes=sla_minutes):
-                    try:
-                        view = build_thread_status_embed(
-                            self.settings,
-                            guild,
-                            "⏱️ SLA überschritten",
-                            "Noch keine Antwort vom Team.",
-                            None,
-                        )
-                        if thread:
-                            await thread.send(view=view)
-                    except Exception:
-                        pass
-                    try:
-                        await self.db.set_sla_breached(int(t["ticket_id"]), now.isoformat())
-                    except Exception:
-                        pass
-                    await self._send_ticket_log(
-                        guild,
-                        "SLA überschritten",
-                        "Noch keine Antwort vom Team.",
-                        int(t["ticket_id"]),
-                        thread=thread,
-                        actor=None,
-                    )
-
-            if auto_close_hours > 0:
-                last_activity = _parse_iso(t.get("last_activity_at")) or _parse_iso(t.get("created_at"))
-                if last_activity and now - last_activity >= timedelta(hours=auto_close_hours):
-                    try:
-                        await self.db.close_ticket(int(t["ticket_id"]))
-                    except Exception:
-                        pass
+        if sla_hit:
+            try:
+                view = build_thread_status_embed(
+                    self.settings,
+                    guild,
+                    "⏱️ SLA überschritten",
+                    "Noch keine Antwort vom Team.",
+                    None,
+                )
+                if thread:
+                    await thread.send(view=view)
+            except Exception:
+                pass
+            try:
+                await self.db.set_sla_breached(int(t["ticket_id"]), now.isoformat())
+            except Exception:
+                pass
+            await self._send_ticket_log(
+                guild,
+                "SLA überschritten",
+                "Noch keine Antwort vom Team.",
+                int(t["ticket_id"]),
+                thread=thread,
+                actor=None,
+            )
 
-                    try:
-                        if thread:
-                            view = build_thread_status_embed(
-                                self.settings,
-                                guild,
-                                "🔒 Auto-Close",
-                                "Ticket wurde wegen Inaktivität geschlossen.",
-                                None,
-                                banner_url=Banners.TICKETS_CLOSED,
-                            )
-                            await thread.send(view=view)
-                            await thread.edit(archived=True, locked=True)
-                    except Exception:
-                        pass
+        if close_hit:
+            try:
+                await self.db.close_ticket(int(t["ticket_id"]))
+            except Exception:
+                pass
 
-                    await self._notify_user_update(
-                        guild,
-                        t,
-                        "Ticket geschlossen",
-                        "Dein Ticket wurde wegen Inaktivität automatisch geschlossen."
-                    )
-                    if thread and t.get("user_id"):
-                        try:
-                            user = await self.bot.fetch_user(int(t["user_id"]))
-                            await self._send_transcript_dm(user, thread, t)
-                        except Exception:
-                            pass
-
-                    await self._send_ticket_log(
+            try:
+                if thread:
+                    view = build_thread_status_embed(
+                        self.settings,
                         guild,
-                        "Auto-Close",
+                        "🔒 Auto-Close",
                         "Ticket wurde wegen Inaktivität geschlossen.",
-                        int(t["ticket_id"]),
-                        thread=thread,
-                        actor=None,
+                        None,
+                        banner_url=Banners.TICKETS_CLOSED,
                     )
+                    await thread.send(view=view)
+                    await thread.edit(archived=True, locked=True)
+            except Exception:
+                pass
 
-                    await self.logger.emit(
-                        self.bot,
-                        "ticket_auto_closed",
-                        {"ticket_id": int(t["ticket_id"])},
-                    )
+            await self._notify_user_update(
+                guild,
+                t,
+                "Ticket geschlossen",
+                "Dein Ticket wurde wegen Inaktivität automatisch geschlossen."
+            )
+            if thread and t.get("user_id"):
+                try:
+                    user = await self.bot.fetch_user(int(t["user_id"]))
+                    await self._send_transcript_dm(user, thread, t)
+                except Exception:
+                    pass
+
+            await self._send_ticket_log(
+                guild,
+                "Auto-Close",
+                "Ticket wurde wegen Inaktivität geschlossen.",
+                int(t["ticket_id"]),
+                thread=thread,
+                actor=None,
+            )
+
+            await self.logger.emit(
+                self.bot,
+                "ticket_auto_closed",
+                {"ticket_id": int(t["ticket_id"])},
+            )
 
     async def submit_rating(self, interaction: discord.Interaction, ticket_id: int, rating: int, comment: str | None):
         row = await self.db.get_ticket(int(ticket_id))
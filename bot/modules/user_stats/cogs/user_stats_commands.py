@@ -31,6 +31,21 @@ class UserStatsCommands(commands.Cog):
         view = AchievementsView(self.service, interaction.user, page, total_pages)
         await interaction.response.send_message(embed=emb, view=view, ephemeral=True)
 
+    @app_commands.command(name="leaderboard", description="🏅 𑁉 Rangliste des Servers")
+    @app_commands.describe(kategorie="Wonach sortiert wird", seite="Seite der Rangliste")
+    @app_commands.choices(kategorie=[
+        app_commands.Choice(name="Nachrichten", value="messages"),
+        app_commands.Choice(name="Voice", value="voice"),
+        app_commands.Choice(name="XP", value="xp"),
+        app_commands.Choice(name="Invites", value="invites"),
+    ])
+    async def leaderboard(self, interaction: discord.Interaction, kategorie: str = "messages", seite: int = 1):
+        if not interaction.guild:
+            return await interaction.response.send_message("Nur im Server nutzbar.", ephemeral=True)
+        emb, page, total_pages = await self.service.build_leaderboard_embed(interaction.guild, kategorie, page=seite)
+        view = LeaderboardView(self.service, interaction.guild, kategorie, page, total_pages)
+        await interaction.response.send_message(embed=emb, view=view, ephemeral=True)
+
 
 class AchievementsView(discord.ui.View):
     def __init__(self, service: UserStatsService, member: discord.Member, page: int, total_pages: int):
@@ -66,3 +81,37 @@ class AchievementsView(discord.ui.View):
         self.total_pages = total_pages
         self._update_buttons()
         await interaction.response.edit_message(embed=emb, view=self)
+
+
+class LeaderboardView(discord.ui.View):
+    def __init__(self, service: UserStatsService, guild: discord.Guild, metric: str, page: int, total_pages: int):
+        super().__init__(timeout=120)
+        self.service = service
+        self.guild = guild
+        self.metric = metric
+        self.page = page
+        self.total_pages = total_pages
+        self._update_buttons()
+
+    def _update_buttons(self):
+        for item in self.children:
+            if isinstance(item, discord.ui.Button):
+                if item.custom_id == "lb_prev":
+                    item.disabled = self.page <= 1
+                if item.custom_id == "lb_next":
+                    item.disabled = self.page >= self.total_pages
+
+    async def _show(self, interaction: discord.Interaction, page: int):
+        emb, page, total_pages = await self.service.build_leaderboard_embed(self.guild, self.metric, page=page)
+        self.page = page
+        self.total_pages = total_pages
+        self._update_buttons()
+        await interaction.response.edit_message(embed=emb, view=self)
+
+    @discord.ui.button(label="Zurück", style=discord.ButtonStyle.secondary, custom_id="lb_prev")
+    async def prev(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, max(1, self.page - 1))
+
+    @discord.ui.button(label="Weiter", style=discord.ButtonStyle.primary, custom_id="lb_next")
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, min(self.total_pages, self.page + 1))
@@ -37,6 +37,7 @@ class UserStatsListener(commands.Cog):
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         try:
+            self.service.on_member_join(member)
             await self.service.sync_booster(member)
         except Exception:
             pass
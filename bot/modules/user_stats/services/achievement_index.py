@@ -0,0 +1,97 @@
+from bisect import bisect_right
+from collections import OrderedDict
+
+STAT_TYPES = ("messages", "welcomes", "voice_hours", "level", "days_on_server", "booster")
+
+
+class CompiledAchievements:
+    def __init__(self, items: list):
+        self.source = items
+        self.items: dict[str, dict] = {}
+        buckets: dict[str, list[tuple[int, str]]] = {t: [] for t in STAT_TYPES}
+        for item in items or []:
+            if not isinstance(item, dict):
+                continue
+            code = str(item.get("code", "") or "").strip()
+            if not code or code in self.items:
+                continue
+            self.items[code] = item
+            a_type = str(item.get("type", "") or "").strip()
+            if a_type not in buckets:
+                continue
+            # Booster zählt unabhängig vom Schwellwert, sobald der Boost aktiv ist.
+            threshold = 0 if a_type == "booster" else int(item.get("threshold", 0) or 0)
+            buckets[a_type].append((threshold, code))
+        self._thresholds: dict[str, list[int]] = {}
+        self._codes: dict[str, list[str]] = {}
+        for a_type, entries in buckets.items():
+            entries.sort()
+            self._thresholds[a_type] = [t for t, _ in entries]
+            self._codes[a_type] = [c for _, c in entries]
+
+    def __bool__(self) -> bool:
+        return any(self._codes.values())
+
+    def reached(self, a_type: str, value: int) -> list[str]:
+        thresholds = self._thresholds.get(a_type) or []
+        return self._codes[a_type][: bisect_right(thresholds, int(value))] if thresholds else []
+
+    def next_threshold(self, a_type: str, value: int) -> int | None:
+        thresholds = self._thresholds.get(a_type) or []
+        idx = bisect_right(thresholds, int(value))
+        return thresholds[idx] if idx < len(thresholds) else None
+
+
+class AchievementIndex:
+    def __init__(self, settings, db, cache_size: int = 10000):
+        self.settings = settings
+        self.db = db
+        self.cache_size = max(100, int(cache_size))
+        self._compiled: dict[int, CompiledAchievements] = {}
+        self._unlocked: OrderedDict[tuple[int, int], set[str]] = OrderedDict()
+
+    def compiled(self, guild_id: int) -> CompiledAchievements:
+        items = self.settings.get_guild(guild_id, "achievements.items", []) or []
+        current = self._compiled.get(int(guild_id))
+        # Die Settings liefern bis zum nächsten Reload dieselbe Liste zurück.
+        if current is None or current.source is not items:
+            current = CompiledAchievements(items)
+            self._compiled[int(guild_id)] = current
+        return current
+
+    async def unlocked(self, guild_id: int, user_id: int) -> set[str]:
+        key = (int(guild_id), int(user_id))
+        codes = self._unlocked.get(key)
+        if codes is not None:
+            self._unlocked.move_to_end(key)
+            return codes
+        rows = await self.db.list_achievements(guild_id, user_id)
+        codes = {str(r[0]) for r in rows}
+        self._unlocked[key] = codes
+        while len(self._unlocked) > self.cache_size:
+            self._unlocked.popitem(last=False)
+        return codes
+
+    async def add_achievement(self, guild_id: int, user_id: int, code: str):
+        await self.db.add_achievement(guild_id, user_id, code)
+        self.note_unlocked(guild_id, user_id, code)
+
+    def note_unlocked(self, guild_id: int, user_id: int, code: str):
+        codes = self._unlocked.get((int(guild_id), int(user_id)))
+        if codes is not None:
+            codes.add(str(code))
+
+    def forget(self, guild_id: int, user_id: int):
+        self._unlocked.pop((int(guild_id), int(user_id)), None)
+
+    async def pending(self, guild_id: int, user_id: int, values: dict[str, int]) -> list[str]:
+        compiled = self.compiled(guild_id)
+        if not compiled:
+            return []
+        reached = []
+        for a_type, value in values.items():
+            reached.extend(compiled.reached(a_type, value))
+        if not reached:
+            return []
+        codes = await self.unlocked(guild_id, user_id)
+        return [code for code in reached if code not in codes]
@@ -0,0 +1,180 @@
+import time
+import asyncio
+from datetime import datetime, timezone
+
+HOUR = 3600
+DAY = 86400
+# channel_id für die Summe über die ganze Gilde
+GUILD = 0
+_MESSAGES, _VOICE, _JOINS, _LEAVES = 0, 1, 2, 3
+
+
+def _now_ts() -> int:
+    return int(datetime.now(timezone.utc).timestamp())
+
+
+class ActivityRollup:
+    def __init__(self, db, flush_seconds: float = 30.0, hourly_retention_days: int = 14, compact_seconds: float = 3600.0):
+        self.db = db
+        self.flush_seconds = max(1.0, float(flush_seconds))
+        self.hourly_retention_days = max(1, int(hourly_retention_days))
+        self.compact_seconds = max(60.0, float(compact_seconds))
+        self._counts: dict[tuple[int, int, int], list] = {}
+        # Aktive Nutzer nur für den laufenden Stunden- bzw. Tages-Bucket im Speicher
+        self._hour_users: dict[tuple[int, int, int], set[int]] = {}
+        self._day_users: dict[tuple[int, int, int], set[int]] = {}
+        self._dirty_hours: set[tuple[int, int, int]] = set()
+        self._dirty_days: set[tuple[int, int, int]] = set()
+        self._flush_task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self._last_compact = float("-inf")
+        self.flushes = 0
+        self.compacted = 0
+
+    def _bump(self, guild_id: int, channel_id: int, ts: int, index: int, amount: int):
+        key = (guild_id, channel_id, ts - ts % HOUR)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = [0, 0, 0, 0]
+            self._counts[key] = counts
+        counts[index] += int(amount)
+
+    def _seen(self, guild_id: int, channel_id: int, user_id: int, ts: int):
+        for users, dirty, key in (
+            (self._hour_users, self._dirty_hours, (guild_id, channel_id, ts - ts % HOUR)),
+            (self._day_users, self._dirty_days, (guild_id, channel_id, ts - ts % DAY)),
+        ):
+            bucket = users.setdefault(key, set())
+            if user_id not in bucket:
+                bucket.add(user_id)
+                dirty.add(key)
+
+    def record_message(self, guild_id: int, channel_id: int, user_id: int, at: int | None = None):
+        g, c, u = int(guild_id), int(channel_id), int(user_id)
+        ts = int(at) if at is not None else _now_ts()
+        for channel in (GUILD, c):
+            self._bump(g, channel, ts, _MESSAGES, 1)
+            self._seen(g, channel, u, ts)
+        self._schedule_flush()
+
+    def record_voice(self, guild_id: int, channel_id: int, user_id: int, seconds: int, at: int | None = None):
+        if seconds <= 0:
+            return
+        g, c, u = int(guild_id), int(channel_id), int(user_id)
+        ts = int(at) if at is not None else _now_ts()
+        for channel in (GUILD, c):
+            self._bump(g, channel, ts, _VOICE, seconds)
+            self._seen(g, channel, u, ts)
+        self._schedule_flush()
+
+    def record_join(self, guild_id: int, at: int | None = None):
+        self._bump(int(guild_id), GUILD, int(at) if at is not None else _now_ts(), _JOINS, 1)
+        self._schedule_flush()
+
+    def record_leave(self, guild_id: int, at: int | None = None):
+        self._bump(int(guild_id), GUILD, int(at) if at is not None else _now_ts(), _LEAVES, 1)
+        self._schedule_flush()
+
+    def pending(self) -> int:
+        return len(self._counts) + len(self._dirty_hours) + len(self._dirty_days)
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                self._flush_task = None
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_seconds)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            pass
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            counts, dirty_hours, dirty_days = self._counts, self._dirty_hours, self._dirty_days
+            if counts or dirty_hours or dirty_days:
+                self._counts, self._dirty_hours, self._dirty_days = {}, set(), set()
+                hourly = []
+                for key in set(counts) | dirty_hours:
+                    c = counts.get(key) or (0, 0, 0, 0)
+                    active = len(self._hour_users.get(key, ())) if key in dirty_hours else 0
+                    hourly.append((*key, c[_MESSAGES], active, c[_VOICE], c[_JOINS], c[_LEAVES]))
+                daily = [(*key, len(self._day_users.get(key, ()))) for key in dirty_days]
+                try:
+                    await self.db.apply_activity_batch(hourly, daily)
+                except BaseException:
+                    for key, c in counts.items():
+                        newer = self._counts.get(key)
+                        if newer:
+                            for i, value in enumerate(newer):
+                                c[i] += value
+                        self._counts[key] = c
+                    self._dirty_hours |= dirty_hours
+                    self._dirty_days |= dirty_days
+                    raise
+                self.flushes += 1
+                self._prune()
+            if time.monotonic() - self._last_compact >= self.compact_seconds:
+                self._last_compact = time.monotonic()
+                await self.compact()
+            return len(counts)
+
+    def _prune(self):
+        # Abgeschlossene Buckets sind geschrieben, ihre Nutzermengen werden nicht mehr gebraucht.
+        now = _now_ts()
+        hour, day = now - now % HOUR, now - now % DAY
+        for key in [k for k in self._hour_users if k[2] < hour and k not in self._dirty_hours]:
+            del self._hour_users[key]
+        for key in [k for k in self._day_users if k[2] < day and k not in self._dirty_days]:
+            del self._day_users[key]
+
+    async def compact(self) -> int:
+        now = _now_ts()
+        cutoff = now - now % DAY - self.hourly_retention_days * DAY
+        folded = await self.db.compact_activity(cutoff)
+        self.compacted += folded
+        return folded
+
+    async def series(self, guild_id: int, channel_id: int = GUILD, granularity: str = "day", buckets: int = 30) -> list[dict]:
+        step = HOUR if granularity == "hour" else DAY
+        buckets = max(1, int(buckets))
+        now = _now_ts()
+        end = now - now % step + step
+        start = end - buckets * step
+        if step == HOUR:
+            rows = await self.db.get_activity_hourly(guild_id, channel_id, start, end)
+        else:
+            rows = await self.db.get_activity_daily(guild_id, channel_id, start, end)
+        by_ts = {int(r[0]): r for r in rows}
+        out = []
+        for ts in range(start, end, step):
+            r = by_ts.get(ts) or (ts, 0, 0, 0, 0, 0)
+            out.append({
+                "ts": ts,
+                "messages": int(r[1] or 0),
+                "active_users": int(r[2] or 0),
+                "voice_minutes": int(r[3] or 0) // 60,
+                "joins": int(r[4] or 0),
+                "leaves": int(r[5] or 0),
+            })
+        return out
+
+    async def close(self):
+        task = self._flush_task
+        self._flush_task = None
+        if task and not task.done():
+            task.cancel()
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending_buckets": len(self._counts),
+            "tracked_hours": len(self._hour_users),
+            "tracked_days": len(self._day_users),
+            "flushes": int(self.flushes),
+            "compacted": int(self.compacted),
+        }
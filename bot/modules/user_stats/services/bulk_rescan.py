@@ -0,0 +1,321 @@
+import os
+import json
+import time
+import asyncio
+from datetime import datetime, timezone
+import discord
+
+STATE_DIR = os.path.join("data", "rescan")
+
+
+class RescanState:
+    def __init__(self, guild_id: int, directory: str = STATE_DIR):
+        self.guild_id = int(guild_id)
+        self.path = os.path.join(directory, f"{self.guild_id}.json")
+        self.done: set[int] = set()
+        # Erfolge, die schon eingetragen sind, deren DM aber noch aussteht (user_id -> Codes)
+        self.pending_dms: dict[int, list[str]] = {}
+        self.started_at: str | None = None
+        self.resumed = False
+
+    def load(self, max_age_seconds: float) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f) or {}
+            started = datetime.fromisoformat(str(data.get("started_at")))
+        except Exception:
+            return False
+        # Zu alter Stand: Rollen und Stats haben sich seitdem geändert, lieber neu anfangen.
+        if (datetime.now(timezone.utc) - started).total_seconds() > max_age_seconds:
+            return False
+        self.done = {int(v) for v in data.get("done", [])}
+        self.pending_dms = {int(k): [str(c) for c in v] for k, v in (data.get("pending_dms") or {}).items()}
+        self.started_at = data.get("started_at")
+        self.resumed = True
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "guild_id": self.guild_id,
+                "started_at": self.started_at,
+                "done": sorted(self.done),
+                "pending_dms": {str(k): v for k, v in self.pending_dms.items()},
+            }, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class _Pacer:
+    # Verteilt Discord-Requests aller Worker gleichmäßig; 429er verschieben alle.
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def back_off(self, seconds: float):
+        self._next = max(self._next, time.monotonic() + max(0.0, float(seconds)))
+
+
+class GuildRescan:
+    def __init__(self, service, guild: discord.Guild, birthday_service=None, progress=None,
+                 resume: bool = False, concurrency: int = 4, requests_per_second: float = 5.0,
+                 progress_seconds: float = 5.0, checkpoint_every: int = 50, resume_max_hours: float = 24.0):
+        self.service = service
+        self.db = service.db
+        self.guild = guild
+        self.birthday_service = birthday_service
+        self.progress = progress
+        self.resume = resume
+        self.resume_max_seconds = max(0.0, float(resume_max_hours)) * 3600
+        self.concurrency = max(1, int(concurrency))
+        self.pacer = _Pacer(float(requests_per_second))
+        self.progress_seconds = max(1.0, float(progress_seconds))
+        self.checkpoint_every = max(1, int(checkpoint_every))
+        self.state = RescanState(guild.id)
+        self.result = {
+            "scanned": 0,
+            "achievements_new": 0,
+            "birthday_new": 0,
+            "levels_updated": 0,
+            "role_updates": 0,
+            "dms": 0,
+            "failed": 0,
+            "skipped_done": 0,
+            "resumed": False,
+        }
+        self._done = 0
+        self._total = 0
+        self._last_progress = 0.0
+
+    async def _report(self, phase: str, force: bool = False):
+        if not self.progress:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_progress < self.progress_seconds:
+            return
+        self._last_progress = now
+        try:
+            await self.progress(phase, self._done, self._total, dict(self.result))
+        except Exception:
+            pass
+
+    async def _prefetch(self, members: list[discord.Member]):
+        gid = self.guild.id
+        rows = {int(r[1]): r for r in await self.db.list_user_stats_for_guild(gid)}
+        missing = [m.id for m in members if m.id not in rows]
+        if missing:
+            await self.db.ensure_user_stats_rows(gid, missing)
+            for uid in missing:
+                rows[uid] = (gid, uid, 0, 0, 0, 0, 0, None, None, 0, 0)
+        unlocked: dict[int, set[str]] = {}
+        for uid, code in await self.db.list_achievements_for_guild(gid):
+            unlocked.setdefault(int(uid), set()).add(str(code))
+        birthdays: dict[int, int] = {}
+        if self.birthday_service:
+            for row in await self.db.list_birthdays_global_all():
+                birthdays[int(row[0])] = int(row[3])
+        return rows, unlocked, birthdays
+
+    def _plan(self, members, rows, unlocked, birthdays):
+        service = self.service
+        gid = self.guild.id
+        compiled = service.achievements.compiled(gid)
+        levels: list[tuple[int, int]] = []
+        new_codes: list[tuple[int, int, str]] = []
+        jobs = []
+        for member in members:
+            stats = service._row_to_stats(rows[member.id])
+            new_level = service._level_for_xp(stats["xp"], gid)
+            if new_level > stats["level"]:
+                levels.append((member.id, new_level))
+                stats["level"] = new_level
+
+            days_on_server = 0
+            if member.joined_at:
+                days_on_server = int((datetime.now(timezone.utc) - member.joined_at).total_seconds() // 86400)
+            values = {
+                "messages": stats["message_count"],
+                "welcomes": stats["welcome_count"],
+                "voice_hours": stats["voice_seconds"] // 3600,
+                "level": stats["level"],
+                "days_on_server": days_on_server,
+                "booster": 1 if member.premium_since else -1,
+            }
+            have = unlocked.get(member.id, set())
+            fresh = []
+            for a_type, value in values.items():
+                fresh.extend(code for code in compiled.reached(a_type, value) if code not in have)
+
+            targets = service._rule_role_targets(member, stats)
+            year = birthdays.get(member.id)
+            if year is not None:
+                targets.update(self.birthday_service.birthday_role_targets(member, year))
+                if "birthday_set" not in have:
+                    fresh.append("birthday_set")
+                    self.result["birthday_new"] += 1
+            for code in fresh:
+                new_codes.append((gid, member.id, code))
+            self.result["achievements_new"] += len(fresh)
+            # Erfolgsrollen für alle freigeschalteten Codes, damit ein
+            # fortgesetzter Lauf nichts vergisst, was vor dem Abbruch eingetragen wurde.
+            for code in have.union(fresh):
+                item = compiled.items.get(code)
+                role_id = int(item.get("role_id", 0) or 0) if item else 0
+                if role_id:
+                    targets[role_id] = True
+
+            current = {r.id for r in member.roles}
+            add, remove = [], []
+            for role_id, should_have in targets.items():
+                role = self.guild.get_role(int(role_id))
+                if not role:
+                    continue
+                if should_have and role.id not in current:
+                    add.append(role)
+                elif not should_have and role.id in current:
+                    remove.append(role)
+            # DMs aus einem abgebrochenen Lauf: die Codes stehen schon in "have".
+            dm_codes = list(dict.fromkeys([*self.state.pending_dms.get(member.id, []), *fresh]))
+            dm_codes = [c for c in dm_codes if c in compiled.items and str(compiled.items[c].get("dm_message", "") or "").strip()]
+            if dm_codes:
+                self.state.pending_dms[member.id] = dm_codes
+            else:
+                self.state.pending_dms.pop(member.id, None)
+            dms = [compiled.items[c] for c in dm_codes]
+            if add or remove or dms:
+                jobs.append((member, add, remove, dms))
+        return levels, new_codes, jobs
+
+    async def _call(self, coro_factory) -> bool:
+        for attempt in range(4):
+            await self.pacer.wait()
+            try:
+                await coro_factory()
+                return True
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    self.pacer.back_off(float(getattr(e, "retry_after", 0) or 2 ** attempt))
+                    continue
+                if e.status >= 500:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                return False
+            except Exception:
+                return False
+        return False
+
+    async def _apply(self, member: discord.Member, add: list, remove: list, dms: list):
+        ok = True
+        if add or remove:
+            remove_ids = {r.id for r in remove}
+            roles = [r for r in member.roles[1:] if r.id not in remove_ids]
+            roles.extend(r for r in add if r not in roles)
+            ok = await self._call(lambda: member.edit(roles=roles, reason="User stats rescan"))
+            if ok:
+                self.result["role_updates"] += 1
+        for item in dms:
+            msg = str(item.get("dm_message", "") or "").strip()
+            emb = self.service._achievement_dm_embed(member, item, msg)
+            if await self._call(lambda: member.send(embed=emb)):
+                self.result["dms"] += 1
+        return ok
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            job = await queue.get()
+            try:
+                if job is None:
+                    return
+                member = job[0]
+                if await self._apply(*job):
+                    self.state.done.add(member.id)
+                    self.state.pending_dms.pop(member.id, None)
+                else:
+                    self.result["failed"] += 1
+                self._done += 1
+                if self._done % self.checkpoint_every == 0:
+                    self.state.save()
+                await self._report("roles")
+            finally:
+                queue.task_done()
+
+    async def run(self) -> dict:
+        guild = self.guild
+        if self.resume and self.state.load(self.resume_max_seconds):
+            self.result["resumed"] = True
+        else:
+            self.state.clear()
+            self.state = RescanState(guild.id)
+            self.state.started_at = datetime.now(timezone.utc).isoformat()
+        try:
+            result = await self._run()
+        except asyncio.CancelledError:
+            # Shutdown mitten im Lauf: Stand bleibt zum Fortsetzen liegen.
+            self.state.save()
+            raise
+        except Exception:
+            self.state.clear()
+            raise
+        self.state.clear()
+        return result
+
+    async def _run(self) -> dict:
+        guild = self.guild
+        await self.service.flush_stats()
+        members = [m for m in guild.members if not m.bot]
+        self.result["scanned"] = len(members)
+        self._total = len(members)
+        await self._report("prefetch", force=True)
+
+        rows, unlocked, birthdays = await self._prefetch(members)
+        levels, new_codes, jobs = self._plan(members, rows, unlocked, birthdays)
+        # Ausstehende DMs sichern, bevor die Codes eingetragen werden und damit als "have" gelten.
+        self.state.save()
+        await self.db.set_user_levels(guild.id, levels)
+        await self.db.add_achievements(new_codes)
+        self.result["levels_updated"] = len(levels)
+        for uid, level in levels:
+            self.service.aggregator.note_level(guild.id, uid, level)
+        for _, uid, _ in new_codes:
+            self.service.achievements.forget(guild.id, uid)
+
+        pending = [job for job in jobs if job[0].id not in self.state.done]
+        self.result["skipped_done"] = len(jobs) - len(pending)
+        self._total = len(pending)
+        self._done = 0
+        await self._report("roles", force=True)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for job in pending:
+            queue.put_nowait(job)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        for _ in workers:
+            queue.put_nowait(None)
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            raise
+        await self._report("done", force=True)
+        return dict(self.result)
@@ -0,0 +1,59 @@
+from bisect import bisect_right
+
+
+class LevelCurve:
+    def __init__(self, base: float, exponent: float, quick_levels: int, quick_multiplier: float, max_level: int = 200):
+        self.base = float(base)
+        self.exponent = float(exponent)
+        self.quick_levels = int(quick_levels)
+        self.quick_multiplier = float(quick_multiplier)
+        self.max_level = max(1, int(max_level))
+        # _totals[n] = Gesamt-XP, die für Level n nötig sind (_totals[0] == 0).
+        self._totals = [0]
+        self._extend(self.max_level + 1)
+
+    @property
+    def key(self) -> tuple:
+        return (self.base, self.exponent, self.quick_levels, self.quick_multiplier, self.max_level)
+
+    def xp_for_level(self, level: int) -> int:
+        if level <= 0:
+            return 0
+        mult = self.quick_multiplier if level <= self.quick_levels else 1.0
+        return max(1, int(self.base * (level ** self.exponent) * mult))
+
+    def _extend(self, level: int):
+        totals = self._totals
+        while len(totals) <= level:
+            totals.append(totals[-1] + self.xp_for_level(len(totals)))
+
+    def total_for_level(self, level: int) -> int:
+        if level <= 0:
+            return 0
+        if level >= len(self._totals):
+            self._extend(level)
+        return self._totals[level]
+
+    def level_for_xp(self, xp: int) -> int:
+        # Gleiche Obergrenze wie bisher: höchstens max_level.
+        level = bisect_right(self._totals, int(xp or 0), 0, self.max_level + 1) - 1
+        return max(0, min(level, self.max_level))
+
+    def progress(self, xp: int) -> tuple[int, int, int]:
+        level = self.level_for_xp(xp)
+        return level, self.total_for_level(level), self.total_for_level(level + 1)
+
+    def table(self, levels: int | None = None) -> list[int]:
+        count = self.max_level if levels is None else max(0, int(levels))
+        self._extend(count)
+        return list(self._totals[: count + 1])
+
+    def as_dict(self, levels: int | None = None) -> dict:
+        return {
+            "base": self.base,
+            "exponent": self.exponent,
+            "quick_levels": self.quick_levels,
+            "quick_multiplier": self.quick_multiplier,
+            "max_level": self.max_level,
+            "totals": self.table(levels),
+        }
@@ -0,0 +1,193 @@
+import time
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+# Spalten wie in Database.get_user_stats:
+# guild_id, user_id, message_count, voice_seconds, welcome_count, xp, level,
+# last_message_at, last_voice_at, invite_count, invite_left_count
+_MESSAGES, _WELCOMES, _XP, _LAST_AT = 0, 1, 2, 3
+
+
+class MessageAggregator:
+    def __init__(self, db, flush_seconds: float = 5.0, max_pending: int = 2000, cache_size: int = 5000, cache_ttl: float = 60.0):
+        self.db = db
+        self.flush_seconds = max(0.5, float(flush_seconds))
+        self.max_pending = max(1, int(max_pending))
+        self.cache_size = max(1, int(cache_size))
+        self.cache_ttl = max(0.0, float(cache_ttl))
+        self._users: dict[tuple[int, int], list] = {}
+        self._channels: dict[tuple[int, int, int], int] = {}
+        self._inflight_users: dict[tuple[int, int], list] = {}
+        self._base: OrderedDict[tuple[int, int], tuple[float, list]] = OrderedDict()
+        self._flush_task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        # Schreiben (Flush, Voice-Checkpoint) und Nachladen einer Basis schließen sich aus:
+        # eine geladene Basis enthält also genau die committeten Deltas, keine halb verbuchten.
+        self.write_lock = asyncio.Lock()
+        self.flushed_messages = 0
+        self.flushes = 0
+
+    def pending(self) -> int:
+        return len(self._users) + len(self._channels)
+
+    def _cached_base(self, key: tuple[int, int]) -> list | None:
+        cached = self._base.get(key)
+        if not cached:
+            return None
+        fresh = not self.cache_ttl or time.monotonic() - cached[0] < self.cache_ttl
+        if not fresh and key not in self._inflight_users:
+            return None
+        self._base.move_to_end(key)
+        return cached[1]
+
+    async def _load_base(self, guild_id: int, user_id: int, create: bool = True) -> list | None:
+        key = (int(guild_id), int(user_id))
+        base = self._cached_base(key)
+        if base is not None:
+            return base
+        async with self.write_lock:
+            base = self._cached_base(key)
+            if base is not None:
+                return base
+            row = await self.db.get_user_stats(guild_id, user_id)
+            if not row:
+                if not create:
+                    return None
+                # Zeile sofort anlegen, damit set_user_level & Co. vor dem Flush greifen.
+                await self.db.upsert_user_stats(guild_id, user_id)
+                row = (key[0], key[1], 0, 0, 0, 0, 0, None, None, 0, 0)
+            base = list(row)
+        self._base[key] = (time.monotonic(), base)
+        self._base.move_to_end(key)
+        while len(self._base) > self.cache_size:
+            self._base.popitem(last=False)
+        return base
+
+    def _merge(self, base: list, *deltas) -> tuple:
+        row = list(base)
+        for delta in deltas:
+            if not delta:
+                continue
+            row[2] = int(row[2] or 0) + delta[_MESSAGES]
+            row[4] = int(row[4] or 0) + delta[_WELCOMES]
+            row[5] = int(row[5] or 0) + delta[_XP]
+            if delta[_LAST_AT]:
+                row[7] = delta[_LAST_AT]
+        return tuple(row)
+
+    async def record_message(self, guild_id: int, user_id: int, channel_id: int, xp: int, welcome: bool = False) -> tuple:
+        key = (int(guild_id), int(user_id))
+        base = await self._load_base(*key)
+        delta = self._users.get(key)
+        if delta is None:
+            delta = [0, 0, 0, None]
+            self._users[key] = delta
+        delta[_MESSAGES] += 1
+        delta[_XP] += int(xp)
+        if welcome:
+            delta[_WELCOMES] += 1
+        delta[_LAST_AT] = datetime.now(timezone.utc).isoformat()
+        channel_key = (key[0], key[1], int(channel_id))
+        self._channels[channel_key] = self._channels.get(channel_key, 0) + 1
+        self._schedule_flush()
+        return self._merge(base, self._inflight_users.get(key), delta)
+
+    async def get_user_stats(self, guild_id: int, user_id: int):
+        key = (int(guild_id), int(user_id))
+        pending = key in self._users or key in self._inflight_users
+        base = await self._load_base(*key, create=pending)
+        if base is None:
+            return None
+        return self._merge(base, self._inflight_users.get(key), self._users.get(key))
+
+    def pending_channels(self, guild_id: int, user_id: int) -> dict[int, int]:
+        g, u = int(guild_id), int(user_id)
+        return {c: n for (cg, cu, c), n in self._channels.items() if cg == g and cu == u}
+
+    def apply_voice(self, guild_id: int, user_id: int, seconds: int, xp: int, last_at: str | None):
+        # Nur unter write_lock direkt nach dem Commit des Voice-Batches aufrufen.
+        cached = self._base.get((int(guild_id), int(user_id)))
+        if cached:
+            row = cached[1]
+            row[3] = int(row[3] or 0) + int(seconds)
+            row[5] = int(row[5] or 0) + int(xp)
+            if last_at:
+                row[8] = last_at
+
+    def note_level(self, guild_id: int, user_id: int, level: int):
+        cached = self._base.get((int(guild_id), int(user_id)))
+        if cached:
+            cached[1][6] = int(level)
+
+    def invalidate(self, guild_id: int, user_id: int):
+        self._base.pop((int(guild_id), int(user_id)), None)
+
+    def _schedule_flush(self):
+        if self.pending() >= self.max_pending:
+            if not self._flush_lock.locked():
+                asyncio.create_task(self.flush())
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_seconds)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            pass
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._users and not self._channels:
+                return 0
+            async with self.write_lock:
+                users, channels = self._users, self._channels
+                self._users, self._channels = {}, {}
+                self._inflight_users = users
+                try:
+                    await self.db.apply_message_batch(
+                        [(g, u, d[_MESSAGES], d[_WELCOMES], d[_XP], d[_LAST_AT]) for (g, u), d in users.items()],
+                        [(g, u, c, n) for (g, u, c), n in channels.items()],
+                    )
+                except BaseException:
+                    # Deltas zurücklegen, der nächste Flush versucht es erneut.
+                    for key, delta in users.items():
+                        newer = self._users.get(key)
+                        if newer:
+                            delta[_MESSAGES] += newer[_MESSAGES]
+                            delta[_WELCOMES] += newer[_WELCOMES]
+                            delta[_XP] += newer[_XP]
+                            delta[_LAST_AT] = newer[_LAST_AT] or delta[_LAST_AT]
+                        self._users[key] = delta
+                    for key, count in channels.items():
+                        self._channels[key] = self._channels.get(key, 0) + count
+                    raise
+                finally:
+                    self._inflight_users = {}
+                for key, delta in users.items():
+                    cached = self._base.get(key)
+                    if cached:
+                        cached[1][:] = self._merge(cached[1], delta)
+            count = sum(d[_MESSAGES] for d in users.values())
+            self.flushed_messages += count
+            self.flushes += 1
+            return count
+
+    async def close(self):
+        task = self._flush_task
+        self._flush_task = None
+        if task and not task.done():
+            task.cancel()
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending_users": len(self._users),
+            "pending_channels": len(self._channels),
+            "cached_users": len(self._base),
+            "flushes": int(self.flushes),
+            "flushed_messages": int(self.flushed_messages),
+        }
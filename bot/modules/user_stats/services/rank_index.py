@@ -0,0 +1,234 @@
+import time
+import asyncio
+from bisect import bisect_left, bisect_right, insort
+
+# Metrik -> Index der Spalte in Database.get_user_stats
+METRICS = {
+    "messages": 2,
+    "voice": 3,
+    "xp": 5,
+    "invites": 9,
+}
+
+
+class _SortedBlocks:
+    # Sortierte Liste in Blöcken (wie sortedcontainers.SortedList) plus Fenwick-Baum über
+    # die Blocklängen: Einfügen, Löschen und Positionsabfragen in O(log n), nur innerhalb
+    # eines Blocks (höchstens 2 * LOAD Einträge) wird noch verschoben.
+    LOAD = 256
+
+    def __init__(self, items=()):
+        self._load(sorted(items))
+
+    def _load(self, items: list):
+        self._blocks = [items[i: i + self.LOAD] for i in range(0, len(items), self.LOAD)]
+        self._maxes = [b[-1] for b in self._blocks]
+        self._size = len(items)
+        self._build_tree()
+
+    def _build_tree(self):
+        tree = [0] + [len(b) for b in self._blocks]
+        for i in range(1, len(tree)):
+            j = i + (i & -i)
+            if j < len(tree):
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, block: int, delta: int):
+        i = block + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, block: int) -> int:
+        # Anzahl Einträge in den Blöcken vor `block`
+        total = 0
+        i = block
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        pos, rest = 0, index
+        bit = 1 << (len(self._tree) - 1).bit_length()
+        while bit:
+            nxt = pos + bit
+            if nxt < len(self._tree) and self._tree[nxt] <= rest:
+                pos = nxt
+                rest -= self._tree[nxt]
+            bit >>= 1
+        return pos, rest
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, item):
+        if not self._blocks:
+            self._load([item])
+            return
+        i = bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            i -= 1
+        block = self._blocks[i]
+        insort(block, item)
+        self._maxes[i] = block[-1]
+        self._size += 1
+        if len(block) > 2 * self.LOAD:
+            self._blocks[i: i + 1] = [block[: self.LOAD], block[self.LOAD:]]
+            self._maxes[i: i + 1] = [self._blocks[i][-1], self._blocks[i + 1][-1]]
+            self._build_tree()
+        else:
+            self._tree_add(i, 1)
+
+    def remove(self, item) -> bool:
+        i = bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            return False
+        block = self._blocks[i]
+        j = bisect_left(block, item)
+        if j == len(block) or block[j] != item:
+            return False
+        del block[j]
+        self._size -= 1
+        if block:
+            self._maxes[i] = block[-1]
+            self._tree_add(i, -1)
+        else:
+            del self._blocks[i]
+            del self._maxes[i]
+            self._build_tree()
+        return True
+
+    def bisect_left(self, item) -> int:
+        i = bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            return self._size
+        return self._prefix(i) + bisect_left(self._blocks[i], item)
+
+    def bisect_right(self, item) -> int:
+        i = bisect_right(self._maxes, item)
+        if i == len(self._maxes):
+            return self._size
+        return self._prefix(i) + bisect_right(self._blocks[i], item)
+
+    def slice(self, offset: int, limit: int) -> list:
+        if offset >= self._size or limit <= 0:
+            return []
+        i, j = self._locate(max(0, offset))
+        out = []
+        while i < len(self._blocks) and len(out) < limit:
+            out.extend(self._blocks[i][j: j + limit - len(out)])
+            i, j = i + 1, 0
+        return out
+
+
+class _Ranking:
+    def __init__(self):
+        self.values: dict[int, int] = {}
+        # (-wert, user_id) aufsteigend sortiert = höchster Wert zuerst
+        self.order = _SortedBlocks()
+
+    def load(self, pairs):
+        self.values = {int(u): int(v or 0) for u, v in pairs}
+        self.order = _SortedBlocks((-v, u) for u, v in self.values.items())
+
+    def update(self, user_id: int, value: int):
+        old = self.values.get(user_id)
+        if old == value:
+            return
+        if old is not None:
+            self.order.remove((-old, user_id))
+        self.values[user_id] = value
+        self.order.add((-value, user_id))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def count_above(self, value: int) -> int:
+        return self.order.bisect_left((-int(value), -1))
+
+    def count_at_least(self, value: int) -> int:
+        return self.order.bisect_right((-int(value), float("inf")))
+
+    def rank(self, user_id: int) -> int | None:
+        value = self.values.get(user_id)
+        if value is None:
+            return None
+        return self.count_above(value) + 1
+
+    def page(self, offset: int, limit: int) -> list[tuple[int, int, int]]:
+        out = []
+        for neg_value, user_id in self.order.slice(offset, limit):
+            out.append((self.count_above(-neg_value) + 1, user_id, -neg_value))
+        return out
+
+
+class RankIndex:
+    def __init__(self, db, reload_seconds: float = 1800.0):
+        self.db = db
+        self.reload_seconds = max(0.0, float(reload_seconds))
+        self._guilds: dict[int, dict[str, _Ranking]] = {}
+        self._loaded_at: dict[int, float] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    def loaded(self, guild_id: int) -> bool:
+        return int(guild_id) in self._guilds
+
+    async def ensure(self, guild_id: int) -> dict[str, _Ranking]:
+        gid = int(guild_id)
+        rankings = self._guilds.get(gid)
+        if rankings is not None and (not self.reload_seconds or time.monotonic() - self._loaded_at[gid] < self.reload_seconds):
+            return rankings
+        lock = self._locks.setdefault(gid, asyncio.Lock())
+        async with lock:
+            rankings = self._guilds.get(gid)
+            if rankings is not None and (not self.reload_seconds or time.monotonic() - self._loaded_at[gid] < self.reload_seconds):
+                return rankings
+            rows = await self.db.list_user_stats_for_guild(gid)
+            fresh = {}
+            for metric, col in METRICS.items():
+                ranking = _Ranking()
+                ranking.load((row[1], row[col]) for row in rows)
+                fresh[metric] = ranking
+            self._guilds[gid] = fresh
+            self._loaded_at[gid] = time.monotonic()
+            return fresh
+
+    def observe(self, row):
+        # Aufruf aus dem Schreibpfad: nur bereits geladene Gilden nachführen,
+        # alle anderen lesen beim ersten Zugriff ohnehin den aktuellen Stand.
+        if not row:
+            return
+        rankings = self._guilds.get(int(row[0]))
+        if rankings is None:
+            return
+        user_id = int(row[1])
+        for metric, col in METRICS.items():
+            rankings[metric].update(user_id, int(row[col] or 0))
+
+    def invalidate(self, guild_id: int | None = None):
+        if guild_id is None:
+            self._guilds.clear()
+            self._loaded_at.clear()
+            return
+        self._guilds.pop(int(guild_id), None)
+        self._loaded_at.pop(int(guild_id), None)
+
+    async def size(self, guild_id: int) -> int:
+        rankings = await self.ensure(guild_id)
+        return len(rankings["messages"])
+
+    async def rank(self, guild_id: int, user_id: int, metric: str) -> tuple[int | None, int]:
+        ranking = (await self.ensure(guild_id))[metric]
+        return ranking.rank(int(user_id)), len(ranking)
+
+    async def count_at_least(self, guild_id: int, metric: str, value: int) -> int:
+        return (await self.ensure(guild_id))[metric].count_at_least(value)
+
+    async def top(self, guild_id: int, metric: str, page: int = 1, per_page: int = 10) -> tuple[list[tuple[int, int, int]], int]:
+        ranking = (await self.ensure(guild_id))[metric]
+        per_page = max(1, int(per_page))
+        total_pages = max(1, (len(ranking) + per_page - 1) // per_page)
+        page = max(1, min(int(page), total_pages))
+        return ranking.page((page - 1) * per_page, per_page), total_pages
@@ -1,10 +1,21 @@
 import re
 import json
 import math
+import asyncio
+from collections import OrderedDict
 from datetime import datetime, timezone
 import discord
 from bot.utils.emojis import em
 from bot.utils.assets import Banners
+from bot.modules.user_stats.services.achievement_index import AchievementIndex
+from bot.modules.user_stats.services.activity_rollup import ActivityRollup
+from bot.modules.user_stats.services.bulk_rescan import GuildRescan
+from bot.modules.user_stats.services.level_curve import LevelCurve
+from bot.modules.user_stats.services.message_aggregator import MessageAggregator
+from bot.modules.user_stats.services.rank_index import METRICS, RankIndex
+from bot.modules.user_stats.services.voice_tracker import VoiceTracker
+
+DEFAULT_WELCOME_PATTERNS = ("welcome", "willkommen", "herzlich willkommen", "wb", "wilkommen")
 
 
 class UserStatsService:
@@ -13,71 +24,122 @@ class UserStatsService:
         self.settings = settings
         self.db = db
         self.logger = logger
-        self._welcome_re = self._build_welcome_regex()
-
-    def _build_welcome_regex(self):
-        patterns = self.settings.get("user_stats.welcome_patterns", None) or [
-            "welcome",
-            "willkommen",
-            "herzlich willkommen",
-            "wb",
-            "wilkommen",
-        ]
-        escaped = [re.escape(str(p).strip()) for p in patterns if str(p).strip()]
+        self._welcome_res: dict[tuple[str, ...], re.Pattern] = {}
+        self._welcome_by_guild: dict[int, tuple[object, re.Pattern]] = {}
+        self._curves: dict[tuple, LevelCurve] = {}
+        self.achievements = AchievementIndex(
+            settings,
+            db,
+            cache_size=int(self.settings.get("user_stats.achievement_cache_size", 10000) or 10000),
+        )
+        self.ranks = RankIndex(
+            db,
+            reload_seconds=float(self.settings.get("user_stats.rank_reload_minutes", 30) or 30) * 60,
+        )
+        self.activity = ActivityRollup(
+            db,
+            flush_seconds=float(self.settings.get("user_stats.activity.flush_seconds", 30) or 30),
+            hourly_retention_days=int(self.settings.get("user_stats.activity.hourly_retention_days", 14) or 14),
+        )
+        self.aggregator = MessageAggregator(
+            db,
+            flush_seconds=float(self.settings.get("user_stats.aggregation.flush_seconds", 5) or 5),
+            max_pending=int(self.settings.get("user_stats.aggregation.max_pending", 2000) or 2000),
+            cache_size=int(self.settings.get("user_stats.aggregation.cache_size", 5000) or 5000),
+        )
+        self.voice = VoiceTracker(
+            db,
+            xp_per_minute=lambda guild_id: self._xp_per_voice_minute(),
+            checkpoint_seconds=float(self.settings.get("user_stats.voice_checkpoint_seconds", 60) or 60),
+            on_checkpoint=self._on_voice_checkpoint,
+            on_accrue=self.activity.record_voice,
+            write_lock=self.aggregator.write_lock,
+            on_written=self.aggregator.apply_voice,
+        )
+        self._rescans: set[int] = set()
+        self._presence_state: OrderedDict[tuple[int, int], tuple] = OrderedDict()
+        self._presence_cache_size = max(100, int(self.settings.get("user_stats.presence_cache_size", 10000) or 10000))
+
+    async def flush_stats(self) -> int:
+        return await self.aggregator.flush()
+
+    async def refresh_member_stats(self, guild_id: int, user_id: int):
+        # Für Schreibzugriffe außerhalb dieses Service (z. B. Invites).
+        self.aggregator.invalidate(guild_id, user_id)
+        row = await self.aggregator.get_user_stats(guild_id, user_id)
+        self.ranks.observe(row)
+        return row
+
+    def _build_welcome_regex(self, patterns) -> re.Pattern:
+        escaped = [re.escape(p) for p in patterns]
         if not escaped:
             escaped = [re.escape("welcome")]
         pattern = r"(" + "|".join(escaped) + r")"
         return re.compile(pattern, re.IGNORECASE)
 
+    def _welcome_regex(self, guild_id: int | None = None) -> re.Pattern:
+        raw = self.settings.get_guild(guild_id, "user_stats.welcome_patterns", None) or DEFAULT_WELCOME_PATTERNS
+        gid = int(guild_id or 0)
+        cached = self._welcome_by_guild.get(gid)
+        # Die Settings liefern bis zur nächsten Änderung dieselbe Liste zurück.
+        if cached and cached[0] is raw:
+            return cached[1]
+        key = tuple(sorted({str(p).strip().lower() for p in raw if str(p).strip()}))
+        compiled = self._welcome_res.get(key)
+        if compiled is None:
+            if len(self._welcome_res) >= 64:
+                self._welcome_res.clear()
+            compiled = self._build_welcome_regex(key)
+            self._welcome_res[key] = compiled
+        self._welcome_by_guild[gid] = (raw, compiled)
+        return compiled
+
     def _xp_per_message(self) -> int:
         return int(self.settings.get("user_stats.xp.per_message", 5) or 0)
 
     def _xp_per_voice_minute(self) -> int:
         return int(self.settings.get("user_stats.xp.per_voice_minute", 2) or 0)
 
-    def _level_base(self) -> float:
-        return float(self.settings.get("user_stats.level_curve.base", 100) or 100)
-
-    def _level_exponent(self) -> float:
-        return float(self.settings.get("user_stats.level_curve.exponent", 1.35) or 1.35)
-
-    def _quick_levels(self) -> int:
-        return int(self.settings.get("user_stats.level_curve.quick_levels", 15) or 15)
-
-    def _quick_multiplier(self) -> float:
-        return float(self.settings.get("user_stats.level_curve.quick_multiplier", 0.6) or 0.6)
-
-    def _xp_for_level(self, level: int) -> int:
-        if level <= 0:
-            return 0
-        base = self._level_base()
-        exponent = self._level_exponent()
-        mult = self._quick_multiplier() if level <= self._quick_levels() else 1.0
-        return max(1, int(base * (level ** exponent) * mult))
-
-    def _total_xp_for_level(self, level: int) -> int:
-        if level <= 0:
-            return 0
-        total = 0
-        for lvl in range(1, level + 1):
-            total += self._xp_for_level(lvl)
-        return total
-
-    def _level_for_xp(self, xp: int, max_level: int = 200) -> int:
-        xp = int(xp or 0)
-        level = 0
-        while level < max_level:
-            need = self._total_xp_for_level(level + 1)
-            if xp < need:
-                break
-            level += 1
-        return level
+    def _level_base(self, guild_id: int | None = None) -> float:
+        return float(self.settings.get_guild(guild_id, "user_stats.level_curve.base", 100) or 100)
+
+    def _level_exponent(self, guild_id: int | None = None) -> float:
+        return float(self.settings.get_guild(guild_id, "user_stats.level_curve.exponent", 1.35) or 1.35)
 
-    def _level_progress(self, xp: int) -> tuple[int, int, int]:
-        level = self._level_for_xp(xp)
-        current_total = self._total_xp_for_level(level)
-        next_total = self._total_xp_for_level(level + 1)
-        return level, current_total, next_total
+    def _quick_levels(self, guild_id: int | None = None) -> int:
+        return int(self.settings.get_guild(guild_id, "user_stats.level_curve.quick_levels", 15) or 15)
+
+    def _quick_multiplier(self, guild_id: int | None = None) -> float:
+        return float(self.settings.get_guild(guild_id, "user_stats.level_curve.quick_multiplier", 0.6) or 0.6)
+
+    def level_curve(self, guild_id: int | None = None) -> LevelCurve:
+        key = (
+            self._level_base(guild_id),
+            self._level_exponent(guild_id),
+            self._quick_levels(guild_id),
+            self._quick_multiplier(guild_id),
+        )
+        curve = self._curves.get(key)
+        if curve is None:
+            # Schlüssel ist die Kurven-Konfiguration selbst: geänderte Settings
+            # landen automatisch in einer neuen Tabelle.
+            if len(self._curves) >= 32:
+                self._curves.clear()
+            curve = LevelCurve(*key)
+            self._curves[key] = curve
+        return curve
+
+    def _xp_for_level(self, level: int, guild_id: int | None = None) -> int:
+        return self.level_curve(guild_id).xp_for_level(level)
+
+    def _total_xp_for_level(self, level: int, guild_id: int | None = None) -> int:
+        return self.level_curve(guild_id).total_for_level(level)
+
+    def _level_for_xp(self, xp: int, guild_id: int | None = None) -> int:
+        return self.level_curve(guild_id).level_for_xp(xp)
+
+    def _level_progress(self, xp: int, guild_id: int | None = None) -> tuple[int, int, int]:
+        return self.level_curve(guild_id).progress(xp)
 
     def _vanity_match(self, member: discord.Member) -> bool:
         needles = self.settings.get_guild(member.guild.id, "user_stats.vanity_status_contains", []) or []
@@ -106,37 +168,26 @@ class UserStatsService:
         if bool(self.settings.get_guild(guild.id, "user_stats.auto_sort_roles", False)):
             await self._sort_managed_roles(guild)
 
-    async def rescan_guild(self, guild: discord.Guild, birthday_service=None) -> dict:
-        scanned = 0
-        new_achievements = 0
-        new_birthday = 0
+    async def rescan_guild(self, guild: discord.Guild, birthday_service=None, progress=None, resume: bool = False) -> dict:
         if not guild:
             return {"scanned": 0, "achievements_new": 0, "birthday_new": 0}
-        for member in guild.members:
-            if member.bot:
-                continue
-            scanned += 1
-            await self.db.upsert_user_stats(guild.id, member.id)
-            row = await self.db.get_user_stats(guild.id, member.id)
-            if not row:
-                continue
-            stats = self._row_to_stats(row)
-            await self._sync_level(member, stats, announce=False)
-            await self._evaluate_rules(member, stats)
-            before_rows = await self.db.list_achievements(guild.id, member.id)
-            before = {r[0] for r in before_rows}
-            await self._check_achievements(member, stats)
-            if birthday_service:
-                try:
-                    added = await birthday_service.ensure_birthday_achievement(member)
-                    if added:
-                        new_birthday += 1
-                except Exception:
-                    pass
-            after_rows = await self.db.list_achievements(guild.id, member.id)
-            after = {r[0] for r in after_rows}
-            new_achievements += len(after - before)
-        return {"scanned": scanned, "achievements_new": new_achievements, "birthday_new": new_birthday}
+        if guild.id in self._rescans:
+            raise RuntimeError("rescan_already_running")
+        self._rescans.add(guild.id)
+        try:
+            rescan = GuildRescan(
+                self,
+                guild,
+                birthday_service=birthday_service,
+                progress=progress,
+                resume=resume,
+                concurrency=self.settings.get_int("user_stats.rescan.concurrency", 4),
+                requests_per_second=float(self.settings.get("user_stats.rescan.requests_per_second", 5) or 5),
+                resume_max_hours=float(self.settings.get("user_stats.rescan.resume_max_hours", 24) or 0),
+            )
+            return await rescan.run()
+        finally:
+            self._rescans.discard(guild.id)
 
     async def _ensure_level_roles(self, guild: discord.Guild):
         raw = self.settings.get_guild(guild.id, "user_stats.level_roles", {}) or {}
@@ -276,11 +327,12 @@ class UserStatsService:
             except Exception:
                 pass
 
-    async def _evaluate_rules(self, member: discord.Member, stats: dict):
+    def _rule_role_targets(self, member: discord.Member, stats: dict) -> dict[int, bool]:
         days_on_server = 0
         if member.joined_at:
             days_on_server = int((datetime.now(timezone.utc) - member.joined_at).total_seconds() // 86400)
         vanity_match = self._vanity_match(member)
+        targets: dict[int, bool] = {}
 
         for rule in self._role_rules(member.guild.id):
             role_id = int(rule.get("role_id", 0) or 0)
@@ -305,7 +357,7 @@ class UserStatsService:
                 else:
                     ok = vanity_match
 
-            await self._apply_role(member, role_id, ok)
+            targets[role_id] = ok
 
         level_roles = self._level_roles(member.guild.id)
         user_level = int(stats.get("level", 0))
@@ -316,7 +368,12 @@ class UserStatsService:
             rid = int(role_id or 0)
             if not rid:
                 continue
-            await self._apply_role(member, rid, rid == target_role_id)
+            targets[rid] = rid == target_role_id
+        return targets
+
+    async def _evaluate_rules(self, member: discord.Member, stats: dict):
+        for role_id, should_have in self._rule_role_targets(member, stats).items():
+            await self._apply_role(member, role_id, should_have)
 
     def _current_status_texts(self, member: discord.Member) -> list[str]:
         texts = []
@@ -353,7 +410,7 @@ class UserStatsService:
                 ch = None
         if not ch or not isinstance(ch, discord.abc.Messageable):
             return
-        _, current_total, next_total = self._level_progress(xp)
+        _, current_total, next_total = self._level_progress(xp, member.guild.id)
         pct = 0
         if next_total > current_total:
             pct = int(((xp - current_total) / (next_total - current_total)) * 100)
@@ -378,7 +435,7 @@ class UserStatsService:
         effort_text = "—"
         if next_role_level:
             levels_left = max(1, int(next_role_level) - int(level))
-            xp_needed = max(0, self._total_xp_for_level(next_role_level) - int(xp))
+            xp_needed = max(0, self._total_xp_for_level(next_role_level, member.guild.id) - int(xp))
             msgs_per = max(1, self._xp_per_message())
             voice_per = max(1, self._xp_per_voice_minute())
             msg_need = math.ceil(xp_needed / msgs_per) if xp_needed > 0 else 0
@@ -408,22 +465,66 @@ class UserStatsService:
         author = message.author
         if not isinstance(author, discord.Member):
             return
-        self._welcome_re = self._build_welcome_regex()
-        await self.db.increment_message(guild_id, author.id, message.channel.id, self._xp_per_message())
-        if self._welcome_re.search(message.content or ""):
-            await self.db.increment_welcome(guild_id, author.id)
-        stats_row = await self.db.get_user_stats(guild_id, author.id)
-        if not stats_row:
-            return
+        welcome_re = self._welcome_regex(guild_id)
+        stats_row = await self.aggregator.record_message(
+            guild_id,
+            author.id,
+            message.channel.id,
+            self._xp_per_message(),
+            welcome=bool(welcome_re.search(message.content or "")),
+        )
+        self.activity.record_message(guild_id, message.channel.id, author.id)
+        self.ranks.observe(stats_row)
         stats = self._row_to_stats(stats_row)
         await self._sync_level(author, stats)
         await self._evaluate_rules(author, stats)
         await self._check_achievements(author, stats)
 
+    def _presence_needles(self, guild_id: int) -> tuple:
+        vanity = self.settings.get_guild(guild_id, "user_stats.vanity_status_contains", []) or []
+        vanity = tuple(str(n).lower() for n in vanity if str(n).strip())
+        rules = tuple(
+            str(rule.get("contains", "") or "").lower().strip()
+            for rule in self._role_rules(guild_id)
+            if str(rule.get("type", "") or "").strip() == "vanity_status" and int(rule.get("role_id", 0) or 0)
+        )
+        return vanity, rules
+
+    def _presence_matches(self, texts: list[str], needles: tuple) -> tuple:
+        lowered = [str(t).lower() for t in texts]
+        vanity, rules = needles
+
+        def hit(candidates) -> bool:
+            return any(n in t for t in lowered for n in candidates)
+
+        vanity_hit = hit(vanity)
+        return (vanity_hit,) + tuple(hit((n,)) if n else vanity_hit for n in rules)
+
     async def on_presence_update(self, before: discord.Member, after: discord.Member):
-        if not after.guild:
+        if not after.guild or after.bot:
+            return
+        # Presence-Events sind die häufigsten Events überhaupt. Statuswechsel
+        # (online/idle/…) und Aktivitäten, die an keinem Vanity-Treffer etwas
+        # ändern, gehen deshalb ohne DB-Zugriff und ohne Rollen-Calls durch.
+        texts = self._current_status_texts(after)
+        if texts == self._current_status_texts(before):
+            return
+        needles = self._presence_needles(after.guild.id)
+        if not needles[0] and not needles[1]:
             return
-        row = await self.db.get_user_stats(after.guild.id, after.id)
+        key = (after.guild.id, after.id)
+        matches = self._presence_matches(texts, needles)
+        cached = self._presence_state.pop(key, None)
+        if cached is not None and cached[0] == needles:
+            previous = cached[1]
+        else:
+            previous = self._presence_matches(self._current_status_texts(before), needles)
+        self._presence_state[key] = (needles, matches)
+        while len(self._presence_state) > self._presence_cache_size:
+            self._presence_state.popitem(last=False)
+        if matches == previous:
+            return
+        row = await self.aggregator.get_user_stats(after.guild.id, after.id)
         if not row:
             return
         stats = self._row_to_stats(row)
@@ -435,16 +536,23 @@ class UserStatsService:
             return
         if before.premium_since != after.premium_since:
             await self.sync_booster(after)
-        row = await self.db.get_user_stats(after.guild.id, after.id)
+        row = await self.aggregator.get_user_stats(after.guild.id, after.id)
         if not row:
             return
         stats = self._row_to_stats(row)
         await self._evaluate_rules(after, stats)
         await self._check_achievements(after, stats)
 
+    def on_member_join(self, member: discord.Member):
+        if member.guild:
+            self.activity.record_join(member.guild.id)
+
     async def on_member_remove(self, member: discord.Member):
         if not member.guild:
             return
+        self.activity.record_leave(member.guild.id)
+        self._presence_state.pop((member.guild.id, member.id), None)
+        self.achievements.forget(member.guild.id, member.id)
         await self.remove_booster(member)
 
     async def sync_booster(self, member: discord.Member):
@@ -484,46 +592,42 @@ class UserStatsService:
             return
         guild_id = member.guild.id
         if before.channel is None and after.channel is not None:
-            await self.db.set_voice_session(guild_id, member.id, after.channel.id, datetime.now(timezone.utc).isoformat())
+            self.voice.join(guild_id, member.id, after.channel.id)
             return
 
         if before.channel is not None and after.channel is None:
-            await self._close_voice_session(member, guild_id)
+            self.voice.leave(guild_id, member.id)
             return
 
         if before.channel and after.channel and before.channel.id != after.channel.id:
-            await self._close_voice_session(member, guild_id)
-            await self.db.set_voice_session(guild_id, member.id, after.channel.id, datetime.now(timezone.utc).isoformat())
+            self.voice.move(guild_id, member.id, after.channel.id)
 
-    async def _close_voice_session(self, member: discord.Member, guild_id: int):
-        row = await self.db.get_voice_session(guild_id, member.id)
-        if not row:
-            return
-        _, joined_at = row
-        try:
-            joined = datetime.fromisoformat(str(joined_at))
-        except Exception:
-            joined = None
-        if joined:
-            seconds = int((datetime.now(timezone.utc) - joined).total_seconds())
-            if seconds > 0:
-                minutes = max(1, seconds // 60)
-                xp = minutes * self._xp_per_voice_minute()
-                await self.db.add_voice_seconds(guild_id, member.id, seconds, xp)
-        await self.db.clear_voice_session(guild_id, member.id)
-        stats_row = await self.db.get_user_stats(guild_id, member.id)
-        if stats_row:
+    async def _on_voice_checkpoint(self, deltas: dict):
+        for guild_id, user_id in deltas:
+            guild = self.bot.get_guild(int(guild_id)) if self.bot else None
+            member = guild.get_member(int(user_id)) if guild else None
+            if not member:
+                continue
+            stats_row = await self.aggregator.get_user_stats(guild_id, user_id)
+            self.ranks.observe(stats_row)
+            if not stats_row:
+                continue
             stats = self._row_to_stats(stats_row)
-            await self._sync_level(member, stats)
-            await self._evaluate_rules(member, stats)
-            await self._check_achievements(member, stats)
+            try:
+                await self._sync_level(member, stats)
+                await self._evaluate_rules(member, stats)
+                await self._check_achievements(member, stats)
+            except Exception:
+                pass
+            await asyncio.sleep(0)
 
     async def _sync_level(self, member: discord.Member, stats: dict, announce: bool = True):
         xp = int(stats.get("xp", 0))
         current_level = int(stats.get("level", 0))
-        new_level = self._level_for_xp(xp)
+        new_level = self._level_for_xp(xp, member.guild.id)
         if new_level > current_level:
             await self.db.set_user_level(member.guild.id, member.id, new_level)
+            self.aggregator.note_level(member.guild.id, member.id, new_level)
             stats["level"] = new_level
             if announce:
                 await self._post_levelup(member, new_level, xp)
@@ -544,41 +648,26 @@ class UserStatsService:
         }
 
     async def _check_achievements(self, member: discord.Member, stats: dict):
-        items = self.settings.get_guild(member.guild.id, "achievements.items", []) or []
-        if not items:
-            return
-        rows = await self.db.list_achievements(member.guild.id, member.id)
-        existing = {r[0] for r in rows}
-        msg_count = int(stats.get("message_count", 0))
-        welcome_count = int(stats.get("welcome_count", 0))
-        voice_hours = int(stats.get("voice_seconds", 0)) // 3600
-        level = int(stats.get("level", 0))
         days_on_server = 0
         if member.joined_at:
             days_on_server = int((datetime.now(timezone.utc) - member.joined_at).total_seconds() // 86400)
-        is_booster = bool(member.premium_since)
-
-        for item in items:
-            code = str(item.get("code", "") or "").strip()
-            if not code or code in existing:
-                continue
-            a_type = str(item.get("type", "") or "").strip()
-            threshold = int(item.get("threshold", 0) or 0)
-            if a_type == "messages" and msg_count >= threshold:
-                await self._unlock_achievement(member, code, item)
-            elif a_type == "welcomes" and welcome_count >= threshold:
-                await self._unlock_achievement(member, code, item)
-            elif a_type == "voice_hours" and voice_hours >= threshold:
-                await self._unlock_achievement(member, code, item)
-            elif a_type == "level" and level >= threshold:
-                await self._unlock_achievement(member, code, item)
-            elif a_type == "days_on_server" and days_on_server >= threshold:
-                await self._unlock_achievement(member, code, item)
-            elif a_type == "booster" and is_booster:
-                await self._unlock_achievement(member, code, item)
+        values = {
+            "messages": int(stats.get("message_count", 0)),
+            "welcomes": int(stats.get("welcome_count", 0)),
+            "voice_hours": int(stats.get("voice_seconds", 0)) // 3600,
+            "level": int(stats.get("level", 0)),
+            "days_on_server": days_on_server,
+            "booster": 1 if member.premium_since else -1,
+        }
+        codes = await self.achievements.pending(member.guild.id, member.id, values)
+        if not codes:
+            return
+        compiled = self.achievements.compiled(member.guild.id)
+        for code in codes:
+            await self._unlock_achievement(member, code, compiled.items[code])
 
     async def _unlock_achievement(self, member: discord.Member, code: str, item: dict):
-        await self.db.add_achievement(member.guild.id, member.id, code)
+        await self.achievements.add_achievement(member.guild.id, member.id, code)
         role_id = int(item.get("role_id", 0) or 0)
         if role_id:
             role = member.guild.get_role(role_id)
@@ -613,19 +702,24 @@ class UserStatsService:
 
     async def build_me_embed(self, member: discord.Member):
         await self.db.upsert_user_stats(member.guild.id, member.id)
-        row = await self.db.get_user_stats(member.guild.id, member.id)
+        row = await self.aggregator.get_user_stats(member.guild.id, member.id)
         stats = self._row_to_stats(row) if row else {}
-        total_users = await self.db.count_users_in_stats(member.guild.id)
-        total_users = max(1, total_users)
-        top_msg = await self.db.count_users_with_messages_at_least(member.guild.id, int(stats.get("message_count", 0)))
-        top_voice = await self.db.count_users_with_voice_at_least(member.guild.id, int(stats.get("voice_seconds", 0)))
+        await self.ranks.ensure(member.guild.id)
+        self.ranks.observe(row)
+        total_users = max(1, await self.ranks.size(member.guild.id))
+        top_msg = await self.ranks.count_at_least(member.guild.id, "messages", int(stats.get("message_count", 0)))
+        top_voice = await self.ranks.count_at_least(member.guild.id, "voice", int(stats.get("voice_seconds", 0)))
+        msg_rank, _ = await self.ranks.rank(member.guild.id, member.id, "messages")
+        xp_rank, _ = await self.ranks.rank(member.guild.id, member.id, "xp")
         msg_top_pct = int((top_msg / total_users) * 100)
         voice_top_pct = int((top_voice / total_users) * 100)
 
-        channel_rows = await self.db.list_user_channel_stats(member.guild.id, member.id, limit=1)
+        channel_counts = {int(r[0]): int(r[1]) for r in await self.db.list_user_channel_stats(member.guild.id, member.id, limit=10)}
+        for ch_id, count in self.aggregator.pending_channels(member.guild.id, member.id).items():
+            channel_counts[ch_id] = channel_counts.get(ch_id, 0) + count
         top_channel = "—"
-        if channel_rows:
-            ch_id = int(channel_rows[0][0])
+        if channel_counts:
+            ch_id = max(channel_counts, key=channel_counts.get)
             ch = member.guild.get_channel(ch_id)
             top_channel = ch.mention if ch else f"`{ch_id}`"
 
@@ -639,7 +733,7 @@ class UserStatsService:
         invite_net = max(0, invite_count - invite_left_count)
         level = int(stats.get("level", 0))
         xp = int(stats.get("xp", 0))
-        _, current_total, next_total = self._level_progress(xp)
+        _, current_total, next_total = self._level_progress(xp, member.guild.id)
         pct = 0
         if next_total > current_total:
             pct = int(((xp - current_total) / (next_total - current_total)) * 100)
@@ -668,13 +762,13 @@ class UserStatsService:
             title=f"📊 𑁉 USER-STATS • {member.display_name}",
             color=self._embed_color(member),
             description=(
-                f"┏`💬` - Nachrichten: **{msg_count}** (Top {msg_top_pct}%)\n"
+                f"┏`💬` - Nachrichten: **{msg_count}** (Top {msg_top_pct}% • #{msg_rank or '—'})\n"
                 f"┣`🎙️` - Voice: **{voice_hours}h** ({voice_days} Tage) (Top {voice_top_pct}%)\n"
                 f"┣`👋` - Welcome: **{welcome_count}**\n"
                 f"┣`📨` - Invites: **{invite_count}** (Left {invite_left_count} • Net {invite_net})\n"
                 f"┣`🎫` - Tickets: **{tickets}**\n"
                 f"┣`📌` - Aktivster Channel: {top_channel}\n"
-                f"┣`⭐` - Level: **{level}** (XP {xp}/{next_total} • {pct}%)\n"
+                f"┣`⭐` - Level: **{level}** (XP {xp}/{next_total} • {pct}% • #{xp_rank or '—'})\n"
                 f"┣`🏆` - Erfolge: **{achieved}/{total_achievements}**\n"
                 f"┗`🏷️` - Rollen: \n{role_text}"
             ),
@@ -683,6 +777,36 @@ class UserStatsService:
         embed.set_image(url=Banners.ACHIEVEMENT)
         return embed
 
+    async def build_leaderboard_embed(self, guild: discord.Guild, metric: str = "messages", page: int = 1, per_page: int = 10):
+        if metric not in METRICS:
+            metric = "messages"
+        rows, total_pages = await self.ranks.top(guild.id, metric, page=page, per_page=per_page)
+        page = max(1, min(int(page), total_pages))
+        labels = {"messages": "Nachrichten", "voice": "Voice", "xp": "XP", "invites": "Invites"}
+        lines = []
+        for rank, user_id, value in rows:
+            member = guild.get_member(int(user_id))
+            name = member.mention if member else f"`{user_id}`"
+            if metric == "voice":
+                shown = f"{value // 3600}h {value % 3600 // 60}m"
+            elif metric == "xp":
+                shown = f"{value} XP • Level {self._level_for_xp(value, guild.id)}"
+            else:
+                shown = str(value)
+            lines.append(f"`#{rank:>3}` {name} — **{shown}**")
+        v = str(self.settings.get_guild(guild.id, "design.accent_color", "#B16B91") or "").replace("#", "").strip()
+        try:
+            color = int(v, 16)
+        except Exception:
+            color = 0xB16B91
+        emb = discord.Embed(
+            title=f"🏅 𑁉 LEADERBOARD • {labels[metric]}",
+            description="\n".join(lines) if lines else "Noch keine Daten.",
+            color=color,
+        )
+        emb.set_footer(text=f"Seite {page}/{total_pages}")
+        return emb, page, total_pages
+
     async def build_achievements_embed(self, member: discord.Member, page: int = 1, per_page: int = 8):
         items = self.settings.get_guild(member.guild.id, "achievements.items", []) or []
         total = len(items)
@@ -693,7 +817,7 @@ class UserStatsService:
         items_page = items[start:end]
 
         await self.db.upsert_user_stats(member.guild.id, member.id)
-        row = await self.db.get_user_stats(member.guild.id, member.id)
+        row = await self.aggregator.get_user_stats(member.guild.id, member.id)
         stats = self._row_to_stats(row) if row else {}
         rows = await self.db.list_achievements(member.guild.id, member.id)
         unlocked = {r[0] for r in rows}
@@ -803,16 +927,12 @@ class UserStatsService:
             return 0xB16B91
 
     async def seed_voice_sessions(self, guild: discord.Guild):
-        for member in guild.members:
-            if member.bot:
+        in_voice = {}
+        for user_id, state in guild.voice_states.items():
+            if not state.channel:
                 continue
-            if not member.voice or not member.voice.channel:
+            member = guild.get_member(int(user_id))
+            if member is None or member.bot:
                 continue
-            existing = await self.db.get_voice_session(guild.id, member.id)
-            if not existing:
-                await self.db.set_voice_session(
-                    guild.id,
-                    member.id,
-                    member.voice.channel.id,
-                    datetime.now(timezone.utc).isoformat(),
-                )
+            in_voice[int(user_id)] = int(state.channel.id)
+        await self.voice.reconcile(guild.id, in_voice)
@@ -0,0 +1,187 @@
+import asyncio
+from datetime import datetime, timezone
+
+
+def _parse(value) -> datetime | None:
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except Exception:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+class _Session:
+    __slots__ = ("channel_id", "accounted_at", "carry", "minutes", "dirty")
+
+    def __init__(self, channel_id: int, accounted_at: datetime):
+        self.channel_id = int(channel_id)
+        self.accounted_at = accounted_at
+        self.carry = 0
+        self.minutes = 0
+        self.dirty = True
+
+
+class VoiceTracker:
+    def __init__(self, db, xp_per_minute, checkpoint_seconds: float = 60.0, on_checkpoint=None, on_accrue=None,
+                 write_lock: asyncio.Lock | None = None, on_written=None):
+        self.db = db
+        self.xp_per_minute = xp_per_minute
+        self.checkpoint_seconds = max(5.0, float(checkpoint_seconds))
+        self.on_checkpoint = on_checkpoint
+        self.on_accrue = on_accrue
+        # on_written(guild_id, user_id, seconds, xp, last_at) läuft noch unter write_lock,
+        # direkt nach dem Commit; so sieht ein Cache die Deltas nie doppelt oder gar nicht.
+        self.write_lock = write_lock or asyncio.Lock()
+        self.on_written = on_written
+        self._sessions: dict[tuple[int, int], _Session] = {}
+        self._deltas: dict[tuple[int, int], list] = {}
+        self._closed: set[tuple[int, int]] = set()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def active(self, guild_id: int | None = None) -> int:
+        if guild_id is None:
+            return len(self._sessions)
+        return sum(1 for g, _ in self._sessions if g == int(guild_id))
+
+    def _accrue(self, key: tuple[int, int], session: _Session, now: datetime, final: bool = False):
+        seconds = int((now - session.accounted_at).total_seconds())
+        if seconds <= 0 and not final:
+            return
+        seconds = max(0, seconds)
+        total = session.carry + seconds
+        minutes, session.carry = divmod(total, 60)
+        # Wie früher: jede Session mit Voice-Zeit bringt mindestens eine Minute XP.
+        if final and session.minutes == 0 and minutes == 0 and total > 0:
+            minutes, session.carry = 1, 0
+        session.minutes += minutes
+        session.accounted_at = now
+        session.dirty = True
+        xp = minutes * int(self.xp_per_minute(key[0]) or 0)
+        if seconds and self.on_accrue:
+            self.on_accrue(key[0], session.channel_id, key[1], seconds, int(now.timestamp()))
+        if not seconds and not xp:
+            return
+        delta = self._deltas.get(key)
+        if delta is None:
+            delta = [0, 0, None]
+            self._deltas[key] = delta
+        delta[0] += seconds
+        delta[1] += xp
+        delta[2] = now.isoformat()
+
+    def join(self, guild_id: int, user_id: int, channel_id: int, at: datetime | None = None):
+        key = (int(guild_id), int(user_id))
+        if key in self._sessions:
+            self.leave(*key, at=at)
+        self._sessions[key] = _Session(channel_id, at or datetime.now(timezone.utc))
+        self._closed.discard(key)
+        self._ensure_loop()
+
+    def move(self, guild_id: int, user_id: int, channel_id: int):
+        session = self._sessions.get((int(guild_id), int(user_id)))
+        if session is None:
+            self.join(guild_id, user_id, channel_id)
+            return
+        # Bisherige Zeit noch dem alten Kanal zuschreiben.
+        self._accrue((int(guild_id), int(user_id)), session, datetime.now(timezone.utc))
+        session.channel_id = int(channel_id)
+        session.dirty = True
+
+    def leave(self, guild_id: int, user_id: int, at: datetime | None = None):
+        key = (int(guild_id), int(user_id))
+        session = self._sessions.pop(key, None)
+        if session is None:
+            return
+        self._accrue(key, session, at or datetime.now(timezone.utc), final=True)
+        self._closed.add(key)
+        self._ensure_loop()
+
+    async def reconcile(self, guild_id: int, in_voice: dict[int, int]):
+        # Ein Durchlauf pro Gilde nach (Re-)Connect: in_voice = {user_id: channel_id}.
+        gid = int(guild_id)
+        persisted = {int(r[0]): (int(r[1]), _parse(r[2])) for r in await self.db.list_voice_sessions(gid)}
+        now = datetime.now(timezone.utc)
+        for key in [k for k in self._sessions if k[0] == gid and k[1] not in in_voice]:
+            # Das Verlassen fiel in die Verbindungslücke: nur bis zum letzten Checkpoint zählen.
+            session = self._sessions.pop(key)
+            self._accrue(key, session, session.accounted_at, final=True)
+            self._closed.add(key)
+        for uid in persisted:
+            if uid not in in_voice and (gid, uid) not in self._sessions:
+                self._closed.add((gid, uid))
+        for uid, channel_id in in_voice.items():
+            key = (gid, int(uid))
+            session = self._sessions.get(key)
+            if session is not None:
+                if session.channel_id != int(channel_id):
+                    session.channel_id = int(channel_id)
+                    session.dirty = True
+                continue
+            joined = persisted.get(int(uid), (None, None))[1]
+            self._sessions[key] = _Session(channel_id, joined if joined and joined <= now else now)
+            self._closed.discard(key)
+        self._ensure_loop()
+
+    def _ensure_loop(self):
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                self._task = None
+
+    async def _run(self):
+        while self._sessions or self._deltas or self._closed:
+            await asyncio.sleep(self.checkpoint_seconds)
+            try:
+                await self.checkpoint()
+            except Exception:
+                pass
+
+    async def checkpoint(self) -> dict[tuple[int, int], list]:
+        async with self._lock:
+            now = datetime.now(timezone.utc)
+            for key, session in self._sessions.items():
+                self._accrue(key, session, now)
+            deltas, closed = self._deltas, self._closed
+            dirty = [(key, s) for key, s in self._sessions.items() if s.dirty]
+            if not deltas and not closed and not dirty:
+                return {}
+            self._deltas, self._closed = {}, set()
+            for _, session in dirty:
+                session.dirty = False
+            try:
+                async with self.write_lock:
+                    await self.db.apply_voice_batch(
+                        [(g, u, d[0], d[1], d[2]) for (g, u), d in deltas.items()],
+                        [(g, u, s.channel_id, s.accounted_at.isoformat()) for (g, u), s in dirty],
+                        [key for key in closed if key not in self._sessions],
+                    )
+                    if self.on_written:
+                        for (g, u), d in deltas.items():
+                            self.on_written(g, u, d[0], d[1], d[2])
+            except BaseException:
+                for _, session in dirty:
+                    session.dirty = True
+                for key, delta in deltas.items():
+                    newer = self._deltas.get(key)
+                    if newer:
+                        delta[0] += newer[0]
+                        delta[1] += newer[1]
+                        delta[2] = newer[2] or delta[2]
+                    self._deltas[key] = delta
+                self._closed |= closed
+                raise
+        if deltas and self.on_checkpoint:
+            try:
+                await self.on_checkpoint(deltas)
+            except Exception:
+                pass
+        return deltas
+
+    async def close(self):
+        task = self._task
+        self._task = None
+        if task and not task.done():
+            task.cancel()
+        await self.checkpoint()
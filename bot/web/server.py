@@ -15,6 +15,7 @@ import uvicorn
 from bot.modules.tickets.services.ticket_service import TicketService
 from bot.modules.moderation.services.mod_service import ModerationService
 from bot.modules.birthdays.services.birthday_service import BirthdayService
+from bot.modules.user_stats.services.rank_index import METRICS as RANK_METRICS
 
 
 class WebServer:
@@ -115,6 +116,18 @@ class WebServer:
                 "birthdays": birthdays,
             })
 
+        @self.app.get("/api/global/db-metrics")
+        async def db_metrics(request: Request, top: int = 50, sort: str = "p95_ms"):
+            await self._require_session(request)
+            return JSONResponse({
+                "enabled": self.db.metrics is not None,
+                "driver": self.db._driver,
+                "pool": self.db.pool_stats(),
+                "queries": self.db.query_metrics(top=top, sort=sort),
+                "statement_cache": self.db.statement_cache_stats(),
+                "retention": getattr(getattr(self.bot, "retention_service", None), "last_report", {}),
+            })
+
         @self.app.get("/api/guilds/{guild_id}/summary")
         async def guild_summary(request: Request, guild_id: int):
             await self._require_guild_access(request, guild_id)
@@ -129,6 +142,75 @@ class WebServer:
                 "applications": applications,
             })
 
+        @self.app.get("/api/guilds/{guild_id}/level-curve")
+        async def guild_level_curve(request: Request, guild_id: int, levels: int = 100):
+            await self._require_guild_access(request, guild_id)
+            service = getattr(self.bot, "user_stats_service", None)
+            if not service:
+                raise HTTPException(status_code=503, detail="user_stats_unavailable")
+            curve = service.level_curve(int(guild_id))
+            return JSONResponse(curve.as_dict(levels=max(1, min(int(levels), curve.max_level))))
+
+        @self.app.get("/api/guilds/{guild_id}/leaderboard")
+        async def guild_leaderboard(request: Request, guild_id: int, metric: str = "messages", page: int = 1, per_page: int = 25):
+            await self._require_guild_access(request, guild_id)
+            service = getattr(self.bot, "user_stats_service", None)
+            if not service:
+                raise HTTPException(status_code=503, detail="user_stats_unavailable")
+            if metric not in RANK_METRICS:
+                raise HTTPException(status_code=400, detail="invalid_metric")
+            rows, total_pages = await service.ranks.top(int(guild_id), metric, page=page, per_page=max(1, min(int(per_page), 100)))
+            guild = self.bot.get_guild(int(guild_id))
+            entries = []
+            for rank, user_id, value in rows:
+                member = guild.get_member(int(user_id)) if guild else None
+                entries.append({
+                    "rank": rank,
+                    "user_id": str(user_id),
+                    "name": member.display_name if member else None,
+                    "value": value,
+                })
+            return JSONResponse({
+                "metric": metric,
+                "page": max(1, min(int(page), total_pages)),
+                "total_pages": total_pages,
+                "entries": entries,
+            })
+
+        @self.app.get("/api/guilds/{guild_id}/rank/{user_id}")
+        async def guild_member_rank(request: Request, guild_id: int, user_id: int):
+            await self._require_guild_access(request, guild_id)
+            service = getattr(self.bot, "user_stats_service", None)
+            if not service:
+                raise HTTPException(status_code=503, detail="user_stats_unavailable")
+            ranks = {}
+            for metric in RANK_METRICS:
+                rank, total = await service.ranks.rank(int(guild_id), int(user_id), metric)
+                ranks[metric] = {"rank": rank, "total": total}
+            return JSONResponse({"user_id": str(user_id), "ranks": ranks})
+
+        @self.app.get("/api/guilds/{guild_id}/activity")
+        async def guild_activity(request: Request, guild_id: int, granularity: str = "day", buckets: int = 30, channel_id: int = 0):
+            await self._require_guild_access(request, guild_id)
+            service = getattr(self.bot, "user_stats_service", None)
+            if not service:
+                raise HTTPException(status_code=503, detail="user_stats_unavailable")
+            if granularity not in ("hour", "day"):
+                raise HTTPException(status_code=400, detail="invalid_granularity")
+            # Stundenwerte existieren nur innerhalb der Aufbewahrungsfrist.
+            limit = service.activity.hourly_retention_days * 24 if granularity == "hour" else 366
+            series = await service.activity.series(
+                int(guild_id),
+                int(channel_id),
+                granularity=granularity,
+                buckets=max(1, min(int(buckets), limit)),
+            )
+            return JSONResponse({
+                "granularity": granularity,
+                "channel_id": str(channel_id),
+                "series": series,
+            })
+
         @self.app.get("/api/guilds/{guild_id}/settings")
         async def get_guild_settings(request: Request, guild_id: int):
             await self._require_guild_access(request, guild_id)